@@ -14,4 +14,4 @@ default_task = "publish"
 
 @init
 def set_properties(project):
-    pass
+    project.set_property("distutils_console_scripts", ["uc3mtravel = uc3mtravel.hotelcli:main"])
@@ -0,0 +1,28 @@
+""" Benchmark: integrity audit of the data files with a growing number of worker processes.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_audit.py [records] """
+import os
+import sys
+import tempfile
+import time
+from benchdata import generate_data
+from uc3mtravel.hotelaudit import audit
+
+
+def main(records):
+    """ Generates the data files and audits them with 1, 2, 4... workers up to the number of cores """
+    with tempfile.TemporaryDirectory() as path_data:
+        generate_data(path_data, records)
+        print("records: " + str(records) + ", cores: " + str(os.cpu_count()))
+        workers, base = 1, None
+        while workers <= max(os.cpu_count() or 1, 1):
+            start = time.perf_counter()
+            problems = sum(1 for _ in audit(path_data, workers))
+            seconds = time.perf_counter() - start
+            base = base or seconds
+            print("workers {:>3} {:>10.2f} s {:>12.0f} records/s  speedup x{:.2f}  problems {}".format(
+                workers, seconds, records / seconds, base / seconds, problems))
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,68 @@
+""" Benchmark: file size, load time, save time and append time of the data files in every storage format.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_codecs.py [records] """
+import os
+import sys
+import tempfile
+import time
+from benchdata import booking, stay, checkout
+from uc3mtravel import CodecStore
+from uc3mtravel.hotelcodec import CODECS
+
+
+def measure(function, *args):
+    """ Returns (seconds, result) of a call """
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def save(codec, path_file, records):
+    """ Writes the records to a file in the format of the codec """
+    with open(path_file, mode="wb") as f:
+        f.write(codec.dumps(records))
+
+
+def load(codec, path_file):
+    """ Reads the records of a file in the format of the codec """
+    with open(path_file, mode="rb") as f:
+        return codec.loads(f.read())[0]
+
+
+def append(store, records):
+    """ Appends records one at a time through a store, as the operations do """
+    for record in records:
+        store.append(record)
+
+
+def main(records):
+    """ Saves, loads and appends bookings, stays and checkouts of records bookings with every codec """
+    bookings = [booking(index) for index in range(records)]
+    stays = [stay(booking_data) for booking_data in bookings[:records // 2]]
+    data = {"bookings": bookings, "stays": stays, "checkouts": [checkout(stay_data) for stay_data in stays[:records // 4]]}
+    extra = [booking(records + index) for index in range(100)]
+    results = {}
+    print("records: " + str(records))
+    print("{:<10} {:<8} {:>10} {:>9} {:>9} {:>9} {:>12}".format("file", "format", "MiB", "ratio", "load s", "save s", "append ms"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, file_records in data.items():
+            base_size = None
+            for codec in CODECS.values():
+                path_file = os.path.join(tmp_dir, name + codec.extension)
+                save_s, _ = measure(save, codec, path_file, file_records)
+                size = os.path.getsize(path_file)
+                base_size = base_size or size
+                load_s, loaded = measure(load, codec, path_file)
+                assert loaded == file_records
+                append_s = 0.0
+                if name == "bookings":
+                    store = CodecStore(path_file, ("idCard", "localizer"), codec=codec.name)
+                    store.refresh()
+                    append_s, _ = measure(append, store, extra)
+                results[(name, codec.name)] = {"bytes": size, "load_s": load_s, "save_s": save_s, "append_s": append_s}
+                print("{:<10} {:<8} {:>10.2f} {:>9.2f} {:>9.3f} {:>9.3f} {:>12.3f}".format(
+                    name, codec.name, size / 2 ** 20, size / base_size, load_s, save_s, append_s * 1000 / len(extra)))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
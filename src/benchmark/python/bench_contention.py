@@ -0,0 +1,46 @@
+""" Benchmark: several processes booking on the same bookings store (json or journal mode).
+    Checks that no booking is lost or duplicated and reports the throughput under contention.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_contention.py [processes] [bookings] """
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from benchdata import booking
+from uc3mtravel import HotelManager, HotelManagementException, JsonStore, JournalStore
+
+
+def worker(store_class, path_file, first, count):
+    """ Books count clients plus client 0, which every worker tries to book. Returns the number of bookings made """
+    hm = HotelManager(booking_store=store_class(path_file, ("idCard", "localizer")))
+    made = 0
+    for index in [0] + list(range(first, first + count)):
+        data = booking(index)
+        try:
+            hm.room_reservation(data["creditCardNumber"], data["idCard"], data["nameSurname"], data["phoneNumber"],
+                                data["roomType"], data["arrival"], data["numDays"])
+            made += 1
+        except HotelManagementException:
+            pass
+    return made
+
+
+def main(processes, bookings):
+    """ Runs the workers for every store class and checks the result """
+    per_worker = bookings // processes
+    for store_class in (JsonStore, JournalStore):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path_file = os.path.join(tmp_dir, "all_bookings.json")
+            start = time.perf_counter()
+            with multiprocessing.Pool(processes) as pool:
+                made = pool.starmap(worker, [(store_class, path_file, 1 + number * per_worker, per_worker) for number in range(processes)])
+            seconds = time.perf_counter() - start
+            records = store_class(path_file, ("idCard",)).records()
+            expected = processes * per_worker + 1
+            lost = expected - len({record["idCard"] for record in records})
+            print("{:<12} processes {:>3}  bookings {:>7}  stored {:>7}  lost {:>3}  duplicated {:>3}  bookings/second {:>8.0f}".format(
+                store_class.__name__, processes, sum(made), len(records), lost, len(records) - expected + lost, sum(made) / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8, int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
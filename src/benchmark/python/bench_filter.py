@@ -0,0 +1,70 @@
+""" Benchmark: guest_arrival on a miss-heavy workload (unknown or stale localizers) with and without the booking
+    filter, in a new process (cold stores) and once the stores are loaded. The filter only answers while the
+    bookings file has not been loaded (the first hit loads it), afterwards both use the index of the store.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_filter.py [records] [misses] """
+import os
+import random
+import sys
+import tempfile
+import time
+from benchdata import booking, write_records
+from uc3mtravel import BookingFilter, HotelManager, HotelManagementException, JsonStore
+
+
+def arrivals(records, count, miss_ratio):
+    """ Returns count arrival inputs: miss_ratio of them with a wrong localizer, the rest of existing bookings """
+    rnd = random.Random(1)
+    inputs = []
+    for _ in range(count):
+        booking_data = booking(rnd.randrange(records))
+        localizer = booking_data["localizer"] if rnd.random() >= miss_ratio else format(rnd.getrandbits(128), "032x")
+        inputs.append({"Localizer": localizer, "IdCard": booking_data["idCard"]})
+    return inputs
+
+
+def run(path_data, inputs, use_filter):
+    """ Returns (seconds of the first arrival, seconds per arrival afterwards, unknown arrivals rejected) in new
+        stores. The arrivals are only checked (get_stay_data), no stay is stored """
+    hotel_manager = HotelManager(booking_store=JsonStore(path_data + "/all_bookings.json", ("idCard", "localizer")),
+                                 stay_store=JsonStore(path_data + "/all_stays.json", ("roomKey", "idCard")),
+                                 booking_filter=use_filter, room_key_index=False)
+    rejected, first = 0, None
+    start = time.perf_counter()
+    for input_data in inputs:
+        try:
+            hotel_manager.get_stay_data(*hotel_manager.get_arrival_keys(input_data))
+        except HotelManagementException as exc:
+            # Hits fail later (arrival date): only the unknown pairs are counted...
+            rejected += exc.message == "No reservation was found with the provided localizer and id card"
+        if first is None:
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+    return first, (time.perf_counter() - start) / max(1, len(inputs) - 1), rejected
+
+
+def main(records, count):
+    """ Generates a bookings file, builds its filter and runs the same miss-heavy workload with and without it """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_records(tmp_dir + "/all_bookings.json", (booking(index) for index in range(records)))
+        print("records: " + str(records) + ", file size: " + str(round(os.path.getsize(tmp_dir + "/all_bookings.json") / 2 ** 20, 1)) + " MiB")
+        for error_rate in (0.1, 0.01, 0.001):
+            booking_filter = BookingFilter(JsonStore(tmp_dir + "/all_bookings.json", ("idCard", "localizer")), error_rate=error_rate)
+            start = time.perf_counter()
+            booking_filter.rebuild()
+            false_positives = sum(booking_filter.might_contain(booking(index)["idCard"], "0" * 32) for index in range(2000))
+            print("error rate {:<6} build {:.3f} s, filter {:.1f} KiB, measured false positives {:.4f}".format(
+                error_rate, time.perf_counter() - start, os.path.getsize(booking_filter.path) / 1024, false_positives / 2000))
+        results = {}
+        print("{:<12} {:<8} {:>14} {:>14} {:>10}".format("miss ratio", "filter", "first ms", "per call us", "rejected"))
+        for miss_ratio in (0.5, 0.9, 1.0):
+            inputs = arrivals(records, count, miss_ratio)
+            for use_filter in (False, True):
+                first, per_call, rejected = run(tmp_dir, inputs, use_filter)
+                results[(miss_ratio, use_filter)] = {"first_s": first, "per_call_s": per_call, "rejected": rejected}
+                print("{:<12} {:<8} {:>14.3f} {:>14.2f} {:>10}".format(miss_ratio, str(use_filter), first * 1000,
+                                                                      per_call * 1e6, rejected))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000, int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
@@ -0,0 +1,61 @@
+""" Benchmark: retry-heavy guest_arrival traffic (every arrival is retried several times) and the localizers of the
+    retried bookings, with the LRU cache of localizers and with it disabled. Only the localizer check of an arrival
+    can hit the cache: the room key of a stay includes the arrival time, so it is never computed twice.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_hashcache.py [records] [retries] """
+import random
+import sys
+import tempfile
+import time
+from benchdata import booking, write_records
+from uc3mtravel import HotelManager, HotelManagementException, JsonStore, HotelReservationRecord
+from uc3mtravel import hashcache
+
+
+def arrivals(hotel_manager, inputs):
+    """ Checks every arrival (get_stay_data, nothing is stored). Returns the seconds per arrival """
+    start = time.perf_counter()
+    for input_data in inputs:
+        try:
+            hotel_manager.get_stay_data(*hotel_manager.get_arrival_keys(input_data))
+        except HotelManagementException:
+            # The bookings are not for today: the localizer is checked and the arrival is refused...
+            pass
+    return (time.perf_counter() - start) / len(inputs)
+
+
+def localizers(bookings, retries):
+    """ Recomputes the localizer of every booking retries times, as the tamper check of the retried arrivals.
+        Returns the seconds per localizer """
+    start = time.perf_counter()
+    for _ in range(retries):
+        for booking_data in bookings:
+            HotelReservationRecord.from_json(booking_data).localizer  # pylint: disable=expression-not-assigned
+    return (time.perf_counter() - start) / (len(bookings) * retries)
+
+
+def main(records, retries):
+    """ Runs the same workloads with the cache (default size) and without it """
+    bookings = [booking(index) for index in range(records)]
+    rnd = random.Random(1)
+    inputs = [{"Localizer": bookings[index]["localizer"], "IdCard": bookings[index]["idCard"]}
+              for index in range(records) for _ in range(retries)]
+    rnd.shuffle(inputs)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_records(tmp_dir + "/all_bookings.json", bookings)
+        hotel_manager = HotelManager(booking_store=JsonStore(tmp_dir + "/all_bookings.json", ("idCard", "localizer")),
+                                     stay_store=JsonStore(tmp_dir + "/all_stays.json", ("roomKey", "idCard")))
+        arrivals(hotel_manager, inputs[:100])
+        for maxsize in (0, 65536):
+            hashcache.LOCALIZERS.resize(maxsize)
+            hashcache.LOCALIZERS.clear()
+            per_arrival = arrivals(hotel_manager, inputs)
+            per_localizer = localizers(bookings, retries)
+            results[maxsize] = {"arrival_s": per_arrival, "localizer_s": per_localizer, "stats": hashcache.stats()}
+            print("cache size {:<6} arrival {:>7.2f} us  localizer {:>6.2f} us  localizer hit rate {:.2f}".format(
+                maxsize, per_arrival * 1e6, per_localizer * 1e6, results[maxsize]["stats"]["localizers"]["hit_rate"]))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
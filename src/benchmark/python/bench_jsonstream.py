@@ -0,0 +1,54 @@
+""" Benchmark: full json.load + scan against the streaming reader to find one record in all_bookings.json.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_jsonstream.py [records] """
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from benchdata import booking, write_records
+from uc3mtravel import find_record
+
+
+def full_load_find(path_file, key, value):
+    """ Lookup as HotelManager did before the stores: load the whole file and scan it """
+    with open(path_file, encoding="UTF-8", mode="r") as f:
+        records = json.load(f)
+    for record in records:
+        if record[key] == value:
+            return record
+    return None
+
+
+def measure(function, *args):
+    """ Returns (seconds, peak MiB) of a call. Time and memory are measured in separate runs """
+    start = time.perf_counter()
+    function(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main(records):
+    """ Generates a bookings file and looks up the first, middle and last booking and a missing one """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path_file = os.path.join(tmp_dir, "all_bookings.json")
+        write_records(path_file, (booking(index) for index in range(records)))
+        print("records: " + str(records) + ", file size: " + str(round(os.path.getsize(path_file) / 2 ** 20, 1)) + " MiB")
+        print("{:<10} {:>14} {:>14} {:>14} {:>14}".format("target", "load s", "load MiB", "stream s", "stream MiB"))
+        targets = {"first": booking(0)["idCard"], "middle": booking(records // 2)["idCard"],
+                   "last": booking(records - 1)["idCard"], "missing": "00000000X"}
+        results = {}
+        for name, id_card in targets.items():
+            load = measure(full_load_find, path_file, "idCard", id_card)
+            stream = measure(find_record, path_file, "idCard", id_card)
+            results[name] = {"load_s": load[0], "load_mib": load[1], "stream_s": stream[0], "stream_mib": stream[1]}
+            print("{:<10} {:>14.4f} {:>14.1f} {:>14.4f} {:>14.1f}".format(name, load[0], load[1], stream[0], stream[1]))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,132 @@
+""" Benchmark suite of the three HM-FR operations (room_reservation, guest_arrival, guest_checkout) over data
+    files of growing size. For every size it reports the latency of the first call (it loads the files), the
+    p50/p99 latency and throughput of the next calls, and the peak memory of the first call.
+    Results are saved as json to compare commits:
+        PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_operations.py \\
+            [--sizes 1000,10000,100000,1000000] [--operations 200] [--output results.json] [--compare old.json] """
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from freezegun import freeze_time
+from benchdata import booking, generate_data
+from uc3mtravel import HotelManager, JsonStore
+
+# freezegun replaces time.perf_counter in every module while the clock is frozen, but not inside a dict...
+CLOCK = {"now": time.perf_counter}
+ARRIVAL, ARRIVAL_DAY, DEPARTURE_DAY = "01/07/2025", "2025-07-01", "2025-07-03"
+
+
+def new_hotel_manager(path_data):
+    """ Returns a HotelManager with new (not yet loaded) stores over the data files of path_data """
+    return HotelManager(booking_store=JsonStore(path_data + "/all_bookings.json", ("idCard", "localizer")),
+                        stay_store=JsonStore(path_data + "/all_stays.json", ("roomKey", "idCard")),
+                        checkout_store=JsonStore(path_data + "/all_checkouts.json", ("roomKey",)))
+
+
+def run_operation(path_data, operation, inputs):
+    """ Runs the operation once with tracemalloc (peak memory, new stores) and then for the rest of the inputs
+        with new stores: the first call is the cold one, the others are the warm ones """
+    tracemalloc.start()
+    operation(new_hotel_manager(path_data), inputs[0])
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    hm = new_hotel_manager(path_data)
+    latencies = []
+    for input_data in inputs[1:]:
+        start = CLOCK["now"]()
+        operation(hm, input_data)
+        latencies.append(CLOCK["now"]() - start)
+    warm = sorted(latencies[1:])
+    return {"cold_ms": latencies[0] * 1000, "p50_ms": warm[len(warm) // 2] * 1000,
+            "p99_ms": warm[int(0.99 * (len(warm) - 1))] * 1000, "ops_per_second": len(warm) / sum(warm),
+            "peak_mib": peak}
+
+
+def reserve(hm, data):
+    """ HM-FR-01 with a booking record """
+    hm.room_reservation(data["creditCardNumber"], data["idCard"], data["nameSurname"], data["phoneNumber"],
+                        data["roomType"], data["arrival"], data["numDays"])
+
+
+def arrive(hm, data):
+    """ HM-FR-02 with an input file """
+    hm.guest_arrival(data)
+
+
+def checkout(hm, room_key):
+    """ HM-FR-03 with a room key """
+    hm.guest_checkout(room_key)
+
+
+def bench_size(records, operations):
+    """ Generates data files with records bookings and runs the three operations over them """
+    with tempfile.TemporaryDirectory() as path_data:
+        generate_data(path_data, records)
+        new_bookings = [booking(records + index, ARRIVAL, "2") for index in range(operations + 2)]
+        results = {"room_reservation": run_operation(path_data, reserve, new_bookings)}
+        input_files = []
+        for index, data in enumerate(new_bookings):
+            input_files.append(path_data + "/arrival_" + str(index) + ".json")
+            with open(input_files[-1], encoding="UTF-8", mode="w") as f:
+                json.dump({"Localizer": data["localizer"], "IdCard": data["idCard"]}, f)
+        room_keys = []
+        with freeze_time(ARRIVAL_DAY):
+            results["guest_arrival"] = run_operation(path_data, lambda hm, input_file: room_keys.append(hm.guest_arrival(input_file)),
+                                                     input_files)
+        with freeze_time(DEPARTURE_DAY):
+            results["guest_checkout"] = run_operation(path_data, checkout, room_keys)
+    return results
+
+
+def git_commit():
+    """ Returns the current git commit or None """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_file, results):
+    """ Prints the ratio new/old of the latencies of two result files """
+    with open(old_file, encoding="UTF-8", mode="r") as f:
+        old = json.load(f)
+    print("\ncompared with " + old_file + " (" + str(old.get("commit")) + "): new / old")
+    for size, operations in results["sizes"].items():
+        for name, metrics in operations.items():
+            previous = old["sizes"].get(size, {}).get(name)
+            if previous:
+                print("{:>8} {:<18} p50 x{:.2f}  p99 x{:.2f}  cold x{:.2f}  peak x{:.2f}".format(
+                    size, name, metrics["p50_ms"] / previous["p50_ms"], metrics["p99_ms"] / previous["p99_ms"],
+                    metrics["cold_ms"] / previous["cold_ms"], metrics["peak_mib"] / max(previous["peak_mib"], 1e-9)))
+
+
+def main(argv=None):
+    """ Runs the suite, prints the table and saves the results """
+    parser = argparse.ArgumentParser(description="HM-FR operations benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--operations", type=int, default=200, help="calls of every operation per size")
+    parser.add_argument("--output", default="bench_operations.json")
+    parser.add_argument("--compare", help="previous results file")
+    args = parser.parse_args(argv)
+    results = {"commit": git_commit(), "python": platform.python_version(), "machine": platform.machine(),
+               "operations": args.operations, "sizes": {}}
+    print("{:>8} {:<18} {:>10} {:>10} {:>10} {:>12} {:>10}".format("records", "operation", "cold ms", "p50 ms", "p99 ms", "ops/s", "peak MiB"))
+    for size in (int(size) for size in args.sizes.split(",")):
+        results["sizes"][str(size)] = bench_size(size, args.operations)
+        for name, metrics in results["sizes"][str(size)].items():
+            print("{:>8} {:<18} {:>10.2f} {:>10.3f} {:>10.3f} {:>12.0f} {:>10.1f}".format(
+                size, name, metrics["cold_ms"], metrics["p50_ms"], metrics["p99_ms"], metrics["ops_per_second"], metrics["peak_mib"]))
+    with open(args.output, encoding="UTF-8", mode="w") as f:
+        json.dump(results, f, indent=4)
+    if args.compare and os.path.isfile(args.compare):
+        compare(args.compare, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
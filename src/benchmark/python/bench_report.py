@@ -0,0 +1,68 @@
+""" Benchmark: occupancy report of a year computed by parsing the data files in a loop (as the ad-hoc scripts do)
+    against HotelReport with and without NumPy, and the incremental refresh after new bookings.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_report.py [records] """
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from unittest import mock
+from benchdata import booking, generate_data
+from uc3mtravel import HotelReport, JsonStore
+from uc3mtravel import hotelreport
+
+
+def loop_occupancy(bookings, start, end):
+    """ Occupancy per day and room type parsing every booking date, one day at a time """
+    occupancy = {}
+    day = start
+    while day <= end:
+        rooms = {"SINGLE": 0, "DOUBLE": 0, "SUITE": 0}
+        for record in bookings:
+            arrival = datetime.strptime(record["arrival"], "%d/%m/%Y").date()
+            if arrival <= day < arrival + timedelta(days=int(record["numDays"])):
+                rooms[record["roomType"]] += 1
+        occupancy[day] = rooms
+        day += timedelta(days=1)
+    return occupancy
+
+
+def main(records):
+    """ Generates the data files and times every way of computing the occupancy of 2024 """
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        generate_data(tmp_dir, records)
+        booking_store = JsonStore(tmp_dir + "/all_bookings.json", ("idCard", "localizer"))
+        stay_store = JsonStore(tmp_dir + "/all_stays.json", ("roomKey", "idCard"))
+        bookings = booking_store.records()
+        results = {}
+        if records <= 20000:
+            begin = time.perf_counter()
+            expected = loop_occupancy(bookings, start, end)
+            results["loop"] = time.perf_counter() - begin
+        else:
+            expected = None
+        for numpy in (hotelreport.numpy, None):
+            name = "numpy" if numpy else "python"
+            with mock.patch.object(hotelreport, "numpy", numpy):
+                report = HotelReport(booking_store, stay_store)
+                begin = time.perf_counter()
+                report.refresh()
+                results[name + " build"] = time.perf_counter() - begin
+                begin = time.perf_counter()
+                occupancy = report.occupancy(start, end)
+                report.no_shows(date(2024, 7, 1))
+                results[name + " query"] = time.perf_counter() - begin
+                if expected is not None and occupancy != expected:
+                    raise AssertionError("Occupancy of " + name + " differs from the loop")
+        booking_store.extend(booking(index) for index in range(records, records + 100))
+        begin = time.perf_counter()
+        report.refresh()
+        results["refresh +100"] = time.perf_counter() - begin
+    print("records: " + str(records))
+    for name, seconds in results.items():
+        print("{:<16} {:>12.2f} ms".format(name, seconds * 1000))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,63 @@
+""" Benchmark: latency (p50/p99) and requests/second of the HotelService under a local load generator.
+    Reservations exercise the write path, arrivals and checkouts of unknown keys the lookup path.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_service.py [requests] [clients] """
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from benchdata import booking
+from uc3mtravel import HotelManager, HotelService, JsonStore
+
+
+async def client(port, requests, latencies):
+    """ Sends its requests over one keep-alive connection and records the latency of each """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for path, data in requests:
+        body = json.dumps(data).encode("UTF-8")
+        start = time.perf_counter()
+        writer.write(("POST " + path + " HTTP/1.1\r\nHost: localhost\r\nContent-Length: " + str(len(body)) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        latencies.setdefault(path, []).append(time.perf_counter() - start)
+    writer.close()
+
+
+def percentile(values, share):
+    """ Returns the percentile share (0..1) of values """
+    ordered = sorted(values)
+    return ordered[int(share * (len(ordered) - 1))]
+
+
+async def run(total, clients):
+    """ Starts a service over temporary stores and runs the load against it """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        hotel_manager = HotelManager(booking_store=JsonStore(tmp_dir + "/all_bookings.json", ("idCard", "localizer")),
+                                     stay_store=JsonStore(tmp_dir + "/all_stays.json", ("roomKey", "idCard")),
+                                     checkout_store=JsonStore(tmp_dir + "/all_checkouts.json", ("roomKey",)))
+        service = HotelService(hotel_manager)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        requests = []
+        for index in range(total):
+            if index % 3 == 0:
+                requests.append(("/reservation", booking(index)))
+            elif index % 3 == 1:
+                requests.append(("/arrival", {"Localizer": "0" * 32, "IdCard": booking(index)["idCard"]}))
+            else:
+                requests.append(("/checkout", {"roomKey": "0" * 64}))
+        latencies = {}
+        start = time.perf_counter()
+        await asyncio.gather(*(client(port, requests[number::clients], latencies) for number in range(clients)))
+        seconds = time.perf_counter() - start
+        server.close()
+        await server.wait_closed()
+    print("requests: " + str(total) + ", clients: " + str(clients) + ", requests/second: " + str(round(total / seconds)))
+    for path, values in latencies.items():
+        print("{:<14} p50 {:>8.3f} ms   p99 {:>8.3f} ms".format(path, percentile(values, 0.5) * 1000, percentile(values, 0.99) * 1000))
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 30000, int(sys.argv[2]) if len(sys.argv) > 2 else 50))
@@ -0,0 +1,50 @@
+""" Benchmark: startup cost of the package in a new interpreter, measured with python -X importtime, for the
+    imports of a short-lived worker (package only, HotelManager, HotelManager with the validators loaded).
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_startup.py [runs] """
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {"package": "import uc3mtravel",
+             "HotelManager": "from uc3mtravel import HotelManager",
+             "validators": "from uc3mtravel import HotelManager; HotelManager.validate_id_card(None, '12345678Z'); "
+                           "HotelManager.validate_credit_card(None, '5555555555554444')"}
+
+
+def import_times(code):
+    """ Runs code in a new interpreter with -X importtime. Returns (microseconds of all the imports,
+        {module: self microseconds}, seconds of the whole process) """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                            env=dict(os.environ), check=True)
+    elapsed = time.perf_counter() - start
+    total, modules = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+    return total, modules, elapsed
+
+
+def main(runs):
+    """ Prints the median import time of every scenario (over the bare interpreter) and its slowest modules """
+    baseline = statistics.median(import_times("pass")[0] for _ in range(runs))
+    results = {}
+    for name, code in SCENARIOS.items():
+        measures = [import_times(code) for _ in range(runs)]
+        imports = statistics.median(measure[0] for measure in measures) - baseline
+        process = statistics.median(measure[2] for measure in measures)
+        results[name] = {"imports_ms": imports / 1000, "process_ms": process * 1000}
+        slowest = sorted(measures[-1][1].items(), key=lambda item: item[1], reverse=True)[:5]
+        print("{:<14} imports {:>8.1f} ms   process {:>8.1f} ms".format(name, imports / 1000, process * 1000))
+        print("               slowest: " + ", ".join(module + " " + str(round(us / 1000, 1)) for module, us in slowest))
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,61 @@
+""" Benchmark: validation of reservation fields one call per value (HotelManager.validate_*) against the
+    validation by columns (HotelManager.validate_reservation_columns), with and without NumPy.
+    Usage: PYTHONPATH=src/main/python:src/benchmark/python python src/benchmark/python/bench_validation.py [rows] """
+import sys
+import time
+from unittest import mock
+from benchdata import booking
+from uc3mtravel import HotelManager, HotelManagementException
+from uc3mtravel import bulkvalidator
+
+
+def per_call(hm, rows):
+    """ Validates row by row as room_reservation does, keeping the first message of every row """
+    messages = []
+    for row in rows:
+        try:
+            hm.validate_credit_card(row["creditCardNumber"])
+            hm.validate_name_surname(row["nameSurname"])
+            hm.validate_phone_number(row["phoneNumber"])
+            hm.validate_room_type(row["roomType"])
+            hm.validate_arrival(row["arrival"])
+            hm.validate_num_days(row["numDays"])
+            hm.validate_id_card(row["idCard"])
+            messages.append(None)
+        except HotelManagementException as exc:
+            messages.append(exc.message)
+    return messages
+
+
+def main(count):
+    """ Validates count rows (one in ten with a wrong card, NIF or date) with every method """
+    rows = []
+    for index in range(count):
+        row = booking(index)
+        if index % 10 == 3:
+            row["creditCardNumber"] = row["creditCardNumber"][:-1] + str((int(row["creditCardNumber"][-1]) + 1) % 10)
+        elif index % 10 == 6:
+            row["idCard"] = row["idCard"][:8] + ("A" if row["idCard"][8] != "A" else "B")
+        elif index % 10 == 9:
+            row["arrival"] = "30/02/2024"
+        rows.append(row)
+    hm = HotelManager()
+    columns = {key: [row[key] for row in rows] for key in bulkvalidator.COLUMNS}
+    start = time.perf_counter()
+    expected = per_call(hm, rows)
+    base = time.perf_counter() - start
+    print("rows: " + str(count))
+    print("{:<22} {:>10.3f} s {:>12.0f} rows/s".format("per call", base, count / base))
+    for name, numpy in (("columns (numpy)", bulkvalidator.numpy), ("columns (pure python)", None)):
+        if name.endswith("(numpy)") and numpy is None:
+            continue
+        with mock.patch.object(bulkvalidator, "numpy", numpy):
+            start = time.perf_counter()
+            _, messages = hm.validate_reservation_columns(columns)
+            seconds = time.perf_counter() - start
+        assert messages == expected
+        print("{:<22} {:>10.3f} s {:>12.0f} rows/s   x{:.1f}".format(name, seconds, count / seconds, base / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
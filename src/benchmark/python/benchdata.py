@@ -0,0 +1,77 @@
+""" Module that generates synthetic valid data files (bookings, stays, checkouts) for the benchmarks """
+import json
+import random
+from datetime import datetime, timedelta
+from uc3mtravel import HotelReservation, HotelStayRecord
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+ROOM_TYPES = ("SINGLE", "DOUBLE", "SUITE")
+
+
+def nif(number):
+    """ Returns a valid Spanish NIF for a number of up to 8 digits """
+    return str(number).zfill(8) + NIF_LETTERS[number % 23]
+
+
+def luhn_card(number):
+    """ Returns a valid 16 digits credit card number (luhn check digit) for a number of up to 15 digits """
+    digits = str(number).zfill(15)
+    total = 0
+    for index, digit in enumerate(reversed(digits)):
+        value = int(digit) * 2 if index % 2 == 0 else int(digit)
+        total += value - 9 if value > 9 else value
+    return digits + str((10 - total % 10) % 10)
+
+
+def booking(index, arrival=None, num_days=None):
+    """ Returns the booking record number index, with its localizer. Arrival (dd/mm/yyyy) and number of days
+        are random (repeatable) unless given """
+    rnd = random.Random(index)
+    arrival = arrival or (datetime(2024, 1, 1) + timedelta(days=rnd.randrange(365))).strftime("%d/%m/%Y")
+    num_days = num_days or str(1 + index % 10)
+    reservation = HotelReservation(id_card=nif(index), credit_card_number=luhn_card(4000000000000 + index),
+                                   name_surname="GUEST NUMBER " + str(index), phone_number=str(600000000 + index % 100000000),
+                                   room_type=ROOM_TYPES[index % 3], arrival=arrival, num_days=num_days)
+    booking_data = reservation.json
+    booking_data["localizer"] = reservation.localizer
+    return booking_data
+
+
+def stay(booking_data):
+    """ Returns the stay record of a booking, arriving on the day of the booking at 00:00 """
+    arrival = datetime.strptime(booking_data["arrival"], "%d/%m/%Y")
+    record = HotelStayRecord(booking_data["idCard"], booking_data["localizer"], booking_data["roomType"],
+                             arrival, arrival + timedelta(days=int(booking_data["numDays"])))
+    stay_data = record.json
+    stay_data["roomKey"] = record.room_key
+    return stay_data
+
+
+def checkout(stay_data):
+    """ Returns the checkout record of a stay, leaving on the departure date """
+    departure = datetime.strptime(stay_data["departure"], "%Y-%m-%d %H:%M:%S")
+    return {"roomKey": stay_data["roomKey"], "realDeparture": datetime.timestamp(departure)}
+
+
+def write_records(path_file, records):
+    """ Writes records to a json file with the format of the data files (indent=4) one at a time """
+    with open(path_file, encoding="UTF-8", mode="w") as f:
+        separator = "[\n"
+        count = 0
+        for record in records:
+            f.write(separator + "\n".join("    " + line for line in json.dumps(record, indent=4).split("\n")))
+            separator = ",\n"
+            count += 1
+        f.write("[]" if count == 0 else "\n]")
+    return count
+
+
+def generate_data(path_data, records, stays_ratio=0.5, checkouts_ratio=0.5):
+    """ Writes all_bookings.json, all_stays.json and all_checkouts.json with records bookings to path_data.
+        A share of the bookings has a stay and a share of the stays has a checkout """
+    num_stays = int(records * stays_ratio)
+    num_checkouts = int(num_stays * checkouts_ratio)
+    write_records(path_data + "/all_bookings.json", (booking(index) for index in range(records)))
+    write_records(path_data + "/all_stays.json", (stay(booking(index)) for index in range(num_stays)))
+    write_records(path_data + "/all_checkouts.json", (checkout(stay(booking(index))) for index in range(num_checkouts)))
+    return records, num_stays, num_checkouts
@@ -1,5 +1,43 @@
-""" Initialization of package module uc3m... """
-from .hotelmanager import HotelManager
-from .hotelmanagementexception import HotelManagementException
-from .hotelreservation import HotelReservation
-from .hotelstay import HotelStay
+""" Initialization of package module uc3m... Public names are imported the first time they are used, so importing
+    the package (or one of its modules, e.g. python -m uc3mtravel.hotelcodec) does not load every module """
+import importlib
+
+# public name: module where it is defined (submodules are public with their own name)
+_EXPORTS = {"HotelManager": "hotelmanager",
+            "HotelManagementException": "hotelmanagementexception",
+            "HotelReservation": "hotelreservation", "HotelReservationRecord": "hotelreservation",
+            "HotelStay": "hotelstay", "HotelStayRecord": "hotelstay",
+            "JsonStore": "hotelstore", "JournalStore": "hotelstore",
+            "SqliteDatabase": "sqlitestore", "SqliteStore": "sqlitestore",
+            "iter_json_array": "jsonstream", "find_record": "jsonstream",
+            "bulkvalidator": "bulkvalidator",
+            "HotelService": "hotelservice",
+            "hotelaudit": "hotelaudit",
+            "Instrumentation": "hotelmetrics", "NullInstrumentation": "hotelmetrics",
+            "CodecStore": "hotelcodec",
+            "RoomKeyIndex": "roomkeyindex",
+            "BookingFilter": "bookingfilter",
+            "ShardedStore": "hotelshards",
+            "HotelArchive": "hotelarchive",
+            "HotelReport": "hotelreport",
+            "HashCache": "hashcache", "hashcache": "hashcache",
+            "DeparturesIndex": "departuresindex",
+            "parallel": "parallel"}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """ Imports a public name on first use and keeps it in the package """
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+    module = importlib.import_module("." + module_name, __name__)
+    value = module if module_name == name else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """ Lists the public names, also the ones not imported yet """
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+""" Console command of the package: python -m uc3mtravel (see hotelcli)... """
+import sys
+from .hotelcli import main
+
+sys.exit(main())
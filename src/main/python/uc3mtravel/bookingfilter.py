@@ -0,0 +1,177 @@
+""" Module with the Bloom filter of the (idCard, localizer) pairs of the bookings file... """
+import hashlib
+import math
+import mmap
+import os
+import struct
+from .hotelmanagementexception import HotelManagementException
+
+
+class BookingFilter:
+    """ Persisted Bloom filter of the (idCard, localizer) pairs of the bookings store, in a file next to the
+        bookings file (all_bookings.filter). Layout:
+            header   MAGIC, number of bits (uint64), capacity (uint64), number of hashes (uint32),
+                     number of pairs added (uint64), md5 of the signature of the bookings file covered
+            bits     the bit array
+        A pair that is not in the filter is certainly not booked, so guest_arrival rejects it without loading
+        the bookings file. Pairs in the filter may be false positives (error_rate) and are looked up in the
+        bookings store. The filter is read with mmap and updated in place on every booking; it is rebuilt (with
+        twice the capacity if it is full) when the bookings file has been written by someone else... """
+
+    MAGIC = b"UC3MBF\x01\n"
+    HEADER = struct.Struct("<8sQQIQ16s")
+
+    # Filters shared by every HotelManager of the process, see shared()...
+    __shared = {}
+
+    def __init__(self, booking_store, path_file=None, error_rate=0.01, capacity=1024):
+        self.__booking_store = booking_store
+        self.__path_file = path_file or os.path.splitext(booking_store.path)[0] + ".filter"
+        self.__error_rate = error_rate
+        self.__capacity = capacity
+        self.__map = None
+        self.__map_signature = None
+        self.__checked = None
+
+    @classmethod
+    def shared(cls, booking_store, **kwargs):
+        """ Returns the filter of this process for a bookings store """
+        key = id(booking_store)
+        if key not in BookingFilter.__shared or BookingFilter.__shared[key][0] is not booking_store:
+            BookingFilter.__shared[key] = (booking_store, cls(booking_store, **kwargs))
+        return BookingFilter.__shared[key][1]
+
+    @property
+    def path(self):
+        """ Returns the path of the filter file """
+        return self.__path_file
+
+    @property
+    def error_rate(self):
+        """ Returns the false positive rate the filter is sized for """
+        return self.__error_rate
+
+    @staticmethod
+    def size(capacity, error_rate):
+        """ Returns (number of bits, number of hashes) of a filter of capacity pairs with the error rate """
+        bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        return bits, max(1, round(bits / capacity * math.log(2)))
+
+    @staticmethod
+    def positions(id_card, localizer, bits, hashes):
+        """ Returns the bits of a pair (double hashing of one blake2b digest) """
+        digest = hashlib.blake2b((str(id_card) + "\x00" + str(localizer)).encode("UTF-8", "surrogatepass"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % bits for i in range(hashes)]
+
+    def __bookings_signature(self):
+        """ Returns the md5 of the signature of the bookings file """
+        return hashlib.md5(repr(self.__booking_store.file_signature()).encode()).digest()
+
+    def __remap(self):
+        """ Maps the filter file again if it has changed. Returns False if it does not exist """
+        try:
+            stat = os.stat(self.__path_file)
+        except FileNotFoundError:
+            self.__close()
+            return False
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != self.__map_signature:
+            self.__close()
+            with open(self.__path_file, mode="rb") as f:
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__map_signature = signature
+        return True
+
+    def __close(self):
+        """ Unmaps the filter file """
+        if self.__map is not None:
+            self.__map.close()
+        self.__map, self.__map_signature = None, None
+
+    def __header(self):
+        """ Returns (bits, capacity, hashes, count, signature) or None if the file is not valid """
+        if self.__map is None or len(self.__map) < self.HEADER.size:
+            return None
+        magic, bits, capacity, hashes, count, signature = self.HEADER.unpack_from(self.__map, 0)
+        if magic != self.MAGIC or len(self.__map) != self.HEADER.size + (bits + 7) // 8:
+            return None
+        return bits, capacity, hashes, count, signature
+
+    def __fresh(self):
+        """ Returns True if the filter covers the bookings file as it is now """
+        header = self.__header() if self.__remap() else None
+        return header is not None and header[4] == self.__bookings_signature()
+
+    def rebuild(self):
+        """ Builds the filter from all the bookings of the store, for at least twice as many pairs """
+        with self.__booking_store.transaction():
+            records = self.__booking_store.records()
+            capacity = max(self.__capacity, 2 * len(records))
+            bits, hashes = self.size(capacity, self.__error_rate)
+            array = bytearray((bits + 7) // 8)
+            for record in records:
+                try:
+                    for position in self.positions(record["idCard"], record["localizer"], bits, hashes):
+                        array[position >> 3] |= 1 << (position & 7)
+                except (KeyError, TypeError):
+                    continue
+            with open(self.__path_file + ".tmp", mode="wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, bits, capacity, hashes, len(records), self.__bookings_signature()))
+                f.write(array)
+            os.replace(self.__path_file + ".tmp", self.__path_file)
+            self.__remap()
+
+    def refresh(self):
+        """ Rebuilds the filter if the bookings file has changed since it was covered. While the bookings file
+            does not change, the filter file is not checked again """
+        signature = self.__booking_store.file_signature()
+        if signature is not None and signature == self.__checked:
+            return
+        if not self.__fresh():
+            with self.__booking_store.transaction():
+                if not self.__fresh():
+                    self.rebuild()
+        self.__checked = signature
+
+    def might_contain(self, id_card, localizer):
+        """ Returns False if the pair is certainly not in the bookings store """
+        try:
+            self.refresh()
+        except (OSError, HotelManagementException):
+            # The filter cannot be built (e.g. missing data directory): the bookings store will answer...
+            return True
+        bits, _, hashes, _, _ = self.__header()
+        view, start = self.__map, self.HEADER.size
+        return all(view[start + (position >> 3)] & (1 << (position & 7))
+                   for position in self.positions(id_card, localizer, bits, hashes))
+
+    def extend(self, bookings):
+        """ Appends bookings to the bookings store and their pairs to the filter. If the filter was up to date
+            and has room, only the bytes of the new bits and the header are written """
+        bookings = list(bookings)
+        with self.__booking_store.transaction():
+            fresh = self.__fresh()
+            self.__booking_store.extend(bookings)
+            header = self.__header() if fresh else None
+            if header is None or header[3] + len(bookings) > header[1]:
+                self.rebuild()
+                return
+            bits, capacity, hashes, count, _ = header
+            changes = {}
+            for booking in bookings:
+                try:
+                    for position in self.positions(booking["idCard"], booking["localizer"], bits, hashes):
+                        offset = position >> 3
+                        changes[offset] = changes.get(offset, self.__map[self.HEADER.size + offset]) | (1 << (position & 7))
+                except (KeyError, TypeError):
+                    continue
+            # Bits are written before the header, so an interrupted write leaves a filter that is not fresh...
+            with open(self.__path_file, mode="r+b") as f:
+                for offset, value in sorted(changes.items()):
+                    f.seek(self.HEADER.size + offset)
+                    f.write(bytes((value,)))
+                f.flush()
+                f.seek(0)
+                f.write(self.HEADER.pack(self.MAGIC, bits, capacity, hashes, count + len(bookings), self.__bookings_signature()))
+            self.__remap()
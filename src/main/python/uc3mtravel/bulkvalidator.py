@@ -0,0 +1,136 @@
+""" Module that validates the fields of many reservations at once (columns instead of one call per value)... """
+import re
+from datetime import datetime
+from .hotelmanagementexception import HotelManagementException
+try:
+    import numpy
+except ImportError:  # NumPy is optional: the luhn check is done in pure python...
+    numpy = None
+
+# Columns in the order room_reservation validates them: the first error of a row is the one reported...
+COLUMNS = ("creditCardNumber", "nameSurname", "phoneNumber", "roomType", "arrival", "numDays", "idCard")
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+# Used with fullmatch: $ would also match before a trailing newline, which the scalar validators reject...
+DNI_PATTERN = re.compile(r"[0-9]{8}[A-Z]")
+DATE_PATTERN = re.compile(r"([0-9]{2})/([0-9]{2})/([0-9]{4})")
+# Message of every scalar validator for values of a type it does not expect (the one of a wrong format)...
+TYPE_ERRORS = {"validate_credit_card": "Invalid credit card number provided. Invalid characters found.",
+               "validate_name_surname": "Invalid name surname provided (length between 10 and 50 characters and separated by space)",
+               "validate_phone_number": "Invalid phone number provided (must be 9 digits)",
+               "validate_room_type": "Invalid room type provided (must be SINGLE, DOUBLE or SUITE",
+               "validate_arrival": "Invalid arrival date provided (format must be dd/mm/yyyy",
+               "validate_num_days": "Invalid number of days provided (not a valid number)",
+               "validate_id_card": "Invalid ID Card provided. Must be valid Spanish NIF document"}
+
+
+def _scalar_errors(validator, values):
+    """ Returns the error message (or None) of every value using the scalar validator of HotelManager """
+    errors = []
+    for value in values:
+        try:
+            validator(value)
+            errors.append(None)
+        except HotelManagementException as exc:
+            errors.append(exc.message)
+        except (TypeError, ValueError):
+            # The scalar validators do not expect values of other types (e.g. an int card number for luhn)...
+            errors.append(TYPE_ERRORS[validator.__name__])
+    return errors
+
+
+def _luhn_valid(cards):
+    """ Returns the luhn check of 16 ascii digit strings, vectorized with NumPy when it is available """
+    if not cards:
+        return []
+    if numpy is not None:
+        digits = numpy.frombuffer("".join(cards).encode("ascii"), dtype=numpy.uint8).reshape(-1, 16) - 48
+        doubled = digits[:, 0::2] * 2
+        total = (doubled - 9 * (doubled > 9)).sum(axis=1) + digits[:, 1::2].sum(axis=1)
+        return (total % 10 == 0).tolist()
+    valid = []
+    for card in cards:
+        total = 0
+        for index, digit in enumerate(card):
+            value = (ord(digit) - 48) * (2 if index % 2 == 0 else 1)
+            total += value - 9 if value > 9 else value
+        valid.append(total % 10 == 0)
+    return valid
+
+
+def credit_card_errors(hotel_manager, values):
+    """ Errors of a column of credit card numbers. 16 ascii digit strings get a vectorized luhn check """
+    errors = [None] * len(values)
+    fast_rows = [row for row, value in enumerate(values) if isinstance(value, str) and len(value) == 16 and value.isascii() and value.isdigit()]
+    fast = set(fast_rows)
+    for row, valid in zip(fast_rows, _luhn_valid([values[row] for row in fast_rows])):
+        if not valid:
+            errors[row] = "Invalid credit card number provided. Not a valid number."
+    slow_rows = [row for row in range(len(values)) if row not in fast]
+    for row, error in zip(slow_rows, _scalar_errors(hotel_manager.validate_credit_card, [values[row] for row in slow_rows])):
+        errors[row] = error
+    return errors
+
+
+def id_card_errors(hotel_manager, values):
+    """ Errors of a column of id cards. DNI numbers (8 digits + letter) get the check letter computed here,
+        any other form (NIE, separators...) goes to the NIF validator of python-stdnum """
+    errors = [None] * len(values)
+    slow_rows = []
+    for row, value in enumerate(values):
+        if isinstance(value, str) and DNI_PATTERN.fullmatch(value):
+            if NIF_LETTERS[int(value[:8]) % 23] != value[8]:
+                errors[row] = "Invalid ID Card provided. Must be valid Spanish NIF document"
+        else:
+            slow_rows.append(row)
+    for row, error in zip(slow_rows, _scalar_errors(hotel_manager.validate_id_card, [values[row] for row in slow_rows])):
+        errors[row] = error
+    return errors
+
+
+def arrival_errors(hotel_manager, values):
+    """ Errors of a column of arrival dates. Every distinct date is parsed only once and dd/mm/yyyy dates are
+        checked without strptime """
+    known = {}
+    errors = []
+    for value in values:
+        try:
+            errors.append(known[value])
+            continue
+        except (KeyError, TypeError):
+            pass
+        match = DATE_PATTERN.fullmatch(value) if isinstance(value, str) else None
+        error = None
+        if match:
+            try:
+                datetime(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+            except ValueError:
+                error = "Invalid arrival date provided (format must be dd/mm/yyyy"
+        else:
+            error = _scalar_errors(hotel_manager.validate_arrival, [value])[0]
+        try:
+            known[value] = error
+        except TypeError:
+            pass
+        errors.append(error)
+    return errors
+
+
+def validate_columns(hotel_manager, columns):
+    """ Validates the reservation fields given as columns: a dict with a list (or array) per key of the bookings
+        file. Returns (valid, messages): a list of booleans and a list with the error message of every row
+        (None if valid). Messages are the ones the scalar validators of hotel_manager raise, checked in the
+        same order as room_reservation """
+    rows = len(columns[COLUMNS[0]])
+    values = {key: list(columns[key]) for key in COLUMNS}
+    for key in COLUMNS:
+        if len(values[key]) != rows:
+            raise HotelManagementException("All the columns must have the same number of rows")
+    errors = [credit_card_errors(hotel_manager, values["creditCardNumber"]),
+              _scalar_errors(hotel_manager.validate_name_surname, values["nameSurname"]),
+              _scalar_errors(hotel_manager.validate_phone_number, values["phoneNumber"]),
+              _scalar_errors(hotel_manager.validate_room_type, values["roomType"]),
+              arrival_errors(hotel_manager, values["arrival"]),
+              _scalar_errors(hotel_manager.validate_num_days, values["numDays"]),
+              id_card_errors(hotel_manager, values["idCard"])]
+    messages = [next((column[row] for column in errors if column[row] is not None), None) for row in range(rows)]
+    return [message is None for message in messages], messages
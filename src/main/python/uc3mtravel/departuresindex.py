@@ -0,0 +1,124 @@
+""" Module with the in-memory index of the stays by departure day, the checkout queue of housekeeping... """
+import threading
+from datetime import date, datetime, timedelta
+
+# Day number (proleptic ordinal) of 1970-01-01, the origin of the departure seconds...
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def departure_seconds(stay):
+    """ Returns the departure of a stay (str() of a naive datetime, with or without microseconds) as seconds
+        since 1970-01-01 00:00 without time zone, as RoomKeyIndex.departure_seconds """
+    departure = stay["departure"]
+    if not isinstance(departure, str) or len(departure) < 19 or departure[10] != " ":
+        raise ValueError("Invalid departure " + repr(departure))
+    return (datetime.fromisoformat(departure) - datetime(1970, 1, 1)).total_seconds()
+
+
+class DeparturesIndex:
+    """ Departures of the stays of a stays store (or shard): room key -> departure and departure day -> room keys
+        leaving that day. Every departure is parsed once, when its stay is indexed, so asking who leaves a day
+        or when a room key leaves is a dictionary lookup whatever the number of stays.
+        The index is built from the store on its first use and follows it: stays appended by other processes are
+        indexed incrementally, and it is built again if the store has been rewritten (e.g. archived or imported).
+        Stays appended with extend (guest_arrival) are indexed without reading the store again... """
+
+    # Indexes shared by every HotelManager of the process, see shared()...
+    __shared = {}
+
+    def __init__(self, stay_store):
+        self.__stay_store = stay_store
+        # The store can be appended in place (file stores) or must be read again when it changes...
+        self.__appendable = hasattr(stay_store, "file_signature")
+        self.__lock = threading.RLock()
+        self.__departures, self.__days = {}, {}
+        self.__count, self.__last, self.__signature = 0, None, None
+        self.__built = False
+        self.__reset()
+
+    @classmethod
+    def shared(cls, stay_store):
+        """ Returns the index of this process for a stays store """
+        key = id(stay_store)
+        if key not in DeparturesIndex.__shared or DeparturesIndex.__shared[key][0] is not stay_store:
+            DeparturesIndex.__shared[key] = (stay_store, cls(stay_store))
+        return DeparturesIndex.__shared[key][1]
+
+    @property
+    def built(self):
+        """ Returns True if the index has been built from the store (it may need a refresh) """
+        return self.__built
+
+    def __reset(self):
+        """ Empties the index """
+        self.__departures = {}
+        self.__days = {}
+        self.__count, self.__last, self.__signature = 0, None, None
+        self.__built = False
+
+    def __store_signature(self):
+        """ Returns a value that changes when the stays store changes """
+        if self.__appendable:
+            return self.__stay_store.file_signature()
+        return len(self.__stay_store)
+
+    def __fresh(self):
+        """ Returns True if the index has been built and covers the store as it is now """
+        return self.built and self.__store_signature() == self.__signature
+
+    def refresh(self):
+        """ Brings the index up to date with the stays store """
+        with self.__lock:
+            if self.__fresh():
+                return
+            signature = self.__store_signature()
+            records = self.__stay_store.records()
+            count = self.__count
+            if not self.__appendable or len(records) < count or (count and records[count - 1] != self.__last):
+                self.__reset()
+                count = 0
+            self.add(records[count:])
+            self.__count, self.__last = len(records), records[-1] if records else None
+            self.__signature, self.__built = signature, True
+
+    def add(self, stays):
+        """ Indexes some stays. A room key that is indexed again takes its new departure. Stays without a room key
+            or a valid departure are not indexed """
+        with self.__lock:
+            for stay in stays:
+                try:
+                    room_key, seconds = stay["roomKey"], departure_seconds(stay)
+                    hash(room_key)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                previous = self.__departures.get(room_key)
+                if previous is not None:
+                    self.__days[EPOCH_ORDINAL + int(previous // 86400)].pop(room_key, None)
+                self.__departures[room_key] = seconds
+                self.__days.setdefault(EPOCH_ORDINAL + int(seconds // 86400), {})[room_key] = seconds
+
+    def extend(self, writer, stays):
+        """ Appends stays with writer.extend (the store or its room key index), in the transaction of the store.
+            If the index was up to date they are indexed in place, otherwise the store is read on the next use """
+        stays = list(stays)
+        with self.__lock:
+            fresh = self.__fresh()
+            writer.extend(stays)
+            if fresh and stays:
+                self.add(stays)
+                self.__count, self.__last = self.__count + len(stays), stays[-1]
+                self.__signature = self.__store_signature()
+
+    def departure(self, room_key):
+        """ Returns the departure datetime of the (last) stay with the room key, or None if it is not indexed """
+        self.refresh()
+        seconds = self.__departures.get(room_key)
+        # Built at call time, so that it is a datetime of the same class as the others (freezegun in the tests)...
+        return None if seconds is None else datetime(1970, 1, 1) + timedelta(seconds=seconds)
+
+    def due(self, day):
+        """ Returns the room keys of the stays that leave a day (date or datetime), by departure time """
+        self.refresh()
+        with self.__lock:
+            leaving = self.__days.get(day.toordinal(), {})
+            return sorted(leaving, key=leaving.get)
@@ -0,0 +1,74 @@
+""" Module with the bounded LRU cache of the computed localizers (md5)... """
+import threading
+from collections import OrderedDict
+
+
+class HashCache:
+    """ Bounded LRU cache of hashes keyed by the tuple of the fields they are computed from. The types of the
+        fields are part of the key, so values that are equal but print differently (1, 1.0 and True) do not share
+        a hash. Thread safe; the hash is computed outside the lock... """
+
+    def __init__(self, maxsize=65536):
+        self.__maxsize = maxsize
+        self.__items = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = self.__misses = self.__evictions = 0
+
+    @staticmethod
+    def key(*fields):
+        """ Returns the canonical key of some fields (values and their types) """
+        return fields + tuple(map(type, fields))
+
+    def get(self, key, compute):
+        """ Returns the hash of the key, calling compute() to get it on a miss """
+        with self.__lock:
+            try:
+                value = self.__items[key]
+            except KeyError:
+                value = None
+            except TypeError:
+                # Fields that cannot be hashed (not valid data) are not cached...
+                key = value = None
+            if value is not None:
+                self.__items.move_to_end(key)
+                self.__hits += 1
+                return value
+            self.__misses += 1
+        value = compute()
+        if key is not None and self.__maxsize > 0:
+            with self.__lock:
+                self.__items[key] = value
+                if len(self.__items) > self.__maxsize:
+                    self.__items.popitem(last=False)
+                    self.__evictions += 1
+        return value
+
+    def resize(self, maxsize):
+        """ Changes the maximum number of hashes (0 disables the cache). The cache is emptied """
+        with self.__lock:
+            self.__maxsize = maxsize
+            self.__items.clear()
+
+    def clear(self):
+        """ Empties the cache and its statistics """
+        with self.__lock:
+            self.__items.clear()
+            self.__hits = self.__misses = self.__evictions = 0
+
+    def stats(self):
+        """ Returns hits, misses, evictions, size, maxsize and hit rate of the cache """
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {"hits": self.__hits, "misses": self.__misses, "evictions": self.__evictions,
+                    "size": len(self.__items), "maxsize": self.__maxsize,
+                    "hit_rate": self.__hits / lookups if lookups else 0.0}
+
+
+# Cache shared by every reservation of the process. Room keys are not cached: the arrival time is part of them,
+# so the room key of a new stay is never one that has been computed before...
+LOCALIZERS = HashCache()
+
+
+def stats():
+    """ Returns the statistics of the localizer cache """
+    return {"localizers": LOCALIZERS.stats()}
@@ -0,0 +1,140 @@
+""" Module with the archive of completed stays, partitioned by month... """
+import os
+import sys
+from contextlib import ExitStack
+from datetime import datetime
+from .hotelstore import JsonStore
+from .hotelcodec import CodecStore
+from .hotelmanagementexception import HotelManagementException
+
+# data file: indexed keys (the first one identifies the records of the file)
+DATA_FILES = {"all_bookings": ("idCard", "localizer"),
+              "all_stays": ("roomKey", "idCard"),
+              "all_checkouts": ("roomKey",)}
+
+
+class HotelArchive:
+    """ Archive of completed stays (stays with a checkout) in the archive subdirectory of a data directory.
+        Every month of departure is a partition with its own data files (archive/2024-06/all_stays.json...)
+        and the partition index (archive/index.ndjson) has one line per archived stay with its idCard,
+        localizer, roomKey and partition. Lookups that miss the hot data files go to the index and then only
+        to the partition of the record, so the hot files keep open bookings and guests in the hotel and do
+        not grow with the history... """
+
+    def __init__(self, path_data):
+        self.__path_archive = os.path.join(path_data, "archive", "")
+        self.__index = CodecStore.shared(self.__path_archive + "index.ndjson", ("idCard", "localizer", "roomKey"),
+                                         codec="jsonl")
+
+    @property
+    def path(self):
+        """ Returns the directory of the archive """
+        return self.__path_archive
+
+    @property
+    def index(self):
+        """ Returns the store of the partition index """
+        return self.__index
+
+    def partitions(self):
+        """ Returns the sorted list of partitions (YYYY-MM) of the archive """
+        try:
+            return sorted(name for name in os.listdir(self.__path_archive) if os.path.isdir(self.__path_archive + name))
+        except FileNotFoundError:
+            return []
+
+    def partition_store(self, partition, name):
+        """ Returns the store of a data file (all_bookings, all_stays or all_checkouts) of a partition """
+        return JsonStore.shared(os.path.join(self.__path_archive, partition, name + ".json"), DATA_FILES[name])
+
+    def find(self, name, key, value):
+        """ Returns the archived record of a data file whose key (idCard, localizer or roomKey) has the given
+            value, or None. Only the index and one partition are read """
+        entry = self.__index.find(key, value)
+        if entry is None:
+            return None
+        return self.partition_store(entry["partition"], name).find(key, value)
+
+    def archive(self, booking_store, stay_store, checkout_store, before=None):
+        """ Moves the stays with a checkout (before the datetime before, all by default), their bookings and their
+            checkouts from the stores to the partitions of their month of departure. Records are written to the
+            partitions and the index first and the hot stores are rewritten last: if the process is interrupted
+            the records are in both places and archiving again completes it. Returns the number of stays """
+        limit = None if before is None else datetime.timestamp(before)
+        with ExitStack() as stack:
+            for store in (booking_store, stay_store, checkout_store):
+                stack.enter_context(store.transaction())
+            checkouts = {}
+            for checkout in checkout_store.records():
+                if limit is None or checkout["realDeparture"] < limit:
+                    checkouts[checkout["roomKey"]] = checkout
+            stays = [stay for stay in stay_store.records() if stay.get("roomKey") in checkouts]
+            if not stays:
+                return 0
+            pairs = {(stay["idCard"], stay["localizer"]) for stay in stays}
+            bookings = {(booking.get("idCard"), booking.get("localizer")): booking for booking in booking_store.records()
+                        if (booking.get("idCard"), booking.get("localizer")) in pairs}
+            partitions = {}
+            for stay in stays:
+                records = partitions.setdefault(stay["departure"][:7], {name: [] for name in DATA_FILES})
+                if (stay["idCard"], stay["localizer"]) in bookings:
+                    records["all_bookings"].append(bookings[(stay["idCard"], stay["localizer"])])
+                records["all_stays"].append(stay)
+                records["all_checkouts"].append(checkouts[stay["roomKey"]])
+            self.__write_partitions(partitions)
+
+            room_keys = {stay["roomKey"] for stay in stays}
+            booking_store.replace(booking for booking in booking_store.records()
+                                  if (booking.get("idCard"), booking.get("localizer")) not in bookings)
+            stay_store.replace(stay for stay in stay_store.records() if stay.get("roomKey") not in room_keys)
+            checkout_store.replace(checkout for checkout in checkout_store.records()
+                                   if checkout.get("roomKey") not in room_keys)
+        return len(stays)
+
+    def __write_partitions(self, partitions):
+        """ Appends the records of every partition ({partition: {data file: records}}) and their index entries.
+            Records already archived (by an interrupted archive) are skipped """
+        try:
+            os.makedirs(self.__path_archive, exist_ok=True)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        with self.__index.transaction():
+            for partition, data_files in sorted(partitions.items()):
+                os.makedirs(self.__path_archive + partition, exist_ok=True)
+                for name, records in data_files.items():
+                    store = self.partition_store(partition, name)
+                    key = DATA_FILES[name][0]
+                    with store.transaction():
+                        store.extend(record for record in records if store.find(key, record[key]) is None)
+                self.__index.extend({"idCard": stay["idCard"], "localizer": stay["localizer"],
+                                     "roomKey": stay["roomKey"], "partition": partition}
+                                    for stay in data_files["all_stays"]
+                                    if self.__index.find("roomKey", stay["roomKey"]) is None)
+
+
+def main(argv=None):
+    """ Archiving command: python -m uc3mtravel.hotelarchive [DATA DIRECTORY] [--before DD/MM/YYYY] """
+    import argparse  # pylint: disable=import-outside-toplevel
+    # Imported here, hotelmanager imports this module...
+    from .hotelmanager import HotelManager  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(prog="python -m uc3mtravel.hotelarchive",
+                                     description="Moves completed stays to the monthly partitions of the archive")
+    parser.add_argument("path_data", nargs="?", default=None, help="data directory (default src/data of the project)")
+    parser.add_argument("--before", default=None, help="only stays with a checkout before this date (dd/mm/yyyy)")
+    args = parser.parse_args(argv)
+    try:
+        before = None if args.before is None else datetime.strptime(args.before, "%d/%m/%Y")
+    except ValueError:
+        print("Invalid date provided (format must be dd/mm/yyyy)", file=sys.stderr)
+        return 2
+    try:
+        archived = HotelManager(path_data=args.path_data).archive_completed(before)
+    except HotelManagementException as e:
+        print(e.message, file=sys.stderr)
+        return 1
+    print(str(archived) + " stays archived")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+""" Module that audits the integrity of the data files (localizers, room keys and references between them)... """
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from .hotelmanagementexception import HotelManagementException
+from .hotelmanager import HotelManager
+from .hotelreservation import HotelReservationRecord
+from .hotelstay import HotelStayRecord
+from .hotelstore import JsonStore
+from .jsonstream import iter_json_array
+from .parallel import map_ordered
+
+
+def check_bookings(chunk):
+    """ Recomputes the localizers of a chunk of (file, index, booking). Returns (mismatches, (idCard, localizer) pairs) """
+    mismatches, pairs = [], []
+    for file_name, index, booking in chunk:
+        try:
+            localizer = HotelReservationRecord.from_json(booking).localizer
+            if localizer != booking["localizer"]:
+                mismatches.append({"file": file_name, "index": index, "idCard": booking["idCard"],
+                                   "error": "Localizer does not match data inside bookings file. Data may have been altered"})
+            pairs.append((booking["idCard"], booking["localizer"]))
+        except (KeyError, TypeError, AttributeError):
+            mismatches.append({"file": file_name, "index": index, "error": "Booking with missing keys"})
+    return mismatches, pairs
+
+
+def check_stays(chunk):
+    """ Recomputes the room keys of a chunk of (file, index, stay).
+        Returns (mismatches, [(file, index, idCard, localizer, roomKey)]) """
+    mismatches, keys = [], []
+    for file_name, index, stay in chunk:
+        try:
+            if HotelStayRecord.from_json(stay).room_key != stay["roomKey"]:
+                mismatches.append({"file": file_name, "index": index, "roomKey": stay["roomKey"],
+                                   "error": "Room key does not match data inside stays file. Data may have been altered"})
+            keys.append((file_name, index, stay["idCard"], stay["localizer"], stay["roomKey"]))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            mismatches.append({"file": file_name, "index": index, "error": "Stay with missing or wrong keys"})
+    return mismatches, keys
+
+
+def data_stores(hotel_manager, name):
+    """ Returns [(file name, store)] of a data file (all_bookings, all_stays or all_checkouts) of a HotelManager:
+        every shard of its store and then the partitions of its archive. File names are relative to the data
+        directory """
+    store = getattr(hotel_manager, {"all_bookings": "booking_store", "all_stays": "stay_store",
+                                    "all_checkouts": "checkout_store"}[name])
+    stores = [(os.path.relpath(shard.path, hotel_manager.path_data), shard) for shard in HotelManager.shards_of(store)]
+    archive = hotel_manager.archive
+    if archive is not None:
+        for partition in archive.partitions():
+            partition_store = archive.partition_store(partition, name)
+            stores.append((os.path.relpath(partition_store.path, hotel_manager.path_data), partition_store))
+    return stores
+
+
+def _records(store):
+    """ Yields the records of a store. Plain json files are read as a stream, other stores (journal, other
+        storage formats, databases) through the store. A missing file has no records """
+    if type(store) is JsonStore:  # pylint: disable=unidiomatic-typecheck
+        if os.path.isfile(store.path):
+            yield from iter_json_array(store.path)
+        return
+    yield from store.records()
+
+
+def _chunks(stores, chunk_size):
+    """ Yields lists of (file name, index, record) of [(file name, store)] """
+    chunk = []
+    for file_name, store in stores:
+        for index, record in enumerate(_records(store)):
+            chunk.append((file_name, index, record))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def audit(path_data=None, workers=None, chunk_size=10000, hotel_manager=None):
+    """ Yields every integrity problem of the data files of path_data as a dict (file, index, error...):
+        - bookings whose localizer does not match their data
+        - stays whose room key does not match their data or that do not reference an existing booking
+        - checkouts whose roomKey is not in the stays file
+        The data files are the ones of hotel_manager (by default HotelManager(path_data=path_data)): every shard,
+        in its storage format or journal, and the archive. Localizers and room keys are recomputed in a pool of
+        processes; plain json files are read as streams """
+    workers = workers or os.cpu_count() or 1
+    hotel_manager = hotel_manager or HotelManager(path_data=path_data)
+    bookings, stays = set(), set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for mismatches, pairs in map_ordered(executor, check_bookings,
+                                           _chunks(data_stores(hotel_manager, "all_bookings"), chunk_size), workers):
+            yield from mismatches
+            bookings.update(pairs)
+        for mismatches, keys in map_ordered(executor, check_stays,
+                                          _chunks(data_stores(hotel_manager, "all_stays"), chunk_size), workers):
+            yield from mismatches
+            for file_name, index, id_card, localizer, room_key in keys:
+                stays.add(room_key)
+                if (id_card, localizer) not in bookings:
+                    yield {"file": file_name, "index": index, "roomKey": room_key,
+                           "error": "No reservation was found with the localizer and id card of the stay"}
+    for chunk in _chunks(data_stores(hotel_manager, "all_checkouts"), chunk_size):
+        for file_name, index, checkout in chunk:
+            room_key = checkout.get("roomKey") if isinstance(checkout, dict) else None
+            if room_key not in stays:
+                yield {"file": file_name, "index": index, "roomKey": room_key,
+                       "error": "Given room_key not found in stays file"}
+
+
+def main(argv=None):
+    """ Audit command: python -m uc3mtravel.hotelaudit [data directory] [--workers N] [--chunk-size N] [--journal]
+                                                 [--storage-format FORMAT] [--hotel ID] [--shards N]
+        Prints one json line per problem and exits with 1 if there is any """
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(prog="python -m uc3mtravel.hotelaudit", description="Integrity audit of the data files")
+    parser.add_argument("path_data", nargs="?", help="data directory (default: the one of HotelManager)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--journal", action="store_true", help="the data files are in the journal persistence mode")
+    parser.add_argument("--storage-format", default="json", help="format of the data files: json, compact, jsonl or binary")
+    parser.add_argument("--hotel", default=None, help="hotel id: its data files are in a subdirectory of the data directory")
+    parser.add_argument("--shards", type=int, default=1, help="number of shards of every data file")
+    args = parser.parse_args(argv)
+    problems = 0
+    try:
+        hotel_manager = HotelManager(journal=args.journal, storage_format=args.storage_format, path_data=args.path_data,
+                                     hotel_id=args.hotel, shards=args.shards)
+        for problem in audit(workers=args.workers, chunk_size=args.chunk_size, hotel_manager=hotel_manager):
+            problems += 1
+            print(json.dumps(problem), flush=True)
+    except HotelManagementException as e:
+        print(e.message, file=sys.stderr)
+        return 2
+    print("problems found: " + str(problems), file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+""" Command line driver of HotelManager: batches of operations read as JSON Lines from files or stdin... """
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from .hotelmanagementexception import HotelManagementException
+from .hotelmanager import HotelManager
+from .roominventory import parse_rooms
+from .parallel import map_ordered
+
+LOCALIZER_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+ROOM_KEY_PATTERN = re.compile(r'^[0-9a-fA-F]{64}$')
+DATA_FILES = {"bookings": "booking_store", "stays": "stay_store", "checkouts": "checkout_store"}
+
+
+def read_lines(sources):
+    """ Yields the lines of the files (- is stdin) in order """
+    for source in sources or ["-"]:
+        if source == "-":
+            yield from sys.stdin
+            continue
+        try:
+            with open(source, encoding="UTF-8", mode="r") as f:
+                yield from f
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+
+
+def read_records(sources):
+    """ Yields the json value of every line that is not blank ([] if a line is not valid json) """
+    for line in read_lines(sources):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield []
+
+
+def chunks(iterable, size):
+    """ Yields lists of up to size items """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def manager_options(args):
+    """ Returns the keyword arguments of HotelManager given by the global options """
+    return {"journal": args.journal, "storage_format": args.storage_format, "path_data": args.data,
+            "hotel_id": args.hotel, "shards": args.shards,
+            "inventory": None if args.inventory is None else parse_rooms(args.inventory)}
+
+
+def prepare_chunk(options, reservations):
+    """ Validates a chunk of reservations and builds their bookings with a HotelManager of the options of the
+        command. Runs in the worker processes of import """
+    return HotelManager(**options).prepare_reservations(reservations)
+
+
+def output(results, pattern, key):
+    """ Prints one json line per result: {key: value} if it matches pattern, {"error": message} otherwise.
+        Returns the number of errors """
+    errors = 0
+    for result in results:
+        if pattern.match(result):
+            print(json.dumps({key: result}))
+        else:
+            errors += 1
+            print(json.dumps({"error": result}))
+    sys.stdout.flush()
+    return errors
+
+
+def reserve(hotel_manager, args):
+    """ HM-FR-01 for every reservation (keys of the bookings file), chunk by chunk in this process """
+    errors = 0
+    for chunk in chunks(read_records(args.files), args.chunk_size):
+        errors += output(hotel_manager.room_reservations_bulk(chunk), LOCALIZER_PATTERN, "localizer")
+    return errors
+
+
+def import_reservations(hotel_manager, args):
+    """ Loads a feed of reservations: lines are parsed here, chunks are validated in a pool of processes and
+        this process is the only one that writes (one transaction and one write per chunk) """
+    workers = args.workers or os.cpu_count() or 1
+    records = chunks(read_records(args.files), args.chunk_size)
+    errors = 0
+    if workers == 1:
+        for chunk in records:
+            errors += output(hotel_manager.commit_reservations(hotel_manager.prepare_reservations(chunk)),
+                             LOCALIZER_PATTERN, "localizer")
+        return errors
+    # The rooms are only counted by this process, when the bookings are committed...
+    worker_options = dict(manager_options(args), inventory=None)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for prepared in map_ordered(executor, partial(prepare_chunk, worker_options), records, workers):
+            errors += output(hotel_manager.commit_reservations(prepared), LOCALIZER_PATTERN, "localizer")
+    return errors
+
+
+def arrive(hotel_manager, args):
+    """ HM-FR-02 for every arrival ({"Localizer": ..., "IdCard": ...}), chunk by chunk """
+    errors = 0
+    for chunk in chunks(read_lines(args.files), args.chunk_size):
+        errors += output(hotel_manager.guest_arrivals_bulk(chunk), ROOM_KEY_PATTERN, "roomKey")
+    return errors
+
+
+def checkout(hotel_manager, args):
+    """ HM-FR-03 for every checkout ({"roomKey": ...}) """
+    errors = 0
+    for record in read_records(args.files):
+        try:
+            room_key = record["roomKey"]
+            if not isinstance(room_key, str):
+                raise TypeError
+            hotel_manager.guest_checkout(room_key)
+            result = room_key
+        except (KeyError, TypeError):
+            result = "Input data file is not a correct json format: incorrect key values"
+        except HotelManagementException as exc:
+            result = exc.message
+        errors += output([result], ROOM_KEY_PATTERN, "roomKey")
+    return errors
+
+
+def due(hotel_manager, args):
+    """ Prints the room keys of the stays that leave a day (today by default) and have not checked out yet.
+        With --checkout, checks out every stay that leaves today and prints their room keys """
+    if args.checkout:
+        room_keys = hotel_manager.guest_checkouts_due()
+    else:
+        try:
+            day = None if args.day is None else datetime.strptime(args.day, "%d/%m/%Y").date()
+        except ValueError as e:
+            raise HotelManagementException("Invalid date. Use dd/mm/yyyy") from e
+        room_keys = hotel_manager.departures_due(day)
+    return output(room_keys, ROOM_KEY_PATTERN, "roomKey")
+
+
+def export(hotel_manager, args):
+    """ Writes the records of a data file as JSON Lines to a file or stdout """
+    records = getattr(hotel_manager, DATA_FILES[args.data_file]).records()
+    lines = "".join(json.dumps(record) + "\n" for record in records)
+    if args.output is None:
+        sys.stdout.write(lines)
+        return 0
+    try:
+        with open(args.output, encoding="UTF-8", mode="w") as f:
+            f.write(lines)
+    except FileNotFoundError as e:
+        raise HotelManagementException("Wrong file or file path") from e
+    return 0
+
+
+def main(argv=None):
+    """ Console command: uc3mtravel [options] {reserve,arrive,checkout,import,due,export} ...
+        Every input line gets one output line: {"localizer"|"roomKey": ...} or {"error": message}.
+        Exits with 1 if any line failed and with 2 if the options are wrong """
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(prog="uc3mtravel", description="Batch driver of the hotel operations (JSON Lines)")
+    parser.add_argument("--journal", action="store_true", help="use the journal persistence mode")
+    parser.add_argument("--storage-format", default="json", help="format of the data files: json, compact, jsonl or binary")
+    parser.add_argument("--data", default=None, help="directory of the data files")
+    parser.add_argument("--hotel", default=None, help="hotel id: its data files are in a subdirectory of the data directory")
+    parser.add_argument("--shards", type=int, default=1, help="number of shards of every data file")
+    parser.add_argument("--inventory", default=None, help="rooms per room type, e.g. SINGLE=20,DOUBLE=10 (default unlimited)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, function, help_text in (("reserve", reserve, "book rooms (one reservation per line)"),
+                                      ("import", import_reservations, "load a feed of reservations with a pool of processes"),
+                                      ("arrive", arrive, "register arrivals (Localizer and IdCard per line)"),
+                                      ("checkout", checkout, "register checkouts (roomKey per line)")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("files", nargs="*", help="JSON Lines files (default or - is stdin)")
+        command.add_argument("--chunk-size", type=int, default=1000, help="lines stored in one write")
+        command.set_defaults(function=function)
+        if name == "import":
+            command.add_argument("--workers", type=int, default=None, help="validation processes (default one per cpu)")
+    command = commands.add_parser("due", help="room keys of the stays that leave a day and have not checked out")
+    command.add_argument("--day", default=None, help="departure day dd/mm/yyyy (default today)")
+    command.add_argument("--checkout", action="store_true", help="check out every stay that leaves today")
+    command.set_defaults(function=due)
+    command = commands.add_parser("export", help="write the records of a data file as JSON Lines")
+    command.add_argument("data_file", choices=sorted(DATA_FILES))
+    command.add_argument("--output", default=None, help="output file (default stdout)")
+    command.set_defaults(function=export)
+    args = parser.parse_args(argv)
+    try:
+        hotel_manager = HotelManager(**manager_options(args))
+    except HotelManagementException as e:
+        print(e.message, file=sys.stderr)
+        return 2
+    try:
+        errors = args.function(hotel_manager, args)
+    except HotelManagementException as e:
+        print(e.message, file=sys.stderr)
+        return 1
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
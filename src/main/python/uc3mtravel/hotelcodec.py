@@ -0,0 +1,367 @@
+""" Module with the on-disk formats (codecs) of the data files and the store that uses them... """
+import json
+import os
+import struct
+import sys
+from .hotelmanagementexception import HotelManagementException
+from .hotelstore import JsonStore
+
+
+class JsonCodec:
+    """ Original format: a json array with indent=4 """
+
+    name = "json"
+    extension = ".json"
+    append_only = False
+
+    def dumps(self, records):
+        """ Returns the content of a file with the records """
+        return json.dumps(records, indent=4).encode("UTF-8")
+
+    def loads(self, content):
+        """ Returns (records, size of the content that holds them). Raises ValueError if it is not valid """
+        records = json.loads(content)
+        if not isinstance(records, list):
+            raise ValueError("Not a list of records")
+        return records, len(content)
+
+    def append_to(self, f, records):
+        """ Appends records in place to a file open in r+b mode with the content of dumps() """
+        f.seek(-2, os.SEEK_END)
+        if f.read(2) != b"\n]":
+            raise ValueError("Not an indent=4 json array")
+        f.seek(-2, os.SEEK_END)
+        f.write(("".join(",\n" + "\n".join("    " + line for line in json.dumps(record, indent=4).split("\n"))
+                         for record in records) + "\n]").encode("UTF-8"))
+
+
+class CompactJsonCodec(JsonCodec):
+    """ Json array without white space """
+
+    name = "compact"
+    extension = ".min.json"
+
+    def dumps(self, records):
+        """ Returns the content of a file with the records """
+        return json.dumps(records, separators=(",", ":")).encode("UTF-8")
+
+    def append_to(self, f, records):
+        """ Appends records in place: the closing bracket is replaced by the new records """
+        f.seek(-2, os.SEEK_END)
+        end = f.read(2)
+        if end[-1:] != b"]":
+            raise ValueError("Not a compact json array")
+        f.seek(-1, os.SEEK_END)
+        chunk = ",".join(json.dumps(record, separators=(",", ":")) for record in records) + "]"
+        f.write(chunk.encode("UTF-8") if end == b"[]" else ("," + chunk).encode("UTF-8"))
+
+
+class JsonLinesCodec:
+    """ JSON Lines: one compact json record per line. New records are appended at the end of the file """
+
+    name = "jsonl"
+    extension = ".ndjson"
+    append_only = True
+
+    def dumps(self, records):
+        """ Returns the content of a file with the records """
+        return "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records).encode("UTF-8")
+
+    def loads(self, content):
+        """ Returns (records, size of the complete lines). A last line without a new line is a record if it is
+            complete json (file edited by hand), otherwise it is a torn line (crash during an append) and ignored """
+        end = content.rfind(b"\n") + 1
+        try:
+            # One parse of all the lines as an array is much faster than one parse per line...
+            records = json.loads(b"[" + content[:end - 1].replace(b"\n", b",") + b"]") if end else []
+        except ValueError:
+            records = [json.loads(line) for line in content[:end].splitlines() if line.strip()]
+        if content[end:].strip():
+            try:
+                records.append(json.loads(content[end:]))
+            except ValueError:
+                return records, end
+            end = len(content)
+        return records, end
+
+    def loads_appended(self, content):
+        """ Returns (records, size) of content appended to a file """
+        return self.loads(content)
+
+    def append_to(self, f, records):
+        """ Appends records at the end of a file open in r+b mode, after the new line its last record may lack """
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(self.dumps(records))
+
+
+class BinaryCodec:
+    """ Binary format. The file starts with MAGIC and each record is <length uint32><schema uint8><fields>.
+        Records with the keys (in order) of a booking, a stay or a checkout are stored without their keys:
+        strings as <length uint16><UTF-8>, localizers and room keys as raw 16/32 byte digests and the real
+        departure as a float64. Any other record is stored as compact json (schema 0), so every record
+        round-trips to the same json """
+
+    name = "binary"
+    extension = ".bin"
+    append_only = True
+
+    MAGIC = b"UC3MHM\x01\n"
+    HEADER = struct.Struct("<IB")
+    LENGTH = struct.Struct("<H")
+    FLOAT = struct.Struct("<d")
+    # Fields of every schema: "s" string, "m" md5 digest (localizer), "k" sha256 digest (room key), "d" float64...
+    SCHEMAS = {1: (("creditCardNumber", "s"), ("idCard", "s"), ("nameSurname", "s"), ("phoneNumber", "s"),
+                   ("roomType", "s"), ("arrival", "s"), ("numDays", "s"), ("localizer", "m")),
+               2: (("alg", "s"), ("idCard", "s"), ("localizer", "m"), ("roomType", "s"), ("arrival", "s"),
+                   ("departure", "s"), ("roomKey", "k")),
+               3: (("roomKey", "k"), ("realDeparture", "d"))}
+
+    def __init__(self):
+        self.__schema_ids = {tuple(key for key, _ in fields): schema for schema, fields in self.SCHEMAS.items()}
+
+    def encode_record(self, record):
+        """ Returns the bytes of one record (header included) """
+        schema = self.__schema_ids.get(tuple(record)) if isinstance(record, dict) else None
+        if schema is not None:
+            try:
+                payload = self.__encode_fields(self.SCHEMAS[schema], record)
+            except (TypeError, ValueError, struct.error):
+                schema = None
+        if schema is None:
+            schema, payload = 0, json.dumps(record, separators=(",", ":")).encode("UTF-8")
+        return self.HEADER.pack(len(payload), schema) + payload
+
+    def __encode_fields(self, fields, record):
+        """ Returns the payload of a record with a schema. Raises ValueError if a value does not fit its field """
+        parts = []
+        for key, kind in fields:
+            value = record[key]
+            if kind == "s":
+                if not isinstance(value, str):
+                    raise ValueError("Not a string")
+                data = value.encode("UTF-8")
+                parts.append(self.LENGTH.pack(len(data)) + data)
+            elif kind == "d":
+                if not isinstance(value, float):
+                    raise ValueError("Not a float")
+                parts.append(self.FLOAT.pack(value))
+            else:
+                digest = bytes.fromhex(value)
+                # Only lowercase hex digests of the right size can be restored as they were...
+                if len(digest) != (16 if kind == "m" else 32) or digest.hex() != value:
+                    raise ValueError("Not a digest")
+                parts.append(digest)
+        return b"".join(parts)
+
+    def decode_record(self, schema, payload):
+        """ Returns the record of a payload. Raises ValueError if the payload does not have the fields of its
+            schema (corrupted file) """
+        if schema == 0:
+            return json.loads(payload)
+        record, pos = {}, 0
+        try:
+            for key, kind in self.SCHEMAS[schema]:
+                if kind == "s":
+                    length = self.LENGTH.unpack_from(payload, pos)[0]
+                    record[key] = payload[pos + 2:pos + 2 + length].decode("UTF-8")
+                    pos += 2 + length
+                elif kind == "d":
+                    record[key] = self.FLOAT.unpack_from(payload, pos)[0]
+                    pos += 8
+                else:
+                    record[key] = payload[pos:pos + (16 if kind == "m" else 32)].hex()
+                    pos += 16 if kind == "m" else 32
+        except struct.error as e:
+            raise ValueError("Corrupted binary record") from e
+        if pos != len(payload):
+            raise ValueError("Corrupted binary record")
+        return record
+
+    def dumps(self, records):
+        """ Returns the content of a file with the records """
+        return self.MAGIC + b"".join(self.encode_record(record) for record in records)
+
+    def loads(self, content):
+        """ Returns (records, size of the complete records). A torn last record is ignored """
+        if content[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError("Not a binary data file")
+        records, size = self.loads_appended(content[len(self.MAGIC):])
+        return records, len(self.MAGIC) + size
+
+    def loads_appended(self, content):
+        """ Returns (records, size) of content appended to a file (records without the magic) """
+        content = memoryview(content)
+        records, pos, size = [], 0, len(content)
+        while pos + self.HEADER.size <= size:
+            length, schema = self.HEADER.unpack_from(content, pos)
+            end = pos + self.HEADER.size + length
+            if end > size:
+                break
+            if schema not in self.SCHEMAS and schema != 0:
+                raise ValueError("Unknown record schema")
+            records.append(self.decode_record(schema, bytes(content[pos + self.HEADER.size:end])))
+            pos = end
+        return records, pos
+
+    def append_to(self, f, records):
+        """ Appends records at the end of a file open in r+b mode """
+        f.seek(0, os.SEEK_END)
+        f.write(b"".join(self.encode_record(record) for record in records))
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), CompactJsonCodec(), JsonLinesCodec(), BinaryCodec())}
+
+
+def get_codec(name):
+    """ Returns the codec of a storage format: json, compact, jsonl or binary """
+    try:
+        return CODECS[name]
+    except (KeyError, TypeError) as e:
+        raise HotelManagementException("Unknown storage format " + str(name) + ". Use one of " + ", ".join(CODECS)) from e
+
+
+def codec_of(path_file):
+    """ Returns the codec of a file from its extension (.json is the original format) """
+    for codec in sorted(CODECS.values(), key=lambda codec: -len(codec.extension)):
+        if path_file.endswith(codec.extension):
+            return codec
+    raise HotelManagementException("Unknown storage format of " + path_file)
+
+
+class CodecStore(JsonStore):
+    """ Indexed store whose file uses one of the codecs. New records are appended in place and, for the
+        append-only codecs (jsonl, binary), records appended by other processes are read incrementally... """
+
+    def __init__(self, path_file, index_keys, codec="compact", lock_timeout=30.0):
+        super().__init__(path_file, index_keys, lock_timeout)
+        self.__codec = get_codec(codec)
+        self.__valid_size = None
+
+    @property
+    def codec(self):
+        """ Returns the codec of the file """
+        return self.__codec
+
+    def _load_records(self):
+        """ Reads the file. Returns the records and whether new records can be appended in place """
+        try:
+            with open(self.path, mode="rb") as f:
+                content = f.read()
+            records, self.__valid_size = self.__codec.loads(content)
+        except (FileNotFoundError, ValueError):
+            self.__valid_size = None
+            return [], False
+        return records, True
+
+    def _load_increment(self, old_signature, new_signature):
+        """ Returns the records appended to the file since it had old_signature (append-only codecs), or None if
+            it must be reloaded """
+        if not self.__codec.append_only or self.__valid_size is None or old_signature[0] != new_signature[0] \
+                or new_signature[2] <= old_signature[2]:
+            return None
+        try:
+            with open(self.path, mode="rb") as f:
+                f.seek(self.__valid_size)
+                content = f.read()
+            records, size = self.__codec.loads_appended(content)
+        except (OSError, ValueError):
+            return None
+        self.__valid_size += size
+        return records
+
+    def _persist(self, records):
+        """ Appends the new records to the file. A torn last record (crash during an append) is removed first,
+            a complete one is kept.
+            Falls back to rewriting the whole file when it is missing or not valid """
+        if self.__valid_size is None:
+            self._write_all(self._current_records() + records)
+            return
+        try:
+            with open(self.path, mode="r+b") as f:
+                if self.__codec.append_only:
+                    f.truncate(self.__valid_size)
+                self.__codec.append_to(f, records)
+                self.__valid_size = f.tell()
+        except (FileNotFoundError, OSError, ValueError):
+            self._write_all(self._current_records() + records)
+
+    def _write_all(self, records):
+        """ Rewrites the whole file atomically (temporary file + rename) """
+        content = self.__codec.dumps(records)
+        try:
+            with open(self.path + ".tmp", mode="wb") as f:
+                f.write(content)
+            os.replace(self.path + ".tmp", self.path)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        self.__valid_size = len(content)
+
+
+def convert(source, target, source_format=None, target_format=None):
+    """ Converts a data file between storage formats (by default the ones of the file extensions).
+        Returns the number of records """
+    source_codec = get_codec(source_format) if source_format else codec_of(source)
+    target_codec = get_codec(target_format) if target_format else codec_of(target)
+    try:
+        with open(source, mode="rb") as f:
+            content = f.read()
+    except FileNotFoundError as e:
+        raise HotelManagementException("Wrong file or file path") from e
+    try:
+        records, size = source_codec.loads(content)
+    except ValueError as e:
+        raise HotelManagementException("Data file is not in " + source_codec.name + " format") from e
+    if size != len(content):
+        raise HotelManagementException("Data file ends with an incomplete record")
+    try:
+        with open(target + ".tmp", mode="wb") as f:
+            f.write(target_codec.dumps(records))
+        os.replace(target + ".tmp", target)
+    except FileNotFoundError as e:
+        raise HotelManagementException("Wrong file or file path") from e
+    return len(records)
+
+
+def convert_data(path_data, target_format, source_format="json"):
+    """ Converts the data files of a directory (all_bookings, all_stays, all_checkouts) to another format.
+        Missing files are skipped. Returns the number of records of every converted file """
+    source_codec, target_codec = get_codec(source_format), get_codec(target_format)
+    converted = {}
+    for name in ("all_bookings", "all_stays", "all_checkouts"):
+        source = os.path.join(path_data, name + source_codec.extension)
+        if os.path.isfile(source):
+            target = os.path.join(path_data, name + target_codec.extension)
+            converted[target] = convert(source, target, source_codec.name, target_codec.name)
+    return converted
+
+
+def main(argv=None):
+    """ Conversion command: python -m uc3mtravel.hotelcodec SOURCE TARGET [--from FORMAT] [--to FORMAT]
+        Formats are taken from the extensions unless given. With a directory as SOURCE, its data files are
+        converted to the format TARGET """
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(prog="python -m uc3mtravel.hotelcodec", description="Converts data files between formats")
+    parser.add_argument("source", help="data file or data directory")
+    parser.add_argument("target", help="data file, or format (" + ", ".join(CODECS) + ") for a directory")
+    parser.add_argument("--from", dest="source_format", default=None)
+    parser.add_argument("--to", dest="target_format", default=None)
+    args = parser.parse_args(argv)
+    try:
+        if os.path.isdir(args.source):
+            converted = convert_data(args.source, args.target, args.source_format or "json")
+        else:
+            converted = {args.target: convert(args.source, args.target, args.source_format, args.target_format)}
+    except HotelManagementException as e:
+        print(e.message, file=sys.stderr)
+        return 1
+    for target, count in converted.items():
+        print(target + ": " + str(count) + " records")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
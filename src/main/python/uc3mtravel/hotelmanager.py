@@ -3,19 +3,189 @@ import json
 import re
 import os
 from datetime import datetime
-from pathlib import Path
-import luhn
-from stdnum import es
-from .hotelreservation import HotelReservation
+from .hotelreservation import HotelReservation, HotelReservationRecord
 from .hotelstay import HotelStay
+from .hotelstore import JsonStore, JournalStore
+from .hotelcodec import CodecStore, get_codec
+from .roomkeyindex import RoomKeyIndex
+from .bookingfilter import BookingFilter
+from .hotelshards import ShardedStore
+from .hotelarchive import HotelArchive
+from .roominventory import RoomInventory
+from .departuresindex import DeparturesIndex
 from .hotelmanagementexception import HotelManagementException
+from .hotelmetrics import NullInstrumentation, instrumented
+
+# Patterns compiled once when the module is loaded...
+HOTEL_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+NAME_SURNAME_PATTERN = re.compile(r'\S+')
+ROOM_KEY_PATTERN = re.compile(r'^[0-9a-fA-F]{64}$')
 
 
 class HotelManager:
     """ Main class to manage hotel operations. Includes the exposed methods... """
 
-    def __init__(self):
-        self.__path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+    def __init__(self, booking_store=None, stay_store=None, checkout_store=None, journal=False,
+                 instrumentation=None, storage_format="json", room_key_index=True,
+                 booking_filter=True, filter_error_rate=0.01, path_data=None, hotel_id=None, shards=1,
+                 archive=None, inventory=None, departures_index=True):
+        """ Stores can be injected. Otherwise the json stores of the process over the data files are used (their
+            indexes are kept between instances), in journal mode (append-only JSON Lines journal + periodic
+            compaction) if journal is True.
+            path_data is the directory of the data files (by default src/data of the project). With a hotel_id,
+            the data files of the hotel are in its own subdirectory of path_data.
+            With shards > 1 every data file is split in that many files (all_bookings.0.json...): bookings and
+            stays by the hash of idCard, checkouts by the hash of roomKey (see hotelshards).
+            storage_format selects the format of the data files: json (indent=4), compact, jsonl or binary
+            (see hotelcodec). Files of other formats have their own extension, e.g. all_bookings.bin.
+            Spans of the operations are recorded in instrumentation (hotelmetrics.Instrumentation) if given.
+            If room_key_index is True, stays of file stores are also indexed by room key in a sorted file read
+            with mmap (see roomkeyindex), so that guest_checkout does not load the stays file.
+            If booking_filter is True, the (idCard, localizer) pairs of file stores are also kept in a Bloom filter
+            with a false positive rate of filter_error_rate (see bookingfilter), so that guest_arrival rejects
+            unknown pairs without loading the bookings file. It only helps cold lookups: once the bookings file is
+            in memory, arrivals are looked up in its index.
+            archive is the archive of completed stays (hotelarchive.HotelArchive) where the lookups that miss the
+            stores go. By default it is the one of path_data, unless some store is injected.
+            inventory is the number of rooms of every room type, e.g. {"SINGLE": 20, "DOUBLE": 10}: bookings are
+            refused when there is no free room of their type some night of the stay (see roominventory). Room
+            types that are not in it are not limited.
+            If departures_index is True, the departures of the stays are also kept in memory by room key and by day
+            (see departuresindex), for the pre-check of guest_checkout and the stays that leave a day """
+        self.__path_data = self.get_path_data(path_data, hotel_id)
+        if not isinstance(shards, int) or isinstance(shards, bool) or shards < 1:
+            raise HotelManagementException("Number of shards must be a positive integer")
+        codec = get_codec(storage_format)
+        if codec.name == "json":
+            store_class = JournalStore if journal else JsonStore
+
+            def shared(name, index_keys):
+                return store_class.shared(self.__path_data + name + ".json", index_keys)
+        else:
+            if journal:
+                raise HotelManagementException("Journal mode is only available with the json storage format")
+
+            def shared(name, index_keys):
+                return CodecStore.shared(self.__path_data + name + codec.extension, index_keys, codec=codec.name)
+
+        def sharded(name, index_keys, shard_key):
+            if shards == 1:
+                return shared(name, index_keys)
+            return ShardedStore([shared(name + "." + str(shard), index_keys) for shard in range(shards)], shard_key)
+        if archive is None and booking_store is None and stay_store is None and checkout_store is None:
+            archive = HotelArchive(self.__path_data)
+        if booking_store is None:
+            booking_store = sharded("all_bookings", ("idCard", "localizer"), "idCard")
+        if stay_store is None:
+            stay_store = sharded("all_stays", ("roomKey", "idCard"), "idCard")
+        if checkout_store is None:
+            checkout_store = sharded("all_checkouts", ("roomKey",), "roomKey")
+        self.__booking_store = booking_store
+        self.__stay_store = stay_store
+        self.__checkout_store = checkout_store
+        self.__use_room_key_index = room_key_index
+        self.__use_booking_filter = booking_filter
+        self.__use_departures_index = departures_index
+        self.__filter_error_rate = filter_error_rate
+        self.__instrumentation = instrumentation or NullInstrumentation()
+        self.__archive = archive
+        self.__inventory = None if inventory is None else RoomInventory.shared(booking_store, inventory)
+
+    @staticmethod
+    def get_path_data(path_data=None, hotel_id=None):
+        """ Returns the directory of the data files (ending with a separator). The directory of a hotel is created
+            if the data directory exists """
+        path_data = os.path.join(path_data or os.path.expanduser("~") + "/PycharmProjects/G89.2024.T00.GE2/src/data/", "")
+        if hotel_id is None:
+            return path_data
+        if not isinstance(hotel_id, str) or not HOTEL_ID_PATTERN.match(hotel_id):
+            raise HotelManagementException("Invalid hotel id. Use up to 64 letters, digits, - or _")
+        if os.path.isdir(path_data):
+            os.makedirs(path_data + hotel_id, exist_ok=True)
+        return os.path.join(path_data, hotel_id, "")
+
+    @staticmethod
+    def shard(store, value):
+        """ Returns the store of the records with a value of the shard key (the store itself if not sharded) """
+        return store.shard_for(value) if isinstance(store, ShardedStore) else store
+
+    @staticmethod
+    def shards_of(store):
+        """ Returns the list of stores behind a store (its shards, or the store itself if not sharded) """
+        return store.shards if isinstance(store, ShardedStore) else [store]
+
+    @staticmethod
+    def split(store, records):
+        """ Returns [(store, records)] of some records to be stored, grouped by shard if the store is sharded """
+        return store.split(records) if isinstance(store, ShardedStore) else [(store, list(records))]
+
+    def room_key_index(self, stay_store):
+        """ Returns the room key index of a stays store (or shard), None if it has none """
+        if self.__use_room_key_index and hasattr(stay_store, "file_signature"):
+            return RoomKeyIndex.shared(stay_store)
+        return None
+
+    def departures_index(self, stay_store):
+        """ Returns the departures index of a stays store (or shard), None if it has none """
+        if self.__use_departures_index:
+            return DeparturesIndex.shared(stay_store)
+        return None
+
+    def booking_filter(self, booking_store):
+        """ Returns the booking filter of a bookings store (or shard), None if it has none """
+        if self.__use_booking_filter and hasattr(booking_store, "file_signature"):
+            return BookingFilter.shared(booking_store, error_rate=self.__filter_error_rate)
+        return None
+
+    def find_archived(self, name, key, value):
+        """ Returns the archived record of a data file (all_bookings, all_stays or all_checkouts) whose key has
+            the given value, or None if there is none or no archive """
+        if self.__archive is None:
+            return None
+        with self.__instrumentation.span("archive.lookup"):
+            return self.__archive.find(name, key, value)
+
+    def archive_completed(self, before=None):
+        """ Moves the completed stays (with a checkout before the datetime before, all by default), their bookings
+            and checkouts to the monthly partitions of the archive. Returns the number of stays archived """
+        if self.__archive is None:
+            raise HotelManagementException("There is no archive for the stores of this manager")
+        return self.__archive.archive(self.__booking_store, self.__stay_store, self.__checkout_store, before)
+
+    @property
+    def path_data(self):
+        """ Returns the directory of the data files """
+        return self.__path_data
+
+    @property
+    def instrumentation(self):
+        """ Returns the instrumentation where the spans of the operations are recorded """
+        return self.__instrumentation
+
+    @property
+    def inventory(self):
+        """ Returns the room inventory or None if rooms are not limited """
+        return self.__inventory
+
+    @property
+    def archive(self):
+        """ Returns the archive of completed stays or None """
+        return self.__archive
+
+    @property
+    def booking_store(self):
+        """ Returns the store (repository) of bookings indexed by idCard and localizer """
+        return self.__booking_store
+
+    @property
+    def stay_store(self):
+        """ Returns the store of stays indexed by roomKey and idCard """
+        return self.__stay_store
+
+    @property
+    def checkout_store(self):
+        """ Returns the store of checkouts indexed by roomKey """
+        return self.__checkout_store
 
     def read_data_from_json(self, fi, mode):
         """ Opens input json file with data of the booking, checks formats and returns data... """
@@ -45,6 +215,8 @@ class HotelManager:
             raise HotelManagementException("Invalid credit card number provided. Invalid characters found.")
         if len(str(credit_card_number)) != 16:
             raise HotelManagementException("Invalid credit card number provided. Invalid length.")
+        # Imported on first use, operations that do not validate (e.g. guest_checkout) do not load it...
+        import luhn  # pylint: disable=import-outside-toplevel
         if not luhn.verify(credit_card_number):
             raise HotelManagementException("Invalid credit card number provided. Not a valid number.")
 
@@ -53,7 +225,7 @@ class HotelManager:
             Between 10 and 50 characters with at least two strings separated by white space """
         if len(name_surname) < 10 or len(name_surname) > 50:
             raise HotelManagementException("Invalid name surname provided (length between 10 and 50 characters and separated by space)")
-        if len(re.findall(r'\S+', name_surname)) < 2:
+        if len(NAME_SURNAME_PATTERN.findall(name_surname)) < 2:
             raise HotelManagementException("Invalid name surname provided (length between 10 and 50 characters and separated by space)")
 
     def validate_phone_number(self, phone_number):
@@ -88,20 +260,47 @@ class HotelManager:
 
     def validate_id_card(self, id_card):
         """ Validates an id according to Spanish identity cards (N.I.F. algorithm). Uses python-stdnum library """
+        # Imported on first use, like luhn...
+        from stdnum import es  # pylint: disable=import-outside-toplevel
         if not  es.nif.is_valid(id_card):
             raise HotelManagementException("Invalid ID Card provided. Must be valid Spanish NIF document")
 
+    @instrumented("room_reservation")
     def room_reservation(self, credit_card, id_card, name_surname, phone_number, room_type, arrival, num_days):
         """ HM-FR-01: Register a room reservation. Receive booking info and return a code to enter the room """
 
+        # Check formats and validity, get localizer...
+        booking_data = self.get_booking_data(credit_card, id_card, name_surname, phone_number, room_type, arrival, num_days)
+
+        # Save to bookings store. Before saving we check that the client does not have another booking...
+        with self.__instrumentation.span("room_reservation.load"):
+            booking_store = self.shard(self.__booking_store, booking_data["idCard"])
+            booking_store.refresh()
+        # With an inventory every shard is locked, the rooms are shared by the bookings of all of them...
+        with (booking_store if self.__inventory is None else self.__booking_store).transaction():
+            with self.__instrumentation.span("room_reservation.lookup"):
+                booked = booking_store.find("idCard", booking_data["idCard"]) is not None or \
+                    self.find_archived("all_bookings", "idCard", booking_data["idCard"]) is not None
+            if booked:
+                raise HotelManagementException("Client already has a reservation")
+            self.reserve_rooms(booking_data)
+            with self.__instrumentation.span("room_reservation.persist"):
+                self.extend_bookings([booking_data])
+
+        return booking_data["localizer"]
+
+    def get_booking_data(self, credit_card, id_card, name_surname, phone_number, room_type, arrival, num_days):
+        """ Validates the booking info and returns the booking record (json + localizer) to be stored """
+
         # Check formats and validity...
-        self.validate_credit_card(credit_card)
-        self.validate_name_surname(name_surname)
-        self.validate_phone_number(phone_number)
-        self.validate_room_type(room_type)
-        self.validate_arrival(arrival)
-        self.validate_num_days(num_days)
-        self.validate_id_card(id_card)
+        with self.__instrumentation.span("room_reservation.validate"):
+            self.validate_credit_card(credit_card)
+            self.validate_name_surname(name_surname)
+            self.validate_phone_number(phone_number)
+            self.validate_room_type(room_type)
+            self.validate_arrival(arrival)
+            self.validate_num_days(num_days)
+            self.validate_id_card(id_card)
 
         # Create object HotelReservation...
         reservation = HotelReservation(id_card=id_card, credit_card_number=credit_card,
@@ -109,21 +308,102 @@ class HotelManager:
                                        room_type=room_type, arrival=arrival, num_days=num_days)
 
         # Get localizer and store information of reservation in reservations file for further processing...
-        booking_data = reservation.json
-        booking_data["localizer"] = reservation.localizer
-
-        # Save to bookings file. Before saving to the file we check that the client does not have another booking...
-        path_file_bookings = self.__path_data + "all_bookings.json"
-        all_bookings = []
-        if os.path.isfile(path_file_bookings):
-            all_bookings = self.read_data_from_json(path_file_bookings, "r")
-        for booking in all_bookings:
-            if booking["idCard"] == booking_data["idCard"]:
-                raise HotelManagementException("Client already has a reservation")
-        all_bookings.append(booking_data)
-        self.write_data_to_json(path_file_bookings, all_bookings, "w")
-
-        return booking_data["localizer"]
+        with self.__instrumentation.span("room_reservation.hash"):
+            booking_data = reservation.json
+            booking_data["localizer"] = reservation.localizer
+        return booking_data
+
+    def reserve_rooms(self, booking_data):
+        """ Checks that there is a free room of the type of a booking every night of the stay and counts it in the
+            inventory. Called inside the transaction of the bookings store, before extend_bookings """
+        if self.__inventory is None:
+            return
+        with self.__instrumentation.span("room_reservation.inventory"):
+            available = self.__inventory.available(booking_data["roomType"], booking_data["arrival"], booking_data["numDays"])
+        if not available:
+            raise HotelManagementException("No rooms of the requested type are available for the requested dates")
+        self.__inventory.add([booking_data])
+
+    def extend_bookings(self, bookings):
+        """ Stores new bookings in the bookings store (in their shards) and in the booking filters if there are.
+            The inventory, if any, takes note of them (they have been counted by reserve_rooms) """
+        try:
+            for booking_store, records in self.split(self.__booking_store, bookings):
+                booking_filter = self.booking_filter(booking_store)
+                (booking_store if booking_filter is None else booking_filter).extend(records)
+        except BaseException:
+            if self.__inventory is not None:
+                self.__inventory.invalidate()
+            raise
+        if self.__inventory is not None:
+            self.__inventory.synced(bookings)
+
+    def validate_reservation_columns(self, columns):
+        """ Validates many reservations at once. columns is a dict with a list (or array) per key of the bookings
+            file. Returns a list of booleans and a list with the error message (or None) of every row """
+        # Imported here, bulkvalidator loads NumPy...
+        from .bulkvalidator import validate_columns  # pylint: disable=import-outside-toplevel
+        return validate_columns(self, columns)
+
+    @instrumented("room_reservations_bulk")
+    def room_reservations_bulk(self, reservations):
+        """ HM-FR-01 for a batch of reservations. Each reservation is a dict with the keys of the bookings file
+            (creditCardNumber, idCard, nameSurname, phoneNumber, roomType, arrival, numDays).
+            All are validated by columns, checked for duplicates (in the store and in the batch) and stored in
+            one write. Returns a list with the localizer or the error message of every reservation, in order """
+        return self.commit_reservations(self.prepare_reservations(reservations))
+
+    def prepare_reservations(self, reservations):
+        """ First step of room_reservations_bulk: validates the reservations by columns and builds their bookings
+            (with localizer) without using the stores, so it can run in other processes (see hotelcli).
+            Returns a list with the booking record or the error message of every reservation, in order """
+        from .bulkvalidator import COLUMNS as BOOKING_COLUMNS  # pylint: disable=import-outside-toplevel
+        reservations = list(reservations)
+        prepared, rows = [None] * len(reservations), []
+        for index, reservation in enumerate(reservations):
+            try:
+                rows.append((index, {key: reservation[key] for key in BOOKING_COLUMNS}))
+            except (KeyError, TypeError):
+                prepared[index] = "Reservation data is not a correct json format: incorrect key values"
+        valid, messages = self.validate_reservation_columns({key: [row[key] for _, row in rows] for key in BOOKING_COLUMNS})
+        for (index, row), row_valid, message in zip(rows, valid, messages):
+            if not row_valid:
+                prepared[index] = message
+                continue
+            reservation = HotelReservationRecord(id_card=row["idCard"], credit_card_number=row["creditCardNumber"],
+                                                 name_surname=row["nameSurname"], phone_number=row["phoneNumber"],
+                                                 room_type=row["roomType"], arrival=row["arrival"], num_days=row["numDays"])
+            booking_data = reservation.json
+            booking_data["localizer"] = reservation.localizer
+            prepared[index] = booking_data
+        return prepared
+
+    def commit_reservations(self, prepared):
+        """ Second step of room_reservations_bulk: stores the bookings of prepare_reservations that are not
+            duplicated (in the store, the archive or the batch) in one write. Error messages are kept.
+            Returns a list with the localizer or the error message of every reservation, in order """
+        results, new_bookings = [], []
+        batch_id_cards = set()
+        with self.__booking_store.transaction():
+            for booking_data in prepared:
+                if not isinstance(booking_data, dict):
+                    results.append(booking_data)
+                    continue
+                id_card = booking_data["idCard"]
+                if id_card in batch_id_cards or self.__booking_store.find("idCard", id_card) is not None or \
+                        self.find_archived("all_bookings", "idCard", id_card) is not None:
+                    results.append("Client already has a reservation")
+                    continue
+                try:
+                    self.reserve_rooms(booking_data)
+                except HotelManagementException as exc:
+                    results.append(exc.message)
+                    continue
+                batch_id_cards.add(id_card)
+                new_bookings.append(booking_data)
+                results.append(booking_data["localizer"])
+            self.extend_bookings(new_bookings)
+        return results
 
     def guest_arrival(self, input_file):
         """ HM-FR-02: Verify that the localizer was stored in the bookings file and that it still matches the
@@ -131,7 +411,37 @@ class HotelManager:
             HM-FR-02: If previous is ok get an instance of hotel stay and store in stays file """
 
         # Open input file and get data inside (check exists, check json format)...
-        input_data = self.read_data_from_json(input_file, "r")
+        with self.__instrumentation.span("guest_arrival.read_input"):
+            input_data = self.read_data_from_json(input_file, "r")
+        return self.guest_arrival_data(input_data)
+
+    @instrumented("guest_arrival")
+    def guest_arrival_data(self, input_data):
+        """ HM-FR-02 with the data of the input file already read ({"Localizer": ..., "IdCard": ...}) """
+        localizer, id_card = self.get_arrival_keys(input_data)
+
+        # Get the stay with its room key if the booking is ok...
+        stay_json = self.get_stay_data(localizer, id_card)
+
+        # Store stay in stays file...
+        stay_store = self.shard(self.__stay_store, stay_json["idCard"])
+        with stay_store.transaction():
+            with self.__instrumentation.span("guest_arrival.stay_lookup"):
+                staying = stay_store.find("idCard", stay_json["idCard"]) is not None or \
+                    self.find_archived("all_stays", "idCard", stay_json["idCard"]) is not None
+            if staying:
+                raise HotelManagementException("Client already has a stay in stays file")
+            with self.__instrumentation.span("guest_arrival.persist"):
+                self.extend_stays([stay_json])
+
+        # Return room_key...
+        return stay_json["roomKey"]
+
+    def get_arrival_keys(self, input_data):
+        """ Returns localizer and id card from the data of an arrival input file """
+        # Valid json that is not an object or an array (a number, null...) has no keys...
+        if not isinstance(input_data, (dict, list, str)):
+            raise HotelManagementException("Input data file is not a correct json format: incorrect key values")
         if len(input_data) == 0:
             raise HotelManagementException("Input data file is not a correct json format as expected")
 
@@ -139,27 +449,37 @@ class HotelManager:
         try:
             localizer = input_data["Localizer"]
             id_card = input_data["IdCard"]
-        except KeyError as exc:
+        except (KeyError, TypeError) as exc:
             raise HotelManagementException("Input data file is not a correct json format: incorrect key values") from exc
+        return localizer, id_card
+
+    def get_stay_data(self, localizer, id_card):
+        """ Checks the booking of an arrival and returns the stay record (json + roomKey) to be stored """
 
         # json is ok but data are not valid (localizer or id_card not found in bookings)...
-        all_bookings, booking_data = [], {}
-        found = False
-        path_file_bookings = self.__path_data + "all_bookings.json"
-        if os.path.isfile(path_file_bookings):
-            all_bookings = self.read_data_from_json(path_file_bookings, "r")
-        for booking in all_bookings:
-            if booking["idCard"] == id_card and booking["localizer"] == localizer:
-                found = True
-                booking_data = booking
-        if not found:
+        booking_store = self.shard(self.__booking_store, id_card)
+        booking_filter = self.booking_filter(booking_store)
+        known = True
+        # The filter only saves loading the bookings file: once it is in memory its index is faster...
+        if booking_filter is not None and not booking_store.loaded:
+            with self.__instrumentation.span("guest_arrival.filter"):
+                known = booking_filter.might_contain(id_card, localizer)
+        booking_data = None
+        if known:
+            with self.__instrumentation.span("guest_arrival.load"):
+                booking_store.refresh()
+            with self.__instrumentation.span("guest_arrival.booking_lookup"):
+                booking_data = booking_store.find("idCard", id_card)
+        if booking_data is None:
+            # The booking may be of a completed stay that has been archived...
+            booking_data = self.find_archived("all_bookings", "idCard", id_card)
+        if booking_data is None or booking_data["localizer"] != localizer:
             raise HotelManagementException("No reservation was found with the provided localizer and id card")
 
         # Localizer is found but does not re-match data (data have been tampered with)...
-        reservation = HotelReservation(id_card=booking_data["idCard"], credit_card_number=booking_data["creditCardNumber"],
-                                       name_surname=booking_data["nameSurname"], phone_number=booking_data["phoneNumber"],
-                                       room_type=booking_data["roomType"], arrival=booking_data["arrival"], num_days=booking_data["numDays"])
-        if localizer != reservation.localizer:
+        with self.__instrumentation.span("guest_arrival.localizer_hash"):
+            tampered = localizer != HotelReservationRecord.from_json(booking_data).localizer
+        if tampered:
             raise HotelManagementException("Localizer does not match data inside bookings file. Data may have been altered")
 
         # Get HotelStay object. Check if arrival date matches expected arrival date...
@@ -169,25 +489,130 @@ class HotelManager:
             raise HotelManagementException("Expected arrival date is different than real arrival date")
 
         # Get hash for the room_key...
-        room_key = stay.room_key
-
-        # Store stay in stays file...
-        path_file_stays = self.__path_data + "all_stays.json"
-
-        all_stays = []
-        if os.path.isfile(path_file_stays):
-            all_stays = self.read_data_from_json(path_file_stays, "r")
-        for previous_stay in all_stays:
-            if previous_stay["idCard"] == booking_data["idCard"]:
-                raise HotelManagementException("Client already has a stay in stays file")
-        stay_json = stay.json
-        stay_json["roomKey"] = room_key
-        all_stays.append(stay_json)
-        self.write_data_to_json(path_file_stays, all_stays, "w")
-
-        # Return room_key...
-        return room_key
-
+        with self.__instrumentation.span("guest_arrival.room_key_hash"):
+            stay_json = stay.json
+            stay_json["roomKey"] = stay.room_key
+        return stay_json
+
+    def extend_stays(self, stays):
+        """ Stores new stays in the stays store (in their shards) and in the room key and departures indexes if
+            there are """
+        for stay_store, records in self.split(self.__stay_store, stays):
+            room_key_index = self.room_key_index(stay_store)
+            writer = stay_store if room_key_index is None else room_key_index
+            departures_index = self.departures_index(stay_store)
+            if departures_index is None:
+                writer.extend(records)
+            else:
+                departures_index.extend(writer, records)
+
+    def read_arrivals(self, source):
+        """ Yields the input data of a batch of arrivals (None if an input is not valid json).
+            The source can be a directory with one json file per arrival (read in file name order),
+            a JSON Lines file or an iterable of JSON lines (e.g. a text stream) """
+        if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+            for file_name in sorted(os.listdir(source)):
+                if file_name.endswith(".json"):
+                    yield self.read_data_from_json(os.path.join(source, file_name), "r")
+            return
+        if isinstance(source, (str, os.PathLike)):
+            try:
+                with open(source, encoding='UTF-8', mode="r") as f:
+                    yield from self.read_arrivals(f)
+            except FileNotFoundError as e:
+                raise HotelManagementException("Wrong file or file path") from e
+            return
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield []
+
+    @instrumented("guest_arrivals_bulk")
+    def guest_arrivals_bulk(self, source):
+        """ HM-FR-02 for a batch of arrivals read with read_arrivals (directory of json files or JSON Lines).
+            All bookings are checked against the in-memory indexes and all stays are stored in one write.
+            Returns a list with the room key or the error message of every arrival, in input order """
+        results, new_stays = [], []
+        batch_id_cards = set()
+        with self.__stay_store.transaction():
+            for input_data in self.read_arrivals(source):
+                try:
+                    stay_json = self.get_stay_data(*self.get_arrival_keys(input_data))
+                    if stay_json["idCard"] in batch_id_cards or \
+                            self.__stay_store.find("idCard", stay_json["idCard"]) is not None or \
+                            self.find_archived("all_stays", "idCard", stay_json["idCard"]) is not None:
+                        raise HotelManagementException("Client already has a stay in stays file")
+                except HotelManagementException as exc:
+                    results.append(exc.message)
+                    continue
+                batch_id_cards.add(stay_json["idCard"])
+                new_stays.append(stay_json)
+                results.append(stay_json["roomKey"])
+            self.extend_stays(new_stays)
+        return results
+
+    def get_departure(self, room_key):
+        """ Returns the expected departure datetime of the stay with the room key, or None if there is none.
+            Uses the room key index when there is one: it is authoritative, so the stays file is not read for
+            the room keys it misses either (unless it left some stays out). The shards without an index are looked
+            up in their store, and the room keys that are not in the stores in the archive """
+        for stay_store in reversed(self.shards_of(self.__stay_store)):
+            room_key_index = self.room_key_index(stay_store)
+            if room_key_index is not None:
+                entry = room_key_index.find(room_key)
+                if entry is not None:
+                    return entry[1]
+                continue
+            stay = stay_store.find("roomKey", room_key)
+            if stay is not None:
+                return datetime.fromisoformat(stay["departure"])
+        stay = self.find_archived("all_stays", "roomKey", room_key)
+        return None if stay is None else datetime.fromisoformat(stay["departure"])
+
+    def indexed_departure(self, room_key):
+        """ Returns the expected departure datetime of the stay with the room key from the departures indexes,
+            None if it is not indexed. Indexes that have not been built are not built here (that would read the
+            stays file, which the room key index avoids) """
+        for stay_store in reversed(self.shards_of(self.__stay_store)):
+            departures_index = self.departures_index(stay_store)
+            if departures_index is None or not departures_index.built:
+                return None
+            departure = departures_index.departure(room_key)
+            if departure is not None:
+                return departure
+        return None
+
+    def departures_due(self, day=None):
+        """ Returns the room keys of the stays that leave a day (date, today by default) and have not checked
+            out yet, shard by shard and by departure time """
+        day = day or datetime.utcnow().date()
+        self.__checkout_store.refresh()
+        due = []
+        for stay_store in self.shards_of(self.__stay_store):
+            departures_index = self.departures_index(stay_store) or DeparturesIndex(stay_store)
+            due.extend(room_key for room_key in departures_index.due(day)
+                       if self.shard(self.__checkout_store, room_key).find("roomKey", room_key) is None)
+        return due
+
+    @instrumented("guest_checkouts_due")
+    def guest_checkouts_due(self):
+        """ HM-FR-03 for every stay that leaves today and has not checked out yet (end of day processing).
+            The checkouts are stored in one write per checkouts file. Returns the room keys checked out """
+        timestamp = datetime.timestamp(datetime.utcnow())
+        with self.__checkout_store.transaction():
+            room_keys = [room_key for room_key in self.departures_due()
+                         if self.find_archived("all_checkouts", "roomKey", room_key) is None]
+            with self.__instrumentation.span("guest_checkouts_due.persist"):
+                for checkout_store, records in self.split(self.__checkout_store, [
+                        {"roomKey": room_key, "realDeparture": timestamp} for room_key in room_keys]):
+                    if records:
+                        checkout_store.extend(records)
+        return room_keys
+
+    @instrumented("guest_checkout")
     def guest_checkout(self, room_key):
         """ HM-FR-03: The system will record when the client leaves the room.
                       It will also check that the room code is correct and that the departure day is as scheduled
@@ -195,20 +620,26 @@ class HotelManager:
                       Finally, it will record the output in a file. """
 
         # Check key format is valid for a SHA256...
-        pattern = r'^[0-9a-fA-F]{64}$'
-        if not bool(re.match(pattern, room_key)):
+        with self.__instrumentation.span("guest_checkout.validate"):
+            valid = bool(ROOM_KEY_PATTERN.match(room_key))
+        if not valid:
             raise HotelManagementException("Given SHA256 room_key code is not a valid SHA256 string")
 
-        # Check if the room_key is in the stays file...
-        all_stays = self.read_data_from_json(self.__path_data + "all_stays.json", "r")
-        found = False
-        for stay in all_stays:
-            if stay["roomKey"] == room_key:
-                found = True
-                expected_departure_date = datetime.strptime(stay["departure"], '%Y-%m-%d %H:%M:%S')
-                expected_departure_date = datetime.timestamp(expected_departure_date)
-        if not found:
+        # Check if the room_key is in the stays file (departures index first)...
+        if not self.__stay_store.exists():
+            raise HotelManagementException("Wrong file or file path")
+        with self.__instrumentation.span("guest_checkout.precheck"):
+            expected_departure_date = self.indexed_departure(room_key)
+        if expected_departure_date is None:
+            with self.__instrumentation.span("guest_checkout.load"):
+                for stay_store in self.shards_of(self.__stay_store):
+                    room_key_index = self.room_key_index(stay_store)
+                    (stay_store if room_key_index is None else room_key_index).refresh()
+            with self.__instrumentation.span("guest_checkout.lookup"):
+                expected_departure_date = self.get_departure(room_key)
+        if expected_departure_date is None:
             raise HotelManagementException("Given room_key not found in stays file")
+        expected_departure_date = datetime.timestamp(expected_departure_date)
 
         # Check if "today" is the correct departure date...
         timestamp = datetime.timestamp(datetime.utcnow())
@@ -216,14 +647,12 @@ class HotelManager:
             raise HotelManagementException("The departure date was not expected to be today according to the stay information")
 
         # Store checkout information in checkouts file (timestamp + room_key)...
-        path_file_checkouts = self.__path_data + "all_checkouts.json"
-        all_checkouts = []
-        if os.path.isfile(path_file_checkouts):
-            all_checkouts = self.read_data_from_json(path_file_checkouts, "r")
-        for previous_checkout in all_checkouts:
-            if previous_checkout["roomKey"] == room_key:
-                raise HotelManagementException("Client already found in checkouts file. Not allowed to checkout again")
         checkout_json = {"roomKey": room_key, "realDeparture": timestamp}
-        all_checkouts.append(checkout_json)
-        self.write_data_to_json(path_file_checkouts, all_checkouts, "w")
+        checkout_store = self.shard(self.__checkout_store, room_key)
+        with checkout_store.transaction():
+            if checkout_store.find("roomKey", room_key) is not None or \
+                    self.find_archived("all_checkouts", "roomKey", room_key) is not None:
+                raise HotelManagementException("Client already found in checkouts file. Not allowed to checkout again")
+            with self.__instrumentation.span("guest_checkout.persist"):
+                checkout_store.append(checkout_json)
         return True
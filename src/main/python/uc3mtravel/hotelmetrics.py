@@ -0,0 +1,123 @@
+""" Module that measures where the time of the hotel operations goes (named spans, counters and histograms)... """
+import json
+import os
+import threading
+import time
+from functools import wraps
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds (seconds) of the latency histogram buckets, as Prometheus "le" labels...
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class NullInstrumentation:
+    """ Instrumentation that records nothing. Used when instrumentation is not enabled, so a span costs a call """
+
+    __NULL_SPAN = nullcontext()
+
+    enabled = False
+
+    def span(self, name):  # pylint: disable=unused-argument
+        """ Returns a context manager that does nothing """
+        return self.__NULL_SPAN
+
+    def count(self, name, value=1):
+        """ Does nothing """
+
+    def snapshot(self):
+        """ Returns an empty snapshot """
+        return {"counters": {}, "spans": {}}
+
+
+class Instrumentation(NullInstrumentation):
+    """ Records counters and a latency histogram per named span (e.g. room_reservation.validate).
+        Snapshots can be exported as json or in the Prometheus text format """
+
+    enabled = True
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__counters = {}
+        self.__spans = {}
+
+    @contextmanager
+    def span(self, name):
+        """ Measures the time of the block. Errors (exceptions) are counted as <name>.errors """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count(name + ".errors")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        """ Adds a latency to the histogram of a span """
+        with self.__lock:
+            span = self.__spans.get(name)
+            if span is None:
+                span = self.__spans[name] = {"count": 0, "sum": 0.0, "buckets": [0] * (len(BUCKETS) + 1)}
+            span["count"] += 1
+            span["sum"] += seconds
+            span["buckets"][bisect_left(BUCKETS, seconds)] += 1
+
+    def count(self, name, value=1):
+        """ Increments a counter """
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def reset(self):
+        """ Removes all the counters and spans """
+        with self.__lock:
+            self.__counters, self.__spans = {}, {}
+
+    def snapshot(self):
+        """ Returns the counters and, per span, count, sum and cumulative bucket counts (seconds) """
+        with self.__lock:
+            spans = {}
+            for name, span in self.__spans.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(BUCKETS + ("+Inf",), span["buckets"]):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                spans[name] = {"count": span["count"], "sum": span["sum"], "mean": span["sum"] / span["count"], "buckets": buckets}
+            return {"counters": dict(self.__counters), "spans": spans}
+
+    def to_json(self):
+        """ Returns the snapshot as a json string """
+        return json.dumps(self.snapshot(), indent=4)
+
+    def to_prometheus(self):
+        """ Returns the snapshot in the Prometheus text exposition format """
+        snapshot = self.snapshot()
+        lines = ["# TYPE uc3mtravel_total counter"]
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append('uc3mtravel_total{name="' + name + '"} ' + str(value))
+        lines.append("# TYPE uc3mtravel_span_seconds histogram")
+        for name, span in sorted(snapshot["spans"].items()):
+            for bound, count in span["buckets"].items():
+                lines.append('uc3mtravel_span_seconds_bucket{span="' + name + '",le="' + bound + '"} ' + str(count))
+            lines.append('uc3mtravel_span_seconds_sum{span="' + name + '"} ' + repr(span["sum"]))
+            lines.append('uc3mtravel_span_seconds_count{span="' + name + '"} ' + str(span["count"]))
+        return "\n".join(lines) + "\n"
+
+    def export(self, path_file, output_format="json"):
+        """ Writes a snapshot to a file (json or prometheus), replacing it atomically """
+        content = self.to_prometheus() if output_format == "prometheus" else self.to_json()
+        with open(path_file + ".tmp", encoding="UTF-8", mode="w") as f:
+            f.write(content)
+        os.replace(path_file + ".tmp", path_file)
+        return path_file
+
+
+def instrumented(name):
+    """ Decorator of HotelManager methods: measures the whole call as span name and counts the calls """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.span(name):
+                return function(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,239 @@
+""" Module with the reports of occupancy, arrivals, departures and no-shows over bookings and stays... """
+from array import array
+from datetime import date, datetime, timedelta
+try:
+    import numpy
+except ImportError:  # NumPy is optional: the reports are computed in pure python...
+    numpy = None
+
+ROOM_TYPES = ("SINGLE", "DOUBLE", "SUITE")
+SOURCES = ("bookings", "stays")
+
+
+def day_number(value):
+    """ Returns the day number (proleptic ordinal) of a date or datetime """
+    return (value.date() if isinstance(value, datetime) else value).toordinal()
+
+
+class HotelReport:
+    """ Columnar copy of the bookings and stays of some stores for reports. Every source (bookings or stays) has
+        the columns arrival and departure (day numbers, departure is the first day the room is free) and
+        roomType (index in ROOM_TYPES, -1 if unknown) in compact arrays; bookings also have stayed (1 if there
+        is a stay with its localizer). Dates are parsed once per distinct value, and refresh only converts the
+        records appended to the stores since the last refresh. Queries are vectorized with NumPy when it is
+        available. With an archive (hotelarchive.HotelArchive), the archived bookings and stays are included... """
+
+    def __init__(self, booking_store, stay_store, archive=None):
+        self.__stores = {"bookings": booking_store, "stays": stay_store}
+        self.__archive = archive
+        self.__dates = {}
+        self.__bookings, self.__booking_keys, self.__booking_rows = {}, [], {}
+        self.__booking_count, self.__booking_last = 0, None
+        self.__stays, self.__stay_localizers = {}, set()
+        self.__stay_count, self.__stay_last = 0, None
+        self.__reset("bookings")
+        self.__reset("stays")
+
+    @classmethod
+    def of(cls, hotel_manager):
+        """ Returns the report of the stores (and the archive) of a HotelManager """
+        return cls(hotel_manager.booking_store, hotel_manager.stay_store, hotel_manager.archive)
+
+    def __reset(self, source):
+        """ Empties the columns of a source """
+        if source == "bookings":
+            self.__bookings = {"arrival": array("i"), "departure": array("i"), "roomType": array("b"), "stayed": array("b")}
+            self.__booking_keys = []
+            self.__booking_rows = {}
+            self.__booking_count, self.__booking_last = 0, None
+        else:
+            self.__stays = {"arrival": array("i"), "departure": array("i"), "roomType": array("b")}
+            self.__stay_localizers = set()
+            self.__stay_count, self.__stay_last = 0, None
+
+    def __parse_date(self, value):
+        """ Returns the day number of a date of the data files (dd/mm/yyyy as accepted by validate_arrival, also
+            1/7/2024, or yyyy-mm-dd hh:mm:ss), cached """
+        day = self.__dates.get(value)
+        if day is None:
+            if "/" in value:
+                day = datetime.strptime(value, '%d/%m/%Y').toordinal()
+            else:
+                day = date.fromisoformat(value[:10]).toordinal()
+            self.__dates[value] = day
+        return day
+
+    @staticmethod
+    def __room_type(value):
+        """ Returns the index of a room type in ROOM_TYPES, -1 if it is unknown """
+        return ROOM_TYPES.index(value) if value in ROOM_TYPES else -1
+
+    def __records(self, source):
+        """ Returns the records of a source: the archived ones (partition by partition) and then the ones of the
+            store """
+        records = []
+        if self.__archive is not None:
+            name = "all_bookings" if source == "bookings" else "all_stays"
+            for partition in self.__archive.partitions():
+                records.extend(self.__archive.partition_store(partition, name).records())
+        return records + self.__stores[source].records()
+
+    def refresh(self):
+        """ Brings the columns up to date with the stores and the archive. If they have only grown, only the new
+            records are converted, otherwise (e.g. archived or imported) the columns are built again """
+        records = self.__records("bookings")
+        count, last = self.__booking_count, self.__booking_last
+        if len(records) < count or (count and records[count - 1] != last):
+            self.__reset("bookings")
+            count = 0
+        self.__add_bookings(records[count:])
+        if records:
+            self.__booking_count, self.__booking_last = len(records), records[-1]
+
+        records = self.__records("stays")
+        count, last = self.__stay_count, self.__stay_last
+        if len(records) < count or (count and records[count - 1] != last):
+            self.__reset("stays")
+            stayed = self.__bookings["stayed"]
+            for row, value in enumerate(stayed):
+                if value:
+                    stayed[row] = 0
+            count = 0
+        self.__add_stays(records[count:])
+        if records:
+            self.__stay_count, self.__stay_last = len(records), records[-1]
+
+    def __add_bookings(self, records):
+        """ Appends the columns of new bookings. Records without the expected keys or values are skipped """
+        columns = self.__bookings
+        for record in records:
+            try:
+                arrival = self.__parse_date(record["arrival"])
+                departure = arrival + int(record["numDays"])
+                room_type = self.__room_type(record["roomType"])
+                key = (record["idCard"], record["localizer"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.__booking_rows[key[1]] = len(self.__booking_keys)
+            self.__booking_keys.append(key)
+            columns["arrival"].append(arrival)
+            columns["departure"].append(departure)
+            columns["roomType"].append(room_type)
+            columns["stayed"].append(1 if key[1] in self.__stay_localizers else 0)
+
+    def __add_stays(self, records):
+        """ Appends the columns of new stays and marks their bookings as stayed """
+        columns = self.__stays
+        for record in records:
+            try:
+                arrival = self.__parse_date(record["arrival"])
+                departure = self.__parse_date(record["departure"])
+                room_type = self.__room_type(record["roomType"])
+                localizer = record["localizer"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            columns["arrival"].append(arrival)
+            columns["departure"].append(departure)
+            columns["roomType"].append(room_type)
+            self.__stay_localizers.add(localizer)
+            row = self.__booking_rows.get(localizer)
+            if row is not None:
+                self.__bookings["stayed"][row] = 1
+
+    def column(self, source, name):
+        """ Returns a copy of a column of a source (NumPy array if available, list otherwise) """
+        self.refresh()
+        columns = self.__columns(source)
+        if name not in columns:
+            raise KeyError(name)
+        if numpy is not None:
+            return numpy.array(columns[name])
+        return columns[name].tolist()
+
+    def __columns(self, source):
+        """ Returns the columns of a source """
+        if source not in SOURCES:
+            raise ValueError("Unknown source " + str(source) + ". Use bookings or stays")
+        return self.__bookings if source == "bookings" else self.__stays
+
+    def room_type_counts(self, source="bookings"):
+        """ Returns {room type: number of bookings (or stays)} """
+        self.refresh()
+        room_types = self.__columns(source)["roomType"]
+        if numpy is not None:
+            counts = numpy.bincount(numpy.frombuffer(room_types, dtype=numpy.int8) + 1, minlength=len(ROOM_TYPES) + 1)
+            return dict(zip(ROOM_TYPES, counts[1:].tolist()))
+        return {room_type: room_types.count(index) for index, room_type in enumerate(ROOM_TYPES)}
+
+    def occupancy(self, start, end, source="bookings"):
+        """ Returns {day: {room type: rooms occupied that night}} for every day from start to end (dates,
+            both included). A booking or stay occupies the nights from its arrival to the day before departure """
+        self.refresh()
+        first, days = day_number(start), day_number(end) - day_number(start) + 1
+        if days <= 0:
+            return {}
+        columns = self.__columns(source)
+        if numpy is not None:
+            arrival = numpy.clip(numpy.frombuffer(columns["arrival"], dtype=numpy.int32) - first, 0, days)
+            departure = numpy.clip(numpy.frombuffer(columns["departure"], dtype=numpy.int32) - first, 0, days)
+            room_types = numpy.frombuffer(columns["roomType"], dtype=numpy.int8)
+            rows = (arrival < departure) & (room_types >= 0)
+            changes = numpy.zeros((len(ROOM_TYPES), days + 1), dtype=numpy.int64)
+            numpy.add.at(changes, (room_types[rows], arrival[rows]), 1)
+            numpy.add.at(changes, (room_types[rows], departure[rows]), -1)
+            rooms = numpy.cumsum(changes, axis=1)[:, :days].T.tolist()
+        else:
+            changes = [[0] * (days + 1) for _ in ROOM_TYPES]
+            for arrival, departure, room_type in zip(columns["arrival"], columns["departure"], columns["roomType"]):
+                arrival, departure = min(max(arrival - first, 0), days), min(max(departure - first, 0), days)
+                if arrival < departure and room_type >= 0:
+                    changes[room_type][arrival] += 1
+                    changes[room_type][departure] -= 1
+            rooms, totals = [], [0] * len(ROOM_TYPES)
+            for day in range(days):
+                for room_type in range(len(ROOM_TYPES)):
+                    totals[room_type] += changes[room_type][day]
+                rooms.append(list(totals))
+        start_day = date.fromordinal(first)
+        return {start_day + timedelta(days=day): dict(zip(ROOM_TYPES, rooms[day])) for day in range(days)}
+
+    def arrivals_per_day(self, start, end, source="bookings"):
+        """ Returns {day: number of arrivals} for every day from start to end (both included) """
+        return self.__per_day("arrival", start, end, source)
+
+    def departures_per_day(self, start, end, source="stays"):
+        """ Returns {day: number of departures} for every day from start to end (both included) """
+        return self.__per_day("departure", start, end, source)
+
+    def __per_day(self, name, start, end, source):
+        """ Counts the values of a date column per day from start to end """
+        self.refresh()
+        first, days = day_number(start), day_number(end) - day_number(start) + 1
+        if days <= 0:
+            return {}
+        values = self.__columns(source)[name]
+        if numpy is not None:
+            offsets = numpy.frombuffer(values, dtype=numpy.int32) - first
+            counts = numpy.bincount(offsets[(offsets >= 0) & (offsets < days)], minlength=days).tolist()
+        else:
+            counts = [0] * days
+            for value in values:
+                if 0 <= value - first < days:
+                    counts[value - first] += 1
+        start_day = date.fromordinal(first)
+        return {start_day + timedelta(days=day): counts[day] for day in range(days)}
+
+    def no_shows(self, day=None):
+        """ Returns the (idCard, localizer) of the bookings with an arrival before day (today by default) and no
+            stay, in bookings order """
+        self.refresh()
+        limit = day_number(day or datetime.utcnow())
+        columns = self.__bookings
+        if numpy is not None:
+            arrival = numpy.frombuffer(columns["arrival"], dtype=numpy.int32)
+            stayed = numpy.frombuffer(columns["stayed"], dtype=numpy.int8)
+            rows = numpy.flatnonzero((arrival < limit) & (stayed == 0)).tolist()
+        else:
+            rows = [row for row, (arrival, stayed) in enumerate(zip(columns["arrival"], columns["stayed"]))
+                    if arrival < limit and not stayed]
+        return [self.__booking_keys[row] for row in rows]
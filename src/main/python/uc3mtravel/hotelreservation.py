@@ -1,5 +1,6 @@
 """ Module that manages the operations for hotel booking transactions... """
 import hashlib
+from .hashcache import LOCALIZERS, HashCache
 
 class HotelReservation:
     """ Class that manages the operations for hotel booking transactions... """
@@ -48,8 +49,10 @@ class HotelReservation:
 
     @property
     def localizer(self):
-        """ Returns the md5 signature """
-        return hashlib.md5(self.__str__().encode()).hexdigest()
+        """ Returns the md5 signature. Memoized by the fields in the LRU cache of localizers """
+        key = HashCache.key(self.__id_card, self.__name_surname, self.__credit_card_number, self.__phone_number,
+                            self.__arrival, self.__num_days, self.__room_type)
+        return LOCALIZERS.get(key, lambda: hashlib.md5(self.__str__().encode()).hexdigest())
 
     @property
     def json(self):
@@ -62,3 +65,82 @@ class HotelReservation:
                 "arrival": self.__arrival,
                 "numDays": self.__num_days,
                 }
+
+
+class HotelReservationRecord:
+    """ Compact and immutable hotel reservation (slots, no instance dict) built from a stored booking.
+        The localizer is computed once, from the same string as HotelReservation... """
+
+    __slots__ = ("_credit_card_number", "_id_card", "_name_surname", "_phone_number", "_room_type",
+                 "_arrival", "_num_days", "_localizer")
+
+    def __init__(self, id_card, credit_card_number, name_surname, phone_number, room_type, arrival, num_days):
+        """ Constructor of a hotel reservation record. Data are not validated... """
+        set_slot = object.__setattr__
+        set_slot(self, "_credit_card_number", credit_card_number)
+        set_slot(self, "_id_card", id_card)
+        set_slot(self, "_name_surname", name_surname)
+        set_slot(self, "_phone_number", phone_number)
+        set_slot(self, "_room_type", room_type)
+        set_slot(self, "_arrival", arrival)
+        set_slot(self, "_num_days", num_days)
+        set_slot(self, "_localizer", None)
+
+    @classmethod
+    def from_json(cls, booking_data):
+        """ Returns the record of a booking of the bookings file """
+        return cls(id_card=booking_data["idCard"], credit_card_number=booking_data["creditCardNumber"],
+                   name_surname=booking_data["nameSurname"], phone_number=booking_data["phoneNumber"],
+                   room_type=booking_data["roomType"], arrival=booking_data["arrival"], num_days=booking_data["numDays"])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HotelReservationRecord is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("HotelReservationRecord is immutable")
+
+    def __str__(self):
+        """ Return a json string with the elements required to calculate the localizer """
+        # VERY IMPORTANT: MUST BE THE SAME STRING AS HotelReservation.__str__
+        json_info = {"id_card": self._id_card,
+                     "name_surname": self._name_surname,
+                     "credit_card": self._credit_card_number,
+                     "phone_number": self._phone_number,
+                     "arrival_date": self._arrival,
+                     "num_days": self._num_days,
+                     "arrival": self._arrival,
+                     "room_type": self._room_type,
+                     }
+        return "HotelReservation:" + json_info.__str__()
+
+    @property
+    def creditcard(self):
+        """ Getter for credit card number """
+        return self._credit_card_number
+
+    @property
+    def idcard(self):
+        """ Getter for id card number """
+        return self._id_card
+
+    @property
+    def localizer(self):
+        """ Returns the md5 signature, computed on first use (or taken from the LRU cache of localizers) """
+        if self._localizer is None:
+            key = HashCache.key(self._id_card, self._name_surname, self._credit_card_number, self._phone_number,
+                                self._arrival, self._num_days, self._room_type)
+            object.__setattr__(self, "_localizer",
+                               LOCALIZERS.get(key, lambda: hashlib.md5(self.__str__().encode()).hexdigest()))
+        return self._localizer
+
+    @property
+    def json(self):
+        """ Returns class info un json format... """
+        return {"creditCardNumber": self._credit_card_number,
+                "idCard": self._id_card,
+                "nameSurname": self._name_surname,
+                "phoneNumber": self._phone_number,
+                "roomType": self._room_type,
+                "arrival": self._arrival,
+                "numDays": self._num_days,
+                }
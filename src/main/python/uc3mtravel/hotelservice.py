@@ -0,0 +1,232 @@
+""" Module that serves the hotel operations over HTTP from a long-running asyncio process... """
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .hotelmanagementexception import HotelManagementException
+from .hotelmanager import HotelManager
+from .roominventory import parse_rooms
+from .hotelmetrics import Instrumentation
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HotelService:
+    """ Asyncio HTTP front end of a HotelManager. The stores (and their indexes) stay in memory for the life of
+        the process and every operation is executed by a single writer, so operations never overlap.
+        Endpoints (JSON body, JSON answer {"result": ...} or {"error": ...}):
+            POST /reservation  keys of the bookings file (creditCardNumber, idCard, ...)
+            POST /arrival      {"Localizer": ..., "IdCard": ...}
+            POST /checkout     {"roomKey": ...}
+            GET  /departures   room keys of the stays that leave today and have not checked out yet
+            POST /departures   checkout of every stay that leaves today (end of day), answers the room keys
+            GET  /stats        requests, requests/second and p50/p99 latency per endpoint
+            GET  /metrics      spans of the HotelManager instrumentation (Prometheus text format) """
+
+    def __init__(self, hotel_manager=None, latency_window=100000):
+        self.__hotel_manager = hotel_manager or HotelManager()
+        self.__queue = None
+        self.__writer = None
+        self.__executor = ThreadPoolExecutor(max_workers=1)
+        self.__latencies = {}
+        self.__latency_window = latency_window
+        self.__started = time.perf_counter()
+        self.__requests = 0
+
+    @property
+    def hotel_manager(self):
+        """ Returns the HotelManager behind the service """
+        return self.__hotel_manager
+
+    def reservation(self, data):
+        """ Executes HM-FR-01 with the data of a request """
+        try:
+            return self.__hotel_manager.room_reservation(data["creditCardNumber"], data["idCard"], data["nameSurname"],
+                                                         data["phoneNumber"], data["roomType"], data["arrival"], data["numDays"])
+        except (KeyError, TypeError) as exc:
+            raise HotelManagementException("Reservation data is not a correct json format: incorrect key values") from exc
+
+    def arrival(self, data):
+        """ Executes HM-FR-02 with the data of a request """
+        return self.__hotel_manager.guest_arrival_data(data)
+
+    def checkout(self, data):
+        """ Executes HM-FR-03 with the data of a request """
+        try:
+            room_key = data["roomKey"]
+        except (KeyError, TypeError) as exc:
+            raise HotelManagementException("Checkout data is not a correct json format: incorrect key values") from exc
+        if not isinstance(room_key, str):
+            raise HotelManagementException("Given SHA256 room_key code is not a valid SHA256 string")
+        return self.__hotel_manager.guest_checkout(room_key)
+
+    def departures(self, data):
+        """ Returns the room keys of the stays that leave today (GET, data None) or checks them out (POST) """
+        if data is None:
+            return self.__hotel_manager.departures_due()
+        return self.__hotel_manager.guest_checkouts_due()
+
+    def stats(self):
+        """ Returns the number of requests, requests per second and latency percentiles (ms) per endpoint """
+        elapsed = time.perf_counter() - self.__started
+        endpoints = {}
+        for path, latencies in self.__latencies.items():
+            ordered = sorted(latencies)
+            endpoints[path] = {"requests": len(ordered),
+                               "p50_ms": ordered[int(0.50 * (len(ordered) - 1))] * 1000,
+                               "p99_ms": ordered[int(0.99 * (len(ordered) - 1))] * 1000}
+        return {"requests": self.__requests, "seconds": elapsed,
+                "requests_per_second": self.__requests / elapsed if elapsed else 0.0, "endpoints": endpoints}
+
+    async def __write_loop(self):
+        """ Single writer: executes the queued operations one by one in its own thread """
+        loop = asyncio.get_running_loop()
+        while True:
+            operation, data, future = await self.__queue.get()
+            try:
+                result = await loop.run_in_executor(self.__executor, operation, data)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # The writer must survive any error, the request that caused it gets the exception...
+                if not future.cancelled():
+                    future.set_exception(exc)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                self.__queue.task_done()
+
+    async def submit(self, operation, data):
+        """ Queues an operation for the writer and waits for its result """
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((operation, data, future))
+        return await future
+
+    async def dispatch(self, method, path, body):
+        """ Returns (status, answer) for a request """
+        operations = {"/reservation": self.reservation, "/arrival": self.arrival, "/checkout": self.checkout,
+                      "/departures": self.departures}
+        if path == "/stats":
+            return (200, {"result": self.stats()}) if method == "GET" else (405, {"error": "Use GET"})
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "Use GET"}
+            if not self.__hotel_manager.instrumentation.enabled:
+                return 404, {"error": "Instrumentation is not enabled"}
+            return 200, self.__hotel_manager.instrumentation.to_prometheus()
+        if path not in operations:
+            return 404, {"error": "Unknown endpoint " + path}
+        if path == "/departures" and method == "GET":
+            operation, data = self.departures, None
+        elif method != "POST":
+            return 405, {"error": "Use POST"}
+        else:
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "Input data is not a correct json format as expected"}
+            # Valid json that is not an object (a number, an array...) has none of the keys of the operations...
+            if not isinstance(data, dict):
+                return 400, {"error": "Input data is not a correct json format: incorrect key values"}
+            operation = operations[path]
+        try:
+            return 200, {"result": await self.submit(operation, data)}
+        except HotelManagementException as exc:
+            return 400, {"error": exc.message}
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Any other error is a fault of the service, the request still gets an answer...
+            return 500, {"error": "Internal server error"}
+
+    async def handle(self, reader, writer):
+        """ Serves the HTTP/1.1 requests (keep-alive) of a connection """
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                start = time.perf_counter()
+                lines = head.decode("latin-1").split("\r\n")
+                method, path = lines[0].split(" ")[:2]
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                status, answer = await self.dispatch(method, path, body)
+                # Answers are json except text ones (the metrics)...
+                content_type = "text/plain; version=0.0.4" if isinstance(answer, str) else "application/json"
+                content = (answer if isinstance(answer, str) else json.dumps(answer)).encode("UTF-8")
+                writer.write(("HTTP/1.1 " + str(status) + " " + REASONS[status] + "\r\nContent-Type: " + content_type + "\r\n" +
+                              "Content-Length: " + str(len(content)) + "\r\n\r\n").encode("latin-1") + content)
+                await writer.drain()
+                self.__requests += 1
+                self.__latencies.setdefault(path, deque(maxlen=self.__latency_window)).append(time.perf_counter() - start)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """ Starts the writer and the server. Returns the asyncio server """
+        self.__queue = asyncio.Queue()
+        self.__writer = asyncio.create_task(self.__write_loop())
+        self.__started = time.perf_counter()
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self):
+        """ Stops the writer and waits for the operation it is executing (if any) to finish """
+        if self.__writer is not None:
+            self.__writer.cancel()
+            try:
+                await self.__writer
+            except asyncio.CancelledError:
+                pass
+            self.__writer = None
+        self.__executor.shutdown(wait=True)
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """ Serves until cancelled, then stops the writer """
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main(argv=None):
+    """ Service command: python -m uc3mtravel.hotelservice [--host HOST] [--port PORT] [--journal] [--metrics]
+                                                   [--storage-format FORMAT] [--data DIR] [--hotel ID] [--shards N]
+                                                   [--inventory SINGLE=N,DOUBLE=N,SUITE=N] """
+    import argparse  # pylint: disable=import-outside-toplevel
+    parser = argparse.ArgumentParser(prog="python -m uc3mtravel.hotelservice", description="HotelManager HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--journal", action="store_true", help="use the journal persistence mode")
+    parser.add_argument("--metrics", action="store_true", help="record the spans of the operations (GET /metrics)")
+    parser.add_argument("--storage-format", default="json", help="format of the data files: json, compact, jsonl or binary")
+    parser.add_argument("--data", default=None, help="directory of the data files")
+    parser.add_argument("--hotel", default=None, help="hotel id: its data files are in a subdirectory of the data directory")
+    parser.add_argument("--shards", type=int, default=1, help="number of shards of every data file")
+    parser.add_argument("--inventory", default=None, help="rooms per room type, e.g. SINGLE=20,DOUBLE=10 (default unlimited)")
+    args = parser.parse_args(argv)
+    instrumentation = Instrumentation() if args.metrics else None
+    try:
+        hotel_manager = HotelManager(journal=args.journal, instrumentation=instrumentation, storage_format=args.storage_format,
+                                     path_data=args.data, hotel_id=args.hotel, shards=args.shards,
+                                     inventory=None if args.inventory is None else parse_rooms(args.inventory))
+    except HotelManagementException as e:
+        print(e.message, file=sys.stderr)
+        return 2
+    service = HotelService(hotel_manager)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
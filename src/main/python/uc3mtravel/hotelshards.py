@@ -0,0 +1,135 @@
+""" Module with the store that splits the records of a data file in shards... """
+import json
+import zlib
+from contextlib import ExitStack, contextmanager
+from .hotelmanagementexception import HotelManagementException
+
+
+def shard_of(value, count):
+    """ Returns the shard (0..count-1) of a value of the shard key. Stable between processes (crc32, not hash) """
+    return zlib.crc32(str(value).encode("UTF-8", "surrogatepass")) % count
+
+
+class ShardedStore:
+    """ Store whose records are split in several stores (shards) by the hash of one key, e.g. bookings by idCard.
+        Same interface as the json stores. Operations on a value of the shard key touch only its shard, so
+        HotelManager takes the lock of that shard only (shard_for) and independent shards can be written by
+        different processes at the same time... """
+
+    def __init__(self, shards, shard_key):
+        self.__shards = list(shards)
+        self.__shard_key = shard_key
+        if not self.__shards:
+            raise HotelManagementException("A sharded store needs at least one shard")
+
+    @property
+    def shards(self):
+        """ Returns the list of shard stores """
+        return list(self.__shards)
+
+    @property
+    def shard_key(self):
+        """ Returns the key of the records the shards are chosen by """
+        return self.__shard_key
+
+    @property
+    def path(self):
+        """ Returns the paths of the files of the shards """
+        return [shard.path for shard in self.__shards]
+
+    @property
+    def index_keys(self):
+        """ Returns the keys of the records that are indexed """
+        return self.__shards[0].index_keys
+
+    def shard_for(self, value):
+        """ Returns the shard store of a value of the shard key """
+        return self.__shards[shard_of(value, len(self.__shards))]
+
+    def split(self, records):
+        """ Returns [(shard store, records of the shard)] of some records, in shard order """
+        groups = {}
+        for record in records:
+            try:
+                value = record[self.__shard_key]
+            except (KeyError, TypeError) as e:
+                raise HotelManagementException("Record without " + self.__shard_key + " cannot be stored in a shard") from e
+            groups.setdefault(shard_of(value, len(self.__shards)), []).append(record)
+        return [(self.__shards[shard], groups[shard]) for shard in sorted(groups)]
+
+    def exists(self):
+        """ Returns True if the file of any shard exists """
+        return any(shard.exists() for shard in self.__shards)
+
+    def refresh(self):
+        """ Brings the records of every shard up to date """
+        for shard in self.__shards:
+            shard.refresh()
+
+    def find(self, key, value):
+        """ Returns the (last) record whose indexed key has the given value or None. Only one shard is searched
+            for the shard key, every shard for other keys """
+        if key == self.__shard_key:
+            return self.shard_for(value).find(key, value)
+        for shard in reversed(self.__shards):
+            record = shard.find(key, value)
+            if record is not None:
+                return record
+        return None
+
+    def records(self):
+        """ Returns a list with the records of all the shards (shard by shard) """
+        return [record for shard in self.__shards for record in shard.records()]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.__shards)
+
+    @contextmanager
+    def transaction(self):
+        """ Transaction over every shard (locks always taken in shard order). Operations on one value of the
+            shard key only need the transaction of its shard """
+        with ExitStack() as stack:
+            for shard in self.__shards:
+                stack.enter_context(shard.transaction())
+            yield self
+
+    def append(self, record):
+        """ Adds a record to its shard """
+        self.extend([record])
+
+    def extend(self, records):
+        """ Adds some records, each shard persists its own """
+        for shard, shard_records in self.split(records):
+            shard.extend(shard_records)
+
+    def import_json(self, path_file):
+        """ Replaces the content of the store with the records of a json file (list of records) """
+        try:
+            with open(path_file, encoding='UTF-8', mode="r") as f:
+                records = json.load(f)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        except json.JSONDecodeError as e:
+            raise HotelManagementException("JSON Decode Error - Wrong JSON Format") from e
+        if not isinstance(records, list):
+            raise HotelManagementException("JSON Decode Error - Wrong JSON Format")
+        return self.replace(records)
+
+    def replace(self, records):
+        """ Replaces the content of every shard with its part of some records """
+        records = list(records)
+        groups = dict((id(shard), shard_records) for shard, shard_records in self.split(records))
+        with self.transaction():
+            for shard in self.__shards:
+                shard.replace(groups.get(id(shard), []))
+        return len(records)
+
+    def export_json(self, path_file):
+        """ Writes the records of all the shards to a json file with the original format """
+        records = self.records()
+        try:
+            with open(path_file, encoding='UTF-8', mode="w") as f:
+                json.dump(records, f, indent=4)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        return len(records)
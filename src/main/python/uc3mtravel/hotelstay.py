@@ -69,3 +69,78 @@ class HotelStay:
                 "arrival": str(self.__arrival),
                 "departure": str(self.__departure)
                 }
+
+
+class HotelStayRecord:
+    """ Compact and immutable stay (slots, no instance dict) built from a stored stay.
+        The room key is computed once, from the same signature string as HotelStay... """
+
+    __slots__ = ("_alg", "_type", "_id_card", "_localizer", "_arrival", "_departure", "_room_key")
+
+    def __init__(self, id_card, localizer, room_type, arrival, departure, alg="SHA-256"):
+        """ Constructor of a stay record with its arrival and departure datetimes. Data are not validated... """
+        set_slot = object.__setattr__
+        set_slot(self, "_alg", alg)
+        set_slot(self, "_type", room_type)
+        set_slot(self, "_id_card", id_card)
+        set_slot(self, "_localizer", localizer)
+        set_slot(self, "_arrival", arrival)
+        set_slot(self, "_departure", departure)
+        set_slot(self, "_room_key", None)
+
+    @classmethod
+    def from_json(cls, stay_data):
+        """ Returns the record of a stay of the stays file """
+        return cls(stay_data["idCard"], stay_data["localizer"], stay_data["roomType"],
+                   datetime.fromisoformat(stay_data["arrival"]), datetime.fromisoformat(stay_data["departure"]),
+                   stay_data.get("alg", "SHA-256"))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HotelStayRecord is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("HotelStayRecord is immutable")
+
+    def __signature_string(self):
+        """ Composes the string to be used to generate the room keys (same as HotelStay) """
+        arrival = str(self._arrival)
+        departure = str(self._departure)
+        return "{alg:" + self._alg + ",typ:" + self._type + ",localizer:" + self._localizer + ",arrival:" + arrival + ",departure:" + departure + "}"
+
+    @property
+    def idcard(self):
+        """ Property that represents the id card of the guest """
+        return self._id_card
+
+    @property
+    def localizer(self):
+        """ Property that represents the localizer of the booking """
+        return self._localizer
+
+    @property
+    def arrival(self):
+        """ Property that represents the arrival datetime """
+        return self._arrival
+
+    @property
+    def departure(self):
+        """ Property that represents the departure datetime """
+        return self._departure
+
+    @property
+    def room_key(self):
+        """ Returns the sha256 signature, computed on first use """
+        if self._room_key is None:
+            object.__setattr__(self, "_room_key", hashlib.sha256(self.__signature_string().encode()).hexdigest())
+        return self._room_key
+
+    @property
+    def json(self):
+        """ Returns class info in json format..."""
+        return {"alg": self._alg,
+                "idCard": self._id_card,
+                "localizer": self._localizer,
+                "roomType": self._type,
+                "arrival": str(self._arrival),
+                "departure": str(self._departure)
+                }
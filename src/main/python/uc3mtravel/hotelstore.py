@@ -0,0 +1,426 @@
+""" Module that manages the indexed stores of bookings, stays and checkouts... """
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from .hotelmanagementexception import HotelManagementException
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: stores are only locked between threads...
+    fcntl = None
+
+
+class JsonStore:
+    """ Keeps the records of a json data file in memory with hash indexes on some of their keys.
+        New records are appended at the end of the file instead of rewriting the whole file... """
+
+    # Stores shared by every HotelManager of the process, see shared()...
+    __shared = {}
+
+    def __init__(self, path_file, index_keys, lock_timeout=30.0):
+        self.__path_file = path_file
+        self.__index_keys = tuple(index_keys)
+        self.__records = []
+        self.__indexes = {key: {} for key in self.__index_keys}
+        self.__signature = None
+        self.__appendable = False
+        self.__tail = b""
+        self.__lock_timeout = lock_timeout
+        self.__thread_lock = threading.RLock()
+        self.__lock_file = None
+        self.__lock_depth = 0
+
+    @classmethod
+    def shared(cls, path_file, index_keys, **kwargs):
+        """ Returns the store of this process for the file, so that its indexes are kept between HotelManager
+            instances. It is refreshed (incrementally when possible) when the file changes on disk """
+        key = (cls, os.path.abspath(path_file), tuple(index_keys))
+        if key not in JsonStore.__shared:
+            JsonStore.__shared[key] = cls(path_file, index_keys, **kwargs)
+        return JsonStore.__shared[key]
+
+    @property
+    def path(self):
+        """ Returns the path of the json file behind the store """
+        return self.__path_file
+
+    @property
+    def index_keys(self):
+        """ Returns the keys of the records that are indexed """
+        return self.__index_keys
+
+    def exists(self):
+        """ Returns True if the json file behind the store exists """
+        return os.path.isfile(self.__path_file)
+
+    @property
+    def loaded(self):
+        """ Returns True if the records of the json file are in memory (they may still need a refresh) """
+        return self.__signature is not None
+
+    def file_signature(self):
+        """ Returns (inode, mtime, size) of the json file or None if it does not exist """
+        try:
+            stat = os.stat(self.__path_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """ Brings the records up to date if the json file has changed since it was last read or written.
+            Records appended at the end of the file are read incrementally, otherwise the file is reloaded """
+        signature = self.file_signature()
+        if signature == self.__signature:
+            return
+        records = None
+        if self.__signature is not None and signature is not None:
+            records = self._load_increment(self.__signature, signature)
+        if records is None:
+            records, self.__appendable = self._load_records()
+            self._reindex(records)
+        else:
+            for record in records:
+                self.__records.append(record)
+                self._index(record)
+        self.__signature = signature
+
+    def find(self, key, value):
+        """ Returns the (last) record whose indexed key has the given value or None. O(1) """
+        self.refresh()
+        try:
+            return self.__indexes[key].get(value)
+        except TypeError:
+            return None
+
+    def records(self):
+        """ Returns a list with all the records of the store """
+        self.refresh()
+        return list(self.__records)
+
+    def __len__(self):
+        self.refresh()
+        return len(self.__records)
+
+    @contextmanager
+    def transaction(self):
+        """ Groups the checks and writes of an operation (read-modify-write). Takes an advisory lock (fcntl) on
+            <file>.lock shared by every process and then brings the records up to date with the file (its
+            signature is checked), so the checks see the writes of the other processes and none is lost.
+            Nested calls join the outer transaction """
+        with self.__thread_lock:
+            if self.__lock_depth == 0:
+                self.__lock_file = self._acquire_file_lock()
+            self.__lock_depth += 1
+            try:
+                self.refresh()
+                yield self
+            finally:
+                self.__lock_depth -= 1
+                if self.__lock_depth == 0:
+                    self.__lock_file.close()
+                    self.__lock_file = None
+
+    def _acquire_file_lock(self):
+        """ Opens <file>.lock and locks it. The lock is retried with a growing wait until lock_timeout """
+        try:
+            lock_file = open(self.__path_file + ".lock", mode="a", encoding="UTF-8")  # pylint: disable=consider-using-with
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        if fcntl is None:
+            return lock_file
+        deadline = time.monotonic() + self.__lock_timeout
+        wait = 0.0005
+        while True:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return lock_file
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    lock_file.close()
+                    raise HotelManagementException("Data file is locked by another process") from None
+                time.sleep(wait)
+                wait = min(wait * 2, 0.05)
+
+    def _locked(self):
+        """ Returns True while the store is inside a transaction """
+        return self.__lock_depth > 0
+
+    def append(self, record):
+        """ Adds a record to the store and persists it """
+        self.extend([record])
+
+    def extend(self, records):
+        """ Adds some records to the store and persists only them when possible """
+        records = list(records)
+        if not records:
+            return
+        with self.transaction():
+            self._persist(records)
+            for record in records:
+                self.__records.append(record)
+                self._index(record)
+            self._mark_synced()
+
+    def import_json(self, path_file):
+        """ Replaces the content of the store with the records of a json file (list of records) """
+        try:
+            with open(path_file, encoding='UTF-8', mode="r") as f:
+                records = json.load(f)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        except json.JSONDecodeError as e:
+            raise HotelManagementException("JSON Decode Error - Wrong JSON Format") from e
+        if not isinstance(records, list):
+            raise HotelManagementException("JSON Decode Error - Wrong JSON Format")
+        return self.replace(records)
+
+    def replace(self, records):
+        """ Replaces the content of the store with some records (the whole file is rewritten) """
+        records = list(records)
+        with self.transaction():
+            self._write_all(records)
+            self._reindex(records)
+            self.__appendable = True
+            self._mark_synced()
+        return len(records)
+
+    def export_json(self, path_file):
+        """ Writes all the records of the store to a json file with the original format """
+        records = self.records()
+        try:
+            with open(path_file, encoding='UTF-8', mode="w") as f:
+                json.dump(records, f, indent=4)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        return len(records)
+
+    def _mark_synced(self):
+        """ Takes note that the records in memory match the file as it is now """
+        self.__signature = self.file_signature()
+
+    def _current_records(self):
+        """ Returns the records in memory without checking the file for changes """
+        return self.__records
+
+    def _load_records(self):
+        """ Reads the json file. Returns the records and whether new records can be appended in place """
+        try:
+            with open(self.__path_file, mode="rb") as f:
+                content = f.read()
+            records = json.loads(content)
+        except FileNotFoundError:
+            return [], False
+        except ValueError:
+            return [], False
+        if not isinstance(records, list):
+            return [], False
+        self.__tail = content[-66:]
+        return records, len(records) > 0
+
+    def _load_increment(self, old_signature, new_signature):
+        """ Returns the records appended to the json file (by another store) since it had old_signature,
+            or None if the file has been changed in any other way and must be reloaded """
+        old_size, new_size = old_signature[2], new_signature[2]
+        if old_signature[0] != new_signature[0] or new_size <= old_size or not self.__appendable:
+            return None
+        start = max(0, old_size - len(self.__tail))
+        try:
+            with open(self.__path_file, mode="rb") as f:
+                f.seek(start)
+                content = f.read()
+            if content[:old_size - start - 2] != self.__tail[:-2] or content[old_size - start - 2:old_size - start] != b",\n":
+                return None
+            records = json.loads(b"[" + content[old_size - start - 1:])
+        except (OSError, ValueError):
+            return None
+        self.__tail = content[-66:]
+        return records if isinstance(records, list) else None
+
+    def _reindex(self, records):
+        """ Rebuilds the hash indexes from a list of records """
+        self.__records = list(records)
+        self.__indexes = {key: {} for key in self.__index_keys}
+        for record in self.__records:
+            self._index(record)
+
+    def _index(self, record):
+        """ Adds a record to the hash indexes """
+        for key in self.__index_keys:
+            try:
+                self.__indexes[key][record[key]] = record
+            except (KeyError, TypeError):
+                continue
+
+    def _persist(self, records):
+        """ Appends the new records to the end of the json file keeping the indent=4 format.
+            Falls back to rewriting the whole file when it is missing or it is not a valid list """
+        if not self.__appendable:
+            self._write_all(self.__records + records)
+            self.__appendable = True
+            return
+        chunk = "".join(",\n" + "\n".join("    " + line for line in json.dumps(record, indent=4).split("\n"))
+                        for record in records) + "\n]"
+        try:
+            with open(self.__path_file, mode="r+b") as f:
+                f.seek(-2, os.SEEK_END)
+                if f.read(2) != b"\n]":
+                    raise ValueError
+                f.seek(-2, os.SEEK_END)
+                f.write(chunk.encode("UTF-8"))
+                f.truncate()
+            self.__tail = (self.__tail + chunk.encode("UTF-8"))[-66:]
+        except (FileNotFoundError, OSError, ValueError):
+            self._write_all(self.__records + records)
+
+    def _write_all(self, records):
+        """ Rewrites the whole json file with the given records """
+        content = json.dumps(records, indent=4)
+        try:
+            with open(self.__path_file, encoding='UTF-8', mode="w") as f:
+                f.write(content)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        self.__tail = content.encode("UTF-8")[-66:]
+
+
+class JournalStore(JsonStore):
+    """ Json store in write-ahead journal mode. Every new record is appended as one line (JSON Lines) to a journal
+        file next to the snapshot and synced to disk. Periodically the journal is compacted into the snapshot,
+        that keeps the original indent=4 json format. On start the journal is replayed over the snapshot... """
+
+    def __init__(self, path_file, index_keys, compact_every=1000, lock_timeout=30.0):
+        super().__init__(path_file, index_keys, lock_timeout)
+        self.__path_journal = os.path.splitext(path_file)[0] + ".jsonl"
+        self.__compact_every = compact_every
+        self.__journal_records = 0
+        self.__journal_torn = None
+
+    @property
+    def journal_path(self):
+        """ Returns the path of the journal file """
+        return self.__path_journal
+
+    def exists(self):
+        """ Returns True if the snapshot or the journal exist """
+        return super().exists() or os.path.isfile(self.__path_journal)
+
+    def file_signature(self):
+        """ Returns the signatures of the snapshot and the journal, None if neither exists """
+        try:
+            stat = os.stat(self.__path_journal)
+            journal = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            journal = None
+        snapshot = super().file_signature()
+        if snapshot is None and journal is None:
+            return None
+        return snapshot, journal
+
+    def compact(self):
+        """ Writes all the records to the snapshot and empties the journal """
+        with self.transaction():
+            self._write_all(self._current_records())
+            self._mark_synced()
+
+    def _load_records(self):
+        """ Reads the snapshot and replays the journal over it. A torn last line (crash during an append) is
+            discarded and removed from the journal. Records already in the snapshot are not duplicated, in case
+            of a crash between writing the snapshot and emptying the journal. The torn line is only removed inside
+            a transaction, otherwise it may be a line that another process is still writing """
+        records, _ = super()._load_records()
+        key = self.index_keys[0]
+        known = {}
+        for record in records:
+            try:
+                known[record[key]] = record
+            except (KeyError, TypeError):
+                continue
+        self.__journal_records = 0
+        self.__journal_torn = None
+        valid_size = 0
+        try:
+            with open(self.__path_journal, mode="rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_size += len(line)
+                    self.__journal_records += 1
+                    if known.get(record.get(key)) != record:
+                        records.append(record)
+                        known[record.get(key)] = record
+                f.seek(0, os.SEEK_END)
+                torn = f.tell() != valid_size
+            self.__journal_torn = valid_size if torn else None
+            if torn and self._locked():
+                self._truncate_torn_line()
+        except FileNotFoundError:
+            pass
+        return records, False
+
+    def _load_increment(self, old_signature, new_signature):
+        """ Returns the records appended to the journal since it had old_signature, or None if the snapshot has
+            changed or the journal has been changed in any other way and everything must be reloaded """
+        old_journal, new_journal = old_signature[1], new_signature[1]
+        if old_signature[0] != new_signature[0] or new_journal is None:
+            return None
+        offset = 0
+        if old_journal is not None:
+            if old_journal[0] != new_journal[0] or new_journal[2] <= old_journal[2]:
+                return None
+            offset = old_journal[2]
+        try:
+            with open(self.__path_journal, mode="rb") as f:
+                f.seek(offset)
+                content = f.read()
+            if not content.endswith(b"\n"):
+                return None
+            records = [json.loads(line) for line in content.splitlines()]
+        except (OSError, ValueError):
+            return None
+        self.__journal_records += len(records)
+        return records
+
+    def _truncate_torn_line(self):
+        """ Removes a torn last line from the journal. Only called inside a transaction """
+        with open(self.__path_journal, mode="r+b") as f:
+            f.truncate(self.__journal_torn)
+            os.fsync(f.fileno())
+        self.__journal_torn = None
+
+    def _persist(self, records):
+        """ Appends the new records to the journal (one synced write) and compacts it if it is too long """
+        if self.__journal_torn is not None:
+            self._truncate_torn_line()
+        if self.__journal_records + len(records) >= self.__compact_every:
+            self._write_all(self._current_records() + records)
+            return
+        chunk = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        try:
+            with open(self.__path_journal, encoding="UTF-8", mode="a") as f:
+                f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        self.__journal_records += len(records)
+
+    def _write_all(self, records):
+        """ Writes the snapshot atomically (temporary file + rename) and then empties the journal """
+        path_tmp = self.path + ".tmp"
+        try:
+            with open(path_tmp, encoding="UTF-8", mode="w") as f:
+                json.dump(records, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path_tmp, self.path)
+            with open(self.__path_journal, encoding="UTF-8", mode="w") as f:
+                os.fsync(f.fileno())
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        self.__journal_records = 0
+        self.__journal_torn = None
@@ -0,0 +1,70 @@
+""" Module that reads the json data files (a top-level array of records) incrementally... """
+import json
+from .hotelmanagementexception import HotelManagementException
+
+WHITESPACE = " \t\n\r"
+# (what is expected, character read) -> what is expected after it, for the characters of the array itself. Expected:
+# the "[", the "first" record or "]", a "record" (after a comma), a "separator" ("," or "]") or the "end" of the file...
+TRANSITIONS = {("[", "["): "first", ("first", "]"): "end", ("separator", "]"): "end", ("separator", ","): "record"}
+
+
+def _skip_whitespace(buffer, pos):
+    """ Returns the position of the first character that is not a white space """
+    while pos < len(buffer) and buffer[pos] in WHITESPACE:
+        pos += 1
+    return pos
+
+
+def iter_json_array(path_file, chunk_size=65536):
+    """ Yields the records of a json file with a top-level array one at a time, reading the file in chunks.
+        Memory use depends on the size of one record, not on the size of the file. The file is rejected as
+        json.load does: records must be separated by exactly one comma and nothing but white space may follow
+        the array (the records before the error have already been yielded) """
+    decoder = json.JSONDecoder()
+    try:
+        with open(path_file, encoding='UTF-8', mode="r") as f:
+            buffer, pos, eof = "", 0, False
+            expected = "["
+            while True:
+                pos = _skip_whitespace(buffer, pos)
+                if pos == len(buffer):
+                    if eof:
+                        if expected == "end":
+                            return
+                        raise HotelManagementException("JSON Decode Error - Wrong JSON Format")
+                    chunk = f.read(chunk_size)
+                    buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+                    continue
+                if (expected, buffer[pos]) in TRANSITIONS:
+                    expected, pos = TRANSITIONS[expected, buffer[pos]], pos + 1
+                    continue
+                # No array, leading, trailing or double commas, missing commas and data after the array...
+                if expected not in ("first", "record") or buffer[pos] in "],":
+                    raise HotelManagementException("JSON Decode Error - Wrong JSON Format")
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    end = None
+                # The record may be cut at the end of the buffer: read more and try again...
+                if end is None or end == len(buffer) and not eof:
+                    chunk = f.read(chunk_size)
+                    if not chunk and (end is None or eof):
+                        raise HotelManagementException("JSON Decode Error - Wrong JSON Format")
+                    buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+                    continue
+                yield record
+                expected = "separator"
+                pos = end
+                if pos > chunk_size:
+                    buffer, pos = buffer[pos:], 0
+    except FileNotFoundError as e:
+        raise HotelManagementException("Wrong file or file path") from e
+
+
+def find_record(path_file, key, value):
+    """ Returns the first record of a json data file whose key has the given value, or None.
+        Stops reading the file as soon as the record is found """
+    for record in iter_json_array(path_file):
+        if isinstance(record, dict) and record.get(key) == value:
+            return record
+    return None
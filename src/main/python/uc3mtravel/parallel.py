@@ -0,0 +1,14 @@
+""" Module with the helpers to run a function over chunks of records in a pool of processes... """
+from collections import deque
+
+
+def map_ordered(executor, function, chunks, workers):
+    """ Yields the results of function over the chunks in order, with at most 2 chunks per worker in flight, so
+        the chunks are read as they are needed (streams of any size) and the workers are never idle """
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(function, chunk))
+        if len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,122 @@
+""" Module with the inventory of rooms per room type and the availability of the nights of the bookings... """
+from datetime import datetime
+from .hotelmanagementexception import HotelManagementException
+
+ROOM_TYPES = ("SINGLE", "DOUBLE", "SUITE")
+
+
+def nights(arrival, num_days):
+    """ Returns the day numbers (proleptic ordinals) of the nights of a booking: arrival is dd/mm/yyyy, as accepted
+        by validate_arrival (also 1/7/2024) """
+    first = datetime.strptime(arrival, '%d/%m/%Y').toordinal()
+    return range(first, first + int(num_days))
+
+
+def parse_rooms(text):
+    """ Returns the number of rooms per room type of an option like SINGLE=20,DOUBLE=10 """
+    rooms = {}
+    try:
+        for item in text.split(","):
+            room_type, count = item.split("=")
+            rooms[room_type.strip().upper()] = int(count)
+    except ValueError as e:
+        raise HotelManagementException("Invalid room inventory. Use the number of rooms of SINGLE, DOUBLE or SUITE") from e
+    return rooms
+
+
+class RoomInventory:
+    """ Number of rooms of every room type and counters of the rooms booked every night, per room type, built
+        from the bookings store. A booking needs a free room of its type every night from its arrival to the day
+        before it leaves; as a booking is at most 10 nights, checking and counting it are O(1) whatever the
+        number of bookings. Room types that are not in the inventory are not limited.
+        The counters follow the store: bookings appended by other processes are counted incrementally, and they
+        are built again if the store has been rewritten (e.g. archived or imported)... """
+
+    # Inventories shared by every HotelManager of the process, see shared()...
+    __shared = {}
+
+    def __init__(self, booking_store, rooms):
+        if not isinstance(rooms, dict) or any(room_type not in ROOM_TYPES or not isinstance(count, int) or
+                                              isinstance(count, bool) or count < 0 for room_type, count in rooms.items()):
+            raise HotelManagementException("Invalid room inventory. Use the number of rooms of SINGLE, DOUBLE or SUITE")
+        self.__booking_store = booking_store
+        self.__rooms = dict(rooms)
+        # The store can be appended in place (file stores) or must be read again when it changes...
+        self.__appendable = hasattr(booking_store, "file_signature")
+        self.__booked = {}
+        self.__count, self.__last, self.__signature = 0, None, None
+        self.__reset()
+
+    @classmethod
+    def shared(cls, booking_store, rooms):
+        """ Returns the inventory of this process for a bookings store and number of rooms """
+        key = (id(booking_store), tuple(sorted(rooms.items())) if isinstance(rooms, dict) else repr(rooms))
+        if key not in RoomInventory.__shared or RoomInventory.__shared[key][0] is not booking_store:
+            RoomInventory.__shared[key] = (booking_store, cls(booking_store, rooms))
+        return RoomInventory.__shared[key][1]
+
+    @property
+    def rooms(self):
+        """ Returns the number of rooms of every room type """
+        return dict(self.__rooms)
+
+    def __reset(self):
+        """ Empties the counters """
+        self.__booked = {room_type: {} for room_type in ROOM_TYPES}
+        self.__count, self.__last, self.__signature = 0, None, None
+
+    def __store_signature(self):
+        """ Returns a value that changes when the bookings store changes """
+        if self.__appendable:
+            return self.__booking_store.file_signature()
+        return len(self.__booking_store)
+
+    def invalidate(self):
+        """ Forgets the counters, they are built again on the next check """
+        self.__reset()
+        self.__signature = ()
+
+    def refresh(self):
+        """ Brings the counters up to date with the bookings store """
+        signature = self.__store_signature()
+        if signature == self.__signature and self.__signature is not None:
+            return
+        records = self.__booking_store.records()
+        count = self.__count
+        if not self.__appendable or len(records) < count or (count and records[count - 1] != self.__last):
+            self.__reset()
+            count = 0
+        self.add(records[count:])
+        self.__count, self.__last = len(records), records[-1] if records else None
+        self.__signature = signature
+
+    def add(self, bookings):
+        """ Counts the nights of some bookings. Bookings without the expected keys or values are not counted """
+        for booking in bookings:
+            try:
+                booked = self.__booked[booking["roomType"]]
+                for night in nights(booking["arrival"], booking["numDays"]):
+                    booked[night] = booked.get(night, 0) + 1
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def synced(self, bookings):
+        """ Takes note that some bookings already counted with add have been appended to the store """
+        bookings = list(bookings)
+        self.__count += len(bookings)
+        if bookings:
+            self.__last = bookings[-1]
+        self.__signature = self.__store_signature()
+
+    def free_rooms(self, room_type, arrival, num_days):
+        """ Returns the number of rooms of a type that are free every night of a stay, None if not limited """
+        self.refresh()
+        if room_type not in self.__rooms:
+            return None
+        booked = self.__booked[room_type]
+        return self.__rooms[room_type] - max(booked.get(night, 0) for night in nights(arrival, num_days))
+
+    def available(self, room_type, arrival, num_days):
+        """ Returns True if there is a free room of the type every night of a stay """
+        free = self.free_rooms(room_type, arrival, num_days)
+        return free is None or free > 0
@@ -0,0 +1,206 @@
+""" Module with the sorted room key index of the stays file, read with mmap... """
+import hashlib
+import mmap
+import os
+import re
+import struct
+from datetime import datetime, timedelta
+
+# Room keys as stored by guest_arrival (lowercase SHA-256 hex)...
+ROOM_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class RoomKeyIndex:
+    """ Derived file next to the stays file that maps the 32 byte digest of every room key to the position of its
+        stay in the stays store and its departure. Layout:
+            header   MAGIC, number of sorted entries (uint64), number of stays left out (uint64), md5 of the
+                     signature of the stays file indexed
+            entries  <digest 32 bytes><position uint64><departure float64>, sorted by digest and position,
+                     followed by the entries appended since the last merge (newest last)
+        Lookups map the file (mmap) and do a binary search, so guest_checkout does not read the stays file.
+        The index is authoritative: a room key it does not have is not in the stays file, unless some stays were
+        left out (no room key or departure), then the misses are looked up in the stays store.
+        The index is rebuilt from the stays store when the stays file has been written by someone else... """
+
+    MAGIC = b"UC3MRK\x02\n"
+    HEADER = struct.Struct("<8sQQ16s")
+    # Big-endian, so that sorting the bytes of the entries sorts them by digest and then by position...
+    ENTRY = struct.Struct(">32sQd")
+
+    # Indexes shared by every HotelManager of the process, see shared()...
+    __shared = {}
+
+    def __init__(self, stay_store, path_file=None, merge_every=1024):
+        self.__stay_store = stay_store
+        self.__path_file = path_file or os.path.splitext(stay_store.path)[0] + ".roomkeys"
+        self.__merge_every = merge_every
+        self.__map = None
+        self.__map_signature = None
+
+    @classmethod
+    def shared(cls, stay_store, **kwargs):
+        """ Returns the index of this process for a stays store """
+        key = id(stay_store)
+        if key not in RoomKeyIndex.__shared or RoomKeyIndex.__shared[key][0] is not stay_store:
+            RoomKeyIndex.__shared[key] = (stay_store, cls(stay_store, **kwargs))
+        return RoomKeyIndex.__shared[key][1]
+
+    @property
+    def path(self):
+        """ Returns the path of the index file """
+        return self.__path_file
+
+    @staticmethod
+    def departure_seconds(stay):
+        """ Returns the departure of a stay (str() of a naive datetime, with or without microseconds) as seconds
+            since 1970-01-01 00:00 without time zone (the time zone is applied by guest_checkout) """
+        return (datetime.fromisoformat(stay["departure"]) - datetime(1970, 1, 1)).total_seconds()
+
+    def __stays_signature(self):
+        """ Returns the md5 of the signature of the stays file """
+        return hashlib.md5(repr(self.__stay_store.file_signature()).encode()).digest()
+
+    def __entries(self, stays, first_position):
+        """ Returns (entries of some stays, number of stays left out). Stays without a lowercase room key or a
+            departure are left out, they are looked up in the stays store """
+        entries, skipped = [], 0
+        for position, stay in enumerate(stays, first_position):
+            try:
+                if not ROOM_KEY_PATTERN.match(stay["roomKey"]):
+                    raise ValueError("Room key not indexed")
+                entries.append(self.ENTRY.pack(bytes.fromhex(stay["roomKey"]), position, self.departure_seconds(stay)))
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+        return entries, skipped
+
+    def __remap(self):
+        """ Maps the index file again if it has changed. Returns False if it does not exist """
+        try:
+            stat = os.stat(self.__path_file)
+        except FileNotFoundError:
+            self.__close()
+            return False
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != self.__map_signature:
+            self.__close()
+            with open(self.__path_file, mode="rb") as f:
+                self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__map_signature = signature
+        return True
+
+    def __close(self):
+        """ Unmaps the index file """
+        if self.__map is not None:
+            self.__map.close()
+        self.__map, self.__map_signature = None, None
+
+    def __header(self):
+        """ Returns (number of sorted entries, number of stays left out, signature of the stays file) or None if
+            the file is not valid """
+        if self.__map is None or len(self.__map) < self.HEADER.size:
+            return None
+        magic, sorted_count, skipped, signature = self.HEADER.unpack_from(self.__map, 0)
+        return (sorted_count, skipped, signature) if magic == self.MAGIC else None
+
+    def __fresh(self):
+        """ Returns True if the index covers the stays file as it is now """
+        if not self.__remap():
+            return False
+        header = self.__header()
+        return header is not None and header[2] == self.__stays_signature()
+
+    def __write(self, entries, skipped, signature):
+        """ Writes the index atomically (temporary file + rename) with the entries sorted """
+        entries.sort()
+        with open(self.__path_file + ".tmp", mode="wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, len(entries), skipped, signature) + b"".join(entries))
+        os.replace(self.__path_file + ".tmp", self.__path_file)
+        self.__remap()
+
+    def rebuild(self):
+        """ Builds the index from all the stays of the stays store """
+        with self.__stay_store.transaction():
+            entries, skipped = self.__entries(self.__stay_store.records(), 0)
+            self.__write(entries, skipped, self.__stays_signature())
+
+    def refresh(self):
+        """ Rebuilds the index if the stays file has changed since it was indexed """
+        if not self.__fresh():
+            with self.__stay_store.transaction():
+                if not self.__fresh():
+                    self.rebuild()
+
+    def extend(self, stays):
+        """ Appends stays to the stays store and their entries to the index. If the index was up to date the new
+            entries are appended in place (merged into the sorted part every merge_every entries) """
+        stays = list(stays)
+        with self.__stay_store.transaction():
+            fresh = self.__fresh()
+            first_position = len(self.__stay_store)
+            self.__stay_store.extend(stays)
+            if not fresh:
+                self.rebuild()
+                return
+            entries, skipped = self.__entries(stays, first_position)
+            sorted_count, skipped_before, _ = self.__header()
+            skipped += skipped_before
+            total = (len(self.__map) - self.HEADER.size) // self.ENTRY.size
+            if total + len(entries) - sorted_count >= self.__merge_every:
+                start = self.HEADER.size
+                self.__write([bytes(self.__map[start + i * self.ENTRY.size:start + (i + 1) * self.ENTRY.size])
+                              for i in range(total)] + entries, skipped, self.__stays_signature())
+                return
+            # Entries are written before the header, so an interrupted write leaves an index that is not fresh...
+            with open(self.__path_file, mode="r+b") as f:
+                f.seek(self.HEADER.size + total * self.ENTRY.size)
+                f.write(b"".join(entries))
+                f.truncate()
+                f.flush()
+                f.seek(0)
+                f.write(self.HEADER.pack(self.MAGIC, sorted_count, skipped, self.__stays_signature()))
+            self.__remap()
+
+    @property
+    def skipped(self):
+        """ Returns the number of stays of the stays file that are not in the index """
+        self.refresh()
+        return self.__header()[1]
+
+    def __find_stay(self, room_key):
+        """ Looks up a room key the index does not have in the stays store, only if some stays were left out """
+        if self.__header()[1] == 0:
+            return None
+        stay = self.__stay_store.find("roomKey", room_key)
+        return None if stay is None else (None, datetime.fromisoformat(stay["departure"]))
+
+    def find(self, room_key):
+        """ Returns (position, departure datetime) of the (last) stay with the room key, or None.
+            Room keys the index does not have are looked up in the stays store (position None) only if some stays
+            were left out of the index """
+        self.refresh()
+        if not isinstance(room_key, str) or not ROOM_KEY_PATTERN.match(room_key):
+            return self.__find_stay(room_key)
+        digest = bytes.fromhex(room_key)
+        view, start, size = self.__map, self.HEADER.size, self.ENTRY.size
+        sorted_count = self.__header()[0]
+        # Entries appended since the last merge, newest first...
+        found = None
+        for index in range((len(view) - start) // size - 1, sorted_count - 1, -1):
+            if view[start + index * size:start + index * size + 32] == digest:
+                found = index
+                break
+        if found is None:
+            # Binary search of the last sorted entry with the digest...
+            low, high = 0, sorted_count
+            while low < high:
+                middle = (low + high) // 2
+                if view[start + middle * size:start + middle * size + 32] <= digest:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == 0 or view[start + (low - 1) * size:start + (low - 1) * size + 32] != digest:
+                return self.__find_stay(room_key)
+            found = low - 1
+        _, position, seconds = self.ENTRY.unpack_from(view, start + found * size)
+        # Built at call time, so that it is a datetime of the same class as the others (freezegun in the tests)...
+        return position, datetime(1970, 1, 1) + timedelta(seconds=seconds)
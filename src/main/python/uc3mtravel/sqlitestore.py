@@ -0,0 +1,211 @@
+""" Module that manages the storage of bookings, stays and checkouts in a SQLite database... """
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from .hotelmanagementexception import HotelManagementException
+from .jsonstream import iter_json_array
+
+
+class SqliteStore:
+    """ Store of records in a table of the SQLite database. Same interface as the json stores... """
+
+    def __init__(self, database, table, index_keys):
+        self.__database = database
+        self.__table = table
+        self.__index_keys = tuple(index_keys)
+
+    @property
+    def path(self):
+        """ Returns the path of the database file behind the store """
+        return self.__database.path
+
+    @property
+    def index_keys(self):
+        """ Returns the keys of the records that are indexed """
+        return self.__index_keys
+
+    def exists(self):
+        """ The table is created with the database so it always exists """
+        return True
+
+    def refresh(self):
+        """ Nothing to reload, every query goes to the database """
+
+    def transaction(self):
+        """ Returns the transaction of the database the store belongs to """
+        return self.__database.transaction()
+
+    def find(self, key, value):
+        """ Returns the (last) record whose indexed key has the given value or None """
+        if key not in self.__index_keys:
+            raise HotelManagementException("Key " + key + " is not indexed in " + self.__table)
+        try:
+            row = self.__database.execute("SELECT data FROM " + self.__table + " WHERE " + key + " = ? ORDER BY rowid DESC LIMIT 1",
+                                          (value,)).fetchone()
+        except sqlite3.InterfaceError:
+            return None
+        return None if row is None else json.loads(row[0])
+
+    def records(self):
+        """ Returns a list with all the records of the store """
+        rows = self.__database.execute("SELECT data FROM " + self.__table + " ORDER BY rowid").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def __len__(self):
+        return self.__database.execute("SELECT COUNT(*) FROM " + self.__table).fetchone()[0]
+
+    def append(self, record):
+        """ Adds a record to the store """
+        self.extend([record])
+
+    def extend(self, records):
+        """ Adds some records to the store in one transaction """
+        columns = ", ".join(self.__index_keys + ("data",))
+        marks = ", ".join("?" * (len(self.__index_keys) + 1))
+        rows = (tuple(record.get(key) for key in self.__index_keys) + (json.dumps(record),) for record in records)
+        with self.transaction():
+            try:
+                self.__database.executemany("INSERT INTO " + self.__table + " (" + columns + ") VALUES (" + marks + ")", rows)
+            except sqlite3.IntegrityError as e:
+                raise HotelManagementException("Record already found in " + self.__table + " store") from e
+
+    def import_json(self, path_file):
+        """ Replaces the content of the store with the records of a json file (list of records).
+            The file is read as a stream so big files do not need to fit in memory """
+        with self.transaction():
+            self.__database.execute("DELETE FROM " + self.__table)
+            self.extend(iter_json_array(path_file))
+            return len(self)
+
+    def replace(self, records):
+        """ Replaces the content of the store with some records in one transaction """
+        with self.transaction():
+            self.__database.execute("DELETE FROM " + self.__table)
+            self.extend(records)
+            return len(self)
+
+    def export_json(self, path_file):
+        """ Writes all the records of the store to a json file with the original format """
+        records = self.records()
+        try:
+            with open(path_file, encoding='UTF-8', mode="w") as f:
+                json.dump(records, f, indent=4)
+        except FileNotFoundError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        return len(records)
+
+
+class SqliteDatabase:
+    """ SQLite database (WAL mode) with the tables of bookings, stays and checkouts. Operations that check and
+        then write run inside one immediate transaction, so concurrent processes are serialized... """
+
+    # table: (indexed keys, unique keys)
+    TABLES = {"bookings": (("idCard", "localizer"), ("idCard",)),
+              "stays": (("roomKey", "idCard", "localizer"), ("roomKey", "idCard")),
+              "checkouts": (("roomKey",), ("roomKey",))}
+
+    def __init__(self, path_db, timeout=30.0):
+        self.__path_db = path_db
+        self.__depth = 0
+        try:
+            self.__connection = sqlite3.connect(path_db, timeout=timeout, isolation_level=None)
+        except sqlite3.OperationalError as e:
+            raise HotelManagementException("Wrong file or file path") from e
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        for table, (index_keys, unique_keys) in self.TABLES.items():
+            columns = ", ".join(key + " TEXT" for key in index_keys)
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS " + table + " (" + columns + ", data TEXT NOT NULL)")
+            for key in index_keys:
+                unique = "UNIQUE " if key in unique_keys else ""
+                self.__connection.execute("CREATE " + unique + "INDEX IF NOT EXISTS ix_" + table + "_" + key + " ON " + table + " (" + key + ")")
+        self.__stores = {table: SqliteStore(self, table, index_keys) for table, (index_keys, _) in self.TABLES.items()}
+
+    @property
+    def path(self):
+        """ Returns the path of the database file """
+        return self.__path_db
+
+    @property
+    def bookings(self):
+        """ Returns the store of bookings """
+        return self.__stores["bookings"]
+
+    @property
+    def stays(self):
+        """ Returns the store of stays """
+        return self.__stores["stays"]
+
+    @property
+    def checkouts(self):
+        """ Returns the store of checkouts """
+        return self.__stores["checkouts"]
+
+    def stores(self):
+        """ Returns the stores as keyword arguments for HotelManager: HotelManager(**database.stores()) """
+        return {"booking_store": self.bookings, "stay_store": self.stays, "checkout_store": self.checkouts}
+
+    def execute(self, sql, parameters=()):
+        """ Executes a sql statement in the database connection """
+        return self.__connection.execute(sql, parameters)
+
+    def executemany(self, sql, rows):
+        """ Executes a sql statement for every row in the database connection """
+        return self.__connection.executemany(sql, rows)
+
+    @contextmanager
+    def transaction(self):
+        """ Immediate transaction (takes the write lock at the start). Nested calls join the outer transaction """
+        if self.__depth == 0:
+            self.__connection.execute("BEGIN IMMEDIATE")
+        self.__depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__connection.execute("ROLLBACK")
+            raise
+        self.__depth -= 1
+        if self.__depth == 0:
+            self.__connection.execute("COMMIT")
+
+    def migrate_json(self, path_data):
+        """ Imports all_bookings.json, all_stays.json and all_checkouts.json from a data directory.
+            Files that do not exist are skipped. Returns the number of records imported per table """
+        imported = {}
+        with self.transaction():
+            for table in self.TABLES:
+                path_file = os.path.join(path_data, "all_" + table + ".json")
+                if os.path.isfile(path_file):
+                    imported[table] = self.__stores[table].import_json(path_file)
+        return imported
+
+    def close(self):
+        """ Closes the database connection """
+        self.__connection.close()
+
+
+def main(argv=None):
+    """ Migration command: python -m uc3mtravel.sqlitestore <database file> <data directory> """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m uc3mtravel.sqlitestore <database file> <data directory>")
+        return 2
+    database = SqliteDatabase(argv[0])
+    try:
+        imported = database.migrate_json(argv[1])
+    except HotelManagementException as e:
+        print(e.message)
+        return 1
+    finally:
+        database.close()
+    for table, count in imported.items():
+        print(table + ": " + str(count) + " records imported")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
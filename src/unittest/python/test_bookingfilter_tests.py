@@ -0,0 +1,69 @@
+""" Module that includes the tests of the Bloom filter of the bookings file """
+import json
+import os.path
+import tempfile
+from unittest import TestCase
+from uc3mtravel import HotelManager, HotelManagementException, JsonStore, BookingFilter, Instrumentation
+
+
+def pair(number):
+    """ Returns a booking with only the keys of the filter """
+    return {"idCard": str(number).zfill(8) + "Z", "localizer": format(number, "032x")}
+
+
+class TestBookingFilter(TestCase):
+    """ Class to test the booking filter used by guest_arrival """
+
+    def setUp(self):
+        """ Creates a temporary directory for the bookings file and its filter... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path_file = os.path.join(self.__tmp_dir.name, "all_bookings.json")
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_no_false_negatives(self):
+        """ Every pair added is found and the false positive rate is close to the one requested """
+        booking_filter = BookingFilter(JsonStore(self.__path_file, ("idCard", "localizer")), capacity=64, error_rate=0.02)
+        for number in range(0, 2000, 100):
+            booking_filter.extend(pair(index) for index in range(number, number + 100))
+        self.assertTrue(all(booking_filter.might_contain(*pair(number).values()) for number in range(2000)))
+        false_positives = sum(booking_filter.might_contain(*pair(number).values()) for number in range(2000, 12000))
+        self.assertLess(false_positives / 10000, 0.04)
+
+    def test_rebuilt_when_bookings_change(self):
+        """ The filter is rebuilt when the bookings file is written without it """
+        booking_filter = BookingFilter(JsonStore(self.__path_file, ("idCard", "localizer")))
+        booking_filter.extend([pair(1)])
+        with open(self.__path_file, encoding="UTF-8", mode="w") as f:
+            json.dump([pair(2)], f, indent=4)
+        self.assertTrue(booking_filter.might_contain(*pair(2).values()))
+
+    def test_miss_does_not_load_bookings(self):
+        """ An unknown pair is rejected with the message of guest_arrival without loading the bookings file """
+        JsonStore(self.__path_file, ("idCard", "localizer")).extend(pair(number) for number in range(100))
+        booking_store = JsonStore(self.__path_file, ("idCard", "localizer"))
+        BookingFilter(booking_store).rebuild()
+        booking_store = JsonStore(self.__path_file, ("idCard", "localizer"))
+        hotel_manager = HotelManager(booking_store=booking_store,
+                                     stay_store=JsonStore(self.__tmp_dir.name + "/all_stays.json", ("roomKey", "idCard")))
+        with self.assertRaises(HotelManagementException) as cm:
+            hotel_manager.guest_arrival_data({"Localizer": "0" * 32, "IdCard": "12345678Z"})
+        self.assertEqual(cm.exception.message, "No reservation was found with the provided localizer and id card")
+        self.assertEqual(booking_store._current_records(), [])  # pylint: disable=protected-access
+
+    def test_loaded_bookings_skip_filter(self):
+        """ Once the bookings file is in memory arrivals are looked up in its index, not in the filter """
+        JsonStore(self.__path_file, ("idCard", "localizer")).extend(pair(number) for number in range(100))
+        booking_store = JsonStore(self.__path_file, ("idCard", "localizer"))
+        instrumentation = Instrumentation()
+        hotel_manager = HotelManager(booking_store=booking_store, instrumentation=instrumentation,
+                                     stay_store=JsonStore(self.__tmp_dir.name + "/all_stays.json", ("roomKey", "idCard")))
+        for number in (1, 2):
+            with self.assertRaises(HotelManagementException) as cm:
+                hotel_manager.guest_arrival_data({"Localizer": "0" * 32, "IdCard": pair(number)["idCard"]})
+            self.assertEqual(cm.exception.message, "No reservation was found with the provided localizer and id card")
+        # The first arrival builds the filter, which reads the bookings file: the second one uses the store...
+        spans = instrumentation.snapshot()["spans"]
+        self.assertEqual((spans["guest_arrival.filter"]["count"], spans["guest_arrival.booking_lookup"]["count"]), (1, 1))
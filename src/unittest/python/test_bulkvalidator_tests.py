@@ -0,0 +1,83 @@
+""" Module that includes the tests of the validation of reservations by columns """
+import json
+import random
+from pathlib import Path
+from unittest import TestCase
+from unittest import mock
+from uc3mtravel import HotelManager
+from uc3mtravel import bulkvalidator
+
+
+class TestBulkValidator(TestCase):
+    """ Class to test that the validation by columns gives the same messages as the scalar validators """
+
+    __path_tests = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/tests/"
+
+    @classmethod
+    def setUpClass(cls):
+        """ Builds the rows to validate: the F1 tests plus random values, valid or not... """
+        with open(cls.__path_tests + "f1_tests.json", encoding='UTF-8', mode="r") as f:
+            rows = json.load(f)
+        rnd = random.Random(1)
+        for _ in range(2000):
+            number = rnd.randrange(10 ** 8)
+            rows.append({"creditCardNumber": rnd.choice(["5555555555554444", "4111111111111111", str(rnd.randrange(10 ** 16)).zfill(16),
+                                                         "555555555555444a", "1234", "５５５５５５５５５５５５４４４４"]),
+                         "idCard": rnd.choice([str(number).zfill(8) + "TRWAGMYFPDXBNJZSQVHLCKE"[number % 23],
+                                               str(number).zfill(8) + rnd.choice("ABCZ"), "X1234567L", "12345678-z", "123"]),
+                         "nameSurname": rnd.choice(["JOSE LOPEZ", "JOSE", "A" * 51, "JOSELOPEZPEREZ"]),
+                         "phoneNumber": rnd.choice(["911234567", "91123456A", "9112345678", 911234567]),
+                         "roomType": rnd.choice(["SINGLE", "DOUBLE", "SUITE", "single"]),
+                         "arrival": rnd.choice(["14/06/2024", "31/02/2024", "1/7/2024", "2024-06-14", "29/02/2024", " 14/06/2024"]),
+                         "numDays": rnd.choice(["2", "0", "11", "a", 3])})
+        cls.__rows = rows
+
+    def scalar_message(self, hm, row):
+        """ Returns the message room_reservation validation raises for a row, None if it is valid """
+        try:
+            hm.validate_credit_card(row["creditCardNumber"])
+            hm.validate_name_surname(row["nameSurname"])
+            hm.validate_phone_number(row["phoneNumber"])
+            hm.validate_room_type(row["roomType"])
+            hm.validate_arrival(row["arrival"])
+            hm.validate_num_days(row["numDays"])
+            hm.validate_id_card(row["idCard"])
+        except bulkvalidator.HotelManagementException as exc:
+            return exc.message
+        return None
+
+    def test_same_messages_as_scalar_validators(self):
+        """ Every row gets the message of the first scalar validator that fails, with and without NumPy """
+        hm = HotelManager()
+        columns = {key: [row[key] for row in self.__rows] for key in bulkvalidator.COLUMNS}
+        expected = [self.scalar_message(hm, row) for row in self.__rows]
+        for numpy in (bulkvalidator.numpy, None):
+            with self.subTest("numpy" if numpy else "pure python"):
+                with mock.patch.object(bulkvalidator, "numpy", numpy):
+                    valid, messages = hm.validate_reservation_columns(columns)
+                self.assertEqual(messages, expected)
+                self.assertEqual(valid, [message is None for message in expected])
+
+    def test_trailing_newline(self):
+        """ A trailing newline or a value of another type in any field gets the message of the scalar validators """
+        hm = HotelManager()
+        row = {"creditCardNumber": "5555555555554444", "idCard": "12345678Z", "nameSurname": "JOSE LOPEZ",
+               "phoneNumber": "911234567", "roomType": "SINGLE", "arrival": "14/06/2024", "numDays": "2"}
+        validators = {"creditCardNumber": "validate_credit_card", "idCard": "validate_id_card",
+                      "nameSurname": "validate_name_surname", "phoneNumber": "validate_phone_number",
+                      "roomType": "validate_room_type", "arrival": "validate_arrival", "numDays": "validate_num_days"}
+        for key in bulkvalidator.COLUMNS:
+            with self.subTest(key):
+                rows = [dict(row, **{key: row[key] + "\n"}), dict(row, **{key: 5})]
+                expected = []
+                for data in rows:
+                    try:
+                        expected.append(self.scalar_message(hm, data))
+                    except (TypeError, ValueError):
+                        expected.append(bulkvalidator.TYPE_ERRORS[validators[key]])
+                _, messages = hm.validate_reservation_columns({column: [data[column] for data in rows]
+                                                               for column in bulkvalidator.COLUMNS})
+                self.assertEqual(messages, expected)
+        _, messages = hm.validate_reservation_columns({column: [row[column] + ("\n" if column == "arrival" else "")]
+                                                       for column in bulkvalidator.COLUMNS})
+        self.assertEqual(messages, ["Invalid arrival date provided (format must be dd/mm/yyyy"])
@@ -0,0 +1,77 @@
+""" Module that includes the tests of the departures index and the stays that leave a day """
+import hashlib
+import json
+import tempfile
+from datetime import date, datetime
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import DeparturesIndex, HotelManager, HotelManagementException, JsonStore
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+def stay(number, departure="2024-06-16 10:00:00"):
+    """ Returns a stay record with a room key made from the number """
+    return {"idCard": str(number), "departure": departure, "roomKey": hashlib.sha256(str(number).encode()).hexdigest()}
+
+
+class TestDeparturesIndex(TestCase):
+    """ Class to test the departures index and its use by guest_checkout """
+
+    def setUp(self):
+        """ Creates a temporary data directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = self.__tmp_dir.name
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_follows_store(self):
+        """ Stays appended by the index, by other writers and a rewritten store are indexed """
+        stay_store = JsonStore(self.__path + "/all_stays.json", ("roomKey", "idCard"))
+        index = DeparturesIndex(stay_store)
+        self.assertEqual(index.due(date(2024, 6, 16)), [])
+        self.assertTrue(index.built)
+        index.extend(stay_store, [stay(1), stay(2, "2024-06-16 08:30:00.250000"), stay(3, "2024-06-17 10:00:00")])
+        self.assertEqual(index.due(date(2024, 6, 16)), [stay(2)["roomKey"], stay(1)["roomKey"]])
+        self.assertEqual(index.departure(stay(3)["roomKey"]), datetime(2024, 6, 17, 10))
+        JsonStore(self.__path + "/all_stays.json", ("roomKey", "idCard")).extend([stay(4), {"roomKey": "x"}])
+        self.assertEqual(len(index.due(date(2024, 6, 16))), 3)
+        with open(self.__path + "/all_stays.json", encoding="UTF-8", mode="w") as f:
+            json.dump([stay(5, "2024-06-17 09:00:00")], f, indent=4)
+        self.assertEqual(index.due(date(2024, 6, 16)), [])
+        self.assertEqual(index.due(date(2024, 6, 17)), [stay(5)["roomKey"]])
+        self.assertIsNone(index.departure(stay(3)["roomKey"]))
+
+    def test_departures_due(self):
+        """ Stays leaving today: one checks out by itself, the rest at the end of the day """
+        hotel_manager = HotelManager(path_data=self.__path, shards=2)
+        room_keys = []
+        with freeze_time("2024-06-14"):
+            for number, num_days in ((1, "2"), (2, "2"), (3, "3")):
+                id_card = str(number).zfill(8) + NIF_LETTERS[number % 23]
+                localizer = hotel_manager.room_reservation("5555555555554444", id_card, "JOSE LOPEZ", "911234567",
+                                                           "SINGLE", "14/06/2024", num_days)
+                room_keys.append(hotel_manager.guest_arrival_data({"Localizer": localizer, "IdCard": id_card}))
+        self.assertEqual(sorted(hotel_manager.departures_due(date(2024, 6, 16))), sorted(room_keys[:2]))
+        with freeze_time("2024-06-15"):
+            with self.assertRaises(HotelManagementException) as cm:
+                hotel_manager.guest_checkout(room_keys[0])
+            self.assertEqual(cm.exception.message,
+                             "The departure date was not expected to be today according to the stay information")
+        with freeze_time("2024-06-16"):
+            self.assertTrue(hotel_manager.guest_checkout(room_keys[0]))
+            self.assertEqual(hotel_manager.departures_due(), [room_keys[1]])
+            self.assertEqual(hotel_manager.guest_checkouts_due(), [room_keys[1]])
+            self.assertEqual(hotel_manager.guest_checkouts_due(), [])
+        self.assertEqual(len(hotel_manager.checkout_store), 2)
+
+    def test_without_index(self):
+        """ Without the index the stays of the day are read from the store """
+        hotel_manager = HotelManager(stay_store=JsonStore(self.__path + "/all_stays.json", ("roomKey", "idCard")),
+                                     checkout_store=JsonStore(self.__path + "/all_checkouts.json", ("roomKey",)),
+                                     departures_index=False)
+        hotel_manager.stay_store.extend([stay(1), stay(2, "2024-06-18 10:00:00")])
+        self.assertEqual(hotel_manager.departures_due(date(2024, 6, 16)), [stay(1)["roomKey"]])
+        self.assertIsNone(hotel_manager.indexed_departure(stay(1)["roomKey"]))
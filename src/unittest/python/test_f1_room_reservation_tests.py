@@ -1,21 +1,21 @@
 """ Module that includes the tests of GE2.2 - Function 1 - Room Reservation """
-import os.path
 from pathlib import Path
 import json
+import tempfile
 from unittest import TestCase
 from uc3mtravel import HotelManager
 from uc3mtravel import HotelManagementException
+from uc3mtravel import JsonStore
 
 
 class TestRoomReservation(TestCase):
     """ Class to test Function 1: room reservation process """
 
-    __path_tests = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/tests/"
-    __path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+    __path_tests = str(Path(__file__).resolve().parents[2]) + "/data/tests/"
 
     @classmethod
     def setUpClass(cls):
-        """ Opens input test files with test data and assigns to attributes for the tests to use. Also clear store..."""
+        """ Opens input test files with test data and assigns to attributes for the tests to use..."""
         # Load all tests...
         try:
             with open(cls.__path_tests + "f1_tests.json", encoding='UTF-8', mode="r") as f:
@@ -25,19 +25,16 @@ class TestRoomReservation(TestCase):
         except json.JSONDecodeError:
             test_data_f1 = []
         cls.__test_data_f1 = test_data_f1
-        # Clear the bookings file from possible previous runs...
-        all_bookings = cls.__path_data + "/all_bookings.json"
-        if os.path.isfile(all_bookings):
-            os.remove(all_bookings)
         return True
 
-    @classmethod
-    def tearDownClass(cls):
-        """ Deletes tmp file created during tests... """
-        tmp = cls.__path_data + "/tests/tmp_test_data.json"
-        if os.path.isfile(tmp):
-            os.remove(tmp)
-        return True
+    def setUp(self):
+        """ Every test has its own empty data directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path_data = self.__tmp_dir.name + "/"
+
+    def tearDown(self):
+        """ Deletes the data directory of the test... """
+        self.__tmp_dir.cleanup()
 
     def test_room_reservation_tests_ok(self):
         """ TestCases: TC1 -  Expected OK. Checks Card Number is OK. Localizer OK + Booking is stored
@@ -47,7 +44,7 @@ class TestRoomReservation(TestCase):
             if input_data["idTest"] in ("TC1", "TC10", "TC11"):
                 with self.subTest(input_data["idTest"]):
                     print("Executing: " + input_data["idTest"])
-                    hm = HotelManager()
+                    hm = HotelManager(path_data=self.__path_data)
                     localizer = hm.room_reservation(input_data["creditCardNumber"], input_data["idCard"],
                                                     input_data["nameSurname"], input_data["phoneNumber"],
                                                     input_data["roomType"], input_data["arrival"],
@@ -60,7 +57,7 @@ class TestRoomReservation(TestCase):
                         case "TC11":
                             self.assertEqual(localizer, "3456311fa06a9a4d139681398525b869")
                     try:
-                        with open(self.__path_data + "/all_bookings.json", encoding='UTF-8', mode="r") as f:
+                        with open(self.__path_data + "all_bookings.json", encoding='UTF-8', mode="r") as f:
                             bookings = json.load(f)
                     except FileNotFoundError as e:
                         raise HotelManagementException("Wrong file or file path") from e
@@ -78,7 +75,7 @@ class TestRoomReservation(TestCase):
             if input_data["idTest"] not in ("TC1", "TC10", "TC11"):
                 with self.subTest(input_data["idTest"]):
                     print("Executing: " + input_data["idTest"])
-                    hm = HotelManager()
+                    hm = HotelManager(path_data=self.__path_data)
                     with self.assertRaises(HotelManagementException) as result:
                         hm.room_reservation(input_data["creditCardNumber"], input_data["idCard"],
                                             input_data["nameSurname"], input_data["phoneNumber"],
@@ -119,3 +116,20 @@ class TestRoomReservation(TestCase):
                             self.assertEqual(result.exception.message, "Invalid ID Card provided. Must be valid Spanish NIF document")
                         case "TC20":
                             self.assertEqual(result.exception.message, "Invalid ID Card provided. Must be valid Spanish NIF document")
+
+    def test_room_reservations_bulk(self):
+        """ TestCases: TC1 to TC20 in one batch, plus TC1 again. Valid ones get a localizer and are stored in one
+                       write, the others get the same error message as room_reservation """
+        expected = {"TC1": "3ff517743faae67b33ddefa77163099d", "TC10": "a5873426af2a796779344f7ce25009c8",
+                    "TC11": "3456311fa06a9a4d139681398525b869", "TC2": "Invalid credit card number provided. Not a valid number.",
+                    "TC7": "Invalid phone number provided (must be 9 digits)",
+                    "TC18": "Invalid ID Card provided. Must be valid Spanish NIF document"}
+        hm = HotelManager(path_data=self.__path_data)
+        results = hm.room_reservations_bulk(self.__test_data_f1 + [self.__test_data_f1[0], {"idCard": "12345678Z"}])
+        for input_data, result in zip(self.__test_data_f1, results):
+            if input_data["idTest"] in expected:
+                with self.subTest(input_data["idTest"]):
+                    self.assertEqual(result, expected[input_data["idTest"]])
+        self.assertEqual(results[-2], "Client already has a reservation")
+        self.assertEqual(results[-1], "Reservation data is not a correct json format: incorrect key values")
+        self.assertEqual(len(JsonStore(self.__path_data + "all_bookings.json", ("idCard",))), 3)
@@ -3,22 +3,26 @@ import hashlib
 import unittest
 import os.path
 import json
+import shutil
+import tempfile
 from pathlib import Path
 from freezegun import freeze_time
 from uc3mtravel import HotelManager
 from uc3mtravel import HotelManagementException
+from uc3mtravel import JsonStore
 
 
 class TestGuestArrival(unittest.TestCase):
     """ Class to test Function 2: guest arrival process """
 
-    __path_tests = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/tests/"
-    __path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+    # The bookings of the OK tests of function 1 are the ones of the data files of the project...
+    __path_tests = str(Path(__file__).resolve().parents[2]) + "/data/tests/"
+    __path_bookings = str(Path(__file__).resolve().parents[2]) + "/data/all_bookings.json"
     __tmp_test_data_file = "tmp_test_data.json"
 
     @classmethod
     def setUpClass(cls):
-        """ Opens input test file with test data and assigns to attributes for the tests to use. Also clear store..."""
+        """ Opens input test file with test data and assigns to attributes for the tests to use..."""
         # Load all tests...
         lines = []
         try:
@@ -28,15 +32,21 @@ class TestGuestArrival(unittest.TestCase):
         except FileNotFoundError as e:
             raise HotelManagementException("Wrong file or file path") from e
         cls.__test_data_f2 = lines
-        # Clear the stays file from possible previous runs...
-        all_stays = cls.__path_data + "all_stays.json"
-        if os.path.isfile(all_stays):
-            os.remove(all_stays)
         return True
 
+    def setUp(self):
+        """ Every test has its own data directory with the bookings and no stays... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path_data = self.__tmp_dir.name + "/"
+        shutil.copy(self.__path_bookings, self.__path_data + "all_bookings.json")
+
+    def tearDown(self):
+        """ Deletes the data directory of the test... """
+        self.__tmp_dir.cleanup()
+
     def generate_tmp_test_data_file(self, line):
         """ Generates an individual test file with just on entry to test as F2 requires a file path as input..."""
-        with open(self.__path_tests + self.__tmp_test_data_file, encoding="UTF-8", mode="w") as file:
+        with open(self.__path_data + self.__tmp_test_data_file, encoding="UTF-8", mode="w") as file:
             file.write(line)
 
     @freeze_time("2024-06-14")
@@ -48,8 +58,8 @@ class TestGuestArrival(unittest.TestCase):
                 with self.subTest(test_id):
                     print("Executing: " + test_id + ": " + input_data)
                     self.generate_tmp_test_data_file(input_data)
-                    hm = HotelManager()
-                    room_key = hm.guest_arrival(self.__path_tests + self.__tmp_test_data_file)
+                    hm = HotelManager(path_data=self.__path_data)
+                    room_key = hm.guest_arrival(self.__path_data + self.__tmp_test_data_file)
                     match test_id:
                         case "TC1":
                             self.assertEqual(room_key, "ee25b7b863b77e9106d851875103a3076748a0d487e7a42340ea18855d36b89f")
@@ -90,9 +100,9 @@ class TestGuestArrival(unittest.TestCase):
                 with self.subTest(test_id):
                     print("Executing: " + test_id + ": " + input_data)
                     self.generate_tmp_test_data_file(input_data)
-                    hm = HotelManager()
+                    hm = HotelManager(path_data=self.__path_data)
                     with self.assertRaises(HotelManagementException) as result:
-                        hm.guest_arrival(self.__path_tests + self.__tmp_test_data_file)
+                        hm.guest_arrival(self.__path_data + self.__tmp_test_data_file)
                         # Not all invalid tests will raise json format error because error may be in data or labels...
                         if test_id not in ["TC1", "TC62", "TC63", "TC13", "TC16", "TC19", "TC22", "TC35", "TC38", "TC41", "TC44", "TC51", "TC54", "TC57", "TC60"]:
                             self.assertEqual(result.exception.message, "Input data file is not a correct json format as expected")
@@ -102,3 +112,39 @@ class TestGuestArrival(unittest.TestCase):
                             self.assertEqual(result.exception.message, "No reservation was found with the provided localizer and id card")
         store_final_hash = self.get_store_hash()
         self.assertEqual(store_final_hash, store_original_hash)
+
+    @freeze_time("2024-06-14")
+    def test_guest_arrivals_bulk(self):
+        """ TestCases: TC1 to TC63 as one JSON Lines stream and as a directory of files. OK ones get their room key
+                       and are stored in one write, the others get the same error as guest_arrival """
+        expected = {1: "ee25b7b863b77e9106d851875103a3076748a0d487e7a42340ea18855d36b89f",
+                    62: "6cfe66d06630a99766b9fb87c5a09f4707d60a95212a45c1edd2c6fba334c2c0",
+                    63: "8dd164818a021e709aec4ed512be4318b16d3fc94c78579271e91a1991db870e",
+                    3: "Input data file is not a correct json format as expected",
+                    13: "Input data file is not a correct json format: incorrect key values",
+                    16: "No reservation was found with the provided localizer and id card"}
+        lines = [line for line in self.__test_data_f2 if line]  # TC2 (empty line) is not a record in JSON Lines...
+        expected = {lines.index(self.__test_data_f2[test_id - 1]): result for test_id, result in expected.items()}
+        booking_store = JsonStore(self.__path_data + "all_bookings.json", ("idCard", "localizer"))
+        os.mkdir(self.__path_data + "arrivals")
+        for test_id in range(len(lines)):
+            with open(self.__path_data + "arrivals/arrival_" + str(test_id).zfill(2) + ".json", encoding="UTF-8", mode="w") as file:
+                file.write(lines[test_id])
+        for mode, source in (("stream", lines), ("directory", self.__path_data + "arrivals")):
+            with self.subTest(mode):
+                stay_store = JsonStore(self.__path_data + "all_stays_" + mode + ".json", ("roomKey", "idCard"))
+                hm = HotelManager(booking_store=booking_store, stay_store=stay_store)
+                results = hm.guest_arrivals_bulk(source)
+                self.assertEqual(len(results), len(lines))
+                for index, result in enumerate(results):
+                    if index in expected:
+                        self.assertEqual(result, expected[index])
+                self.assertEqual(len(stay_store), 3)
+                self.assertEqual(hm.guest_arrivals_bulk(lines[:1]), ["Client already has a stay in stays file"])
+
+    def test_guest_arrivals_bulk_not_objects(self):
+        """ Json lines that are not objects get an error each, the batch goes on """
+        hm = HotelManager(path_data=self.__path_data)
+        self.assertEqual(hm.guest_arrivals_bulk(["5", "null", "true", '"x"', "[1]", "{}"]),
+                         ["Input data file is not a correct json format: incorrect key values"] * 5 +
+                         ["Input data file is not a correct json format as expected"])
@@ -3,6 +3,8 @@ import hashlib
 import unittest
 import os.path
 import json
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
 from freezegun import freeze_time
@@ -13,12 +15,13 @@ from uc3mtravel import HotelManagementException
 class TestGuestCheckout(unittest.TestCase):
     """ Class to test Function 3: guest checkout process """
 
-    __path_tests = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/tests/"
-    __path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+    # The bookings and stays of the OK tests of functions 1 and 2 are the ones of the data files of the project...
+    __path_tests = str(Path(__file__).resolve().parents[2]) + "/data/tests/"
+    __path_seed = str(Path(__file__).resolve().parents[2]) + "/data/"
 
     @classmethod
     def setUpClass(cls):
-        """ Opens input test file with test data and assigns to attributes for the tests to use. Also clear checkouts store..."""
+        """ Opens input test file with test data and assigns to attributes for the tests to use..."""
         # Load all tests...
         try:
             with open(cls.__path_tests + "f3_tests.json", encoding='UTF-8', mode="r") as f:
@@ -28,12 +31,19 @@ class TestGuestCheckout(unittest.TestCase):
         except json.JSONDecodeError:
             test_data_f3 = []
         cls.__test_data_f3 = test_data_f3
-        # Clear the checkouts file from possible previous runs...
-        all_checkouts = cls.__path_data + "/all_checkouts.json"
-        if os.path.isfile(all_checkouts):
-            os.remove(all_checkouts)
         return True
 
+    def setUp(self):
+        """ Every test has its own data directory with the bookings and stays and no checkouts... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path_data = self.__tmp_dir.name + "/"
+        for file_name in ("all_bookings.json", "all_stays.json"):
+            shutil.copy(self.__path_seed + file_name, self.__path_data + file_name)
+
+    def tearDown(self):
+        """ Deletes the data directory of the test... """
+        self.__tmp_dir.cleanup()
+
     @freeze_time("2024-06-16")
     def test_guest_checkout_tests_all_ok(self):
         """ TestCases: TC5, TC6, TC8 - Expected OK. Checks call result is True, and checkout is added to checkouts store """
@@ -42,7 +52,7 @@ class TestGuestCheckout(unittest.TestCase):
                 test_id = "TC" + str(index + 1)
                 with self.subTest(test_id):
                     print("Executing: " + test_id)
-                    hm = HotelManager()
+                    hm = HotelManager(path_data=self.__path_data)
                     ok_checkout = hm.guest_checkout(input_data["roomKey"])
                     self.assertTrue(ok_checkout)
                     try:
@@ -70,17 +80,19 @@ class TestGuestCheckout(unittest.TestCase):
     @freeze_time("2024-06-16")
     def test_guest_checkout_tests_ko(self):
         """ TestCases KO: TC1, TC2, TC3, TC4, TC7... """
+        # TC7 needs the guest of its room key to have checked out already...
+        HotelManager(path_data=self.__path_data).guest_checkout(self.__test_data_f3[6]["roomKey"])
         store_original_hash = self.get_store_hash()
         for index, input_data in enumerate(self.__test_data_f3):
             if index + 1 not in [5, 6, 8]:  # The ones ok...
                 test_id = "TC" + str(index + 1)
                 with self.subTest(test_id):
                     print("Executing: " + test_id)
-                    hm = HotelManager()
+                    hm = HotelManager(path_data=self.__path_data)
                     with self.assertRaises(HotelManagementException) as result:
                         if test_id in ["TC2"]:  # This test case needs to simulate that stays file does not exist...
-                            stays_file = self.__path_data + "/all_stays.json"
-                            stays_bckp_file = self.__path_data + "/all_stays_bckp.json"
+                            stays_file = self.__path_data + "all_stays.json"
+                            stays_bckp_file = self.__path_data + "all_stays_bckp.json"
                             if os.path.isfile(stays_file):
                                 os.rename(stays_file, stays_bckp_file)
                         if test_id in ["TC4"]:  # This test case need to override the fake date to an incorrect checkout day one...
@@ -0,0 +1,40 @@
+""" Module that includes the tests of the LRU cache of localizers """
+import hashlib
+from unittest import TestCase
+from uc3mtravel import HotelReservation, HotelReservationRecord
+from uc3mtravel.hashcache import HashCache, LOCALIZERS
+
+
+class TestHashCache(TestCase):
+    """ Class to test the bounded cache of hashes and its statistics """
+
+    def test_lru_eviction(self):
+        """ The least recently used hash is evicted and hits and misses are counted """
+        cache = HashCache(maxsize=2)
+        for fields in (("a",), ("b",), ("a",), ("c",)):
+            cache.get(HashCache.key(*fields), lambda fields=fields: fields[0].upper())
+        self.assertEqual(cache.get(HashCache.key("a"), lambda: "other"), "A")
+        self.assertEqual(cache.get(HashCache.key("b"), lambda: "other"), "other")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["size"]), (2, 4, 2, 2))
+        cache.resize(0)
+        self.assertEqual(cache.get(HashCache.key("a"), lambda: "none"), "none")
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_types_in_key(self):
+        """ Equal values of different types do not share a hash and unhashable fields are not cached """
+        cache = HashCache()
+        self.assertEqual(cache.get(HashCache.key(1), lambda: "int"), "int")
+        self.assertEqual(cache.get(HashCache.key(True), lambda: "bool"), "bool")
+        self.assertEqual(cache.get(HashCache.key(["a"]), lambda: "list"), "list")
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_localizer(self):
+        """ A cached localizer is the md5 of the reservation, also for the records read from the store """
+        reservation = HotelReservation("12345678Z", "5555555555554444", "JOSE LOPEZ", "911234567", "SINGLE",
+                                       "14/06/2024", 2)
+        expected = hashlib.md5(str(reservation).encode()).hexdigest()
+        hits = LOCALIZERS.stats()["hits"]
+        self.assertEqual(reservation.localizer, expected)
+        self.assertEqual(HotelReservationRecord.from_json(dict(reservation.json)).localizer, expected)
+        self.assertGreater(LOCALIZERS.stats()["hits"], hits)
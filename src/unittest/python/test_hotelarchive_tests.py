@@ -0,0 +1,84 @@
+""" Module that includes the tests of the archive of completed stays """
+import os.path
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import HotelManager, HotelManagementException, HotelArchive
+from uc3mtravel.hotelarchive import main
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+def id_card(number):
+    """ Returns the NIF of client number """
+    return str(number).zfill(8) + NIF_LETTERS[number % 23]
+
+
+def reserve(hotel_manager, number, arrival="14/06/2024"):
+    """ Books client number for 2 days. Returns the localizer """
+    return hotel_manager.room_reservation("5555555555554444", id_card(number), "JOSE LOPEZ", "911234567",
+                                          "SINGLE", arrival, "2")
+
+
+class TestHotelArchive(TestCase):
+    """ Class to test the archive of completed stays """
+
+    def setUp(self):
+        """ Creates a temporary data directory with a client that has left, one in the hotel and one booked... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = self.__tmp_dir.name
+        with freeze_time("2024-06-14"):
+            hotel_manager = HotelManager(path_data=self.__path)
+            localizers = {number: reserve(hotel_manager, number) for number in (1, 2, 3)}
+            self.__room_keys = {number: hotel_manager.guest_arrival_data({"Localizer": localizers[number], "IdCard": id_card(number)})
+                                for number in (1, 2)}
+        with freeze_time("2024-06-16"):
+            HotelManager(path_data=self.__path).guest_checkout(self.__room_keys[1])
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_archive_completed(self):
+        """ Only the stay with a checkout, its booking and its checkout go to the partition of its month """
+        hotel_manager = HotelManager(path_data=self.__path)
+        self.assertEqual(hotel_manager.archive_completed(), 1)
+        self.assertEqual(hotel_manager.archive.partitions(), ["2024-06"])
+        self.assertEqual(sorted(record["idCard"] for record in hotel_manager.booking_store.records()), [id_card(2), id_card(3)])
+        self.assertEqual([record["idCard"] for record in hotel_manager.stay_store.records()], [id_card(2)])
+        self.assertEqual(hotel_manager.checkout_store.records(), [])
+        for name in ("all_bookings", "all_stays", "all_checkouts"):
+            self.assertTrue(os.path.isfile(os.path.join(self.__path, "archive", "2024-06", name + ".json")))
+        self.assertEqual(hotel_manager.archive_completed(), 0)
+
+    def test_lookups_resolve_in_archive(self):
+        """ Archived clients are still found by the checks of the three operations """
+        HotelManager(path_data=self.__path).archive_completed()
+        hotel_manager = HotelManager(path_data=self.__path)
+        with self.assertRaises(HotelManagementException) as cm:
+            reserve(hotel_manager, 1)
+        self.assertEqual(cm.exception.message, "Client already has a reservation")
+        with freeze_time("2024-06-16"):
+            with self.assertRaises(HotelManagementException) as cm:
+                hotel_manager.guest_checkout(self.__room_keys[1])
+            self.assertEqual(cm.exception.message, "Client already found in checkouts file. Not allowed to checkout again")
+            self.assertTrue(hotel_manager.guest_checkout(self.__room_keys[2]))
+        self.assertEqual(HotelArchive(self.__path).find("all_stays", "roomKey", self.__room_keys[1])["idCard"], id_card(1))
+        self.assertIsNone(HotelArchive(self.__path).find("all_stays", "roomKey", self.__room_keys[2]))
+
+    def test_archive_before(self):
+        """ With a date, only the stays with a checkout before it are archived """
+        hotel_manager = HotelManager(path_data=self.__path)
+        self.assertEqual(hotel_manager.archive_completed(datetime(2024, 6, 1)), 0)
+        self.assertEqual(main([self.__path, "--before", "01/07/2024"]), 0)
+        self.assertEqual(len(hotel_manager.stay_store), 1)
+
+    def test_no_archive_for_injected_stores(self):
+        """ A manager with injected stores has no archive unless one is given """
+        hotel_manager = HotelManager(path_data=self.__path)
+        injected = HotelManager(booking_store=hotel_manager.booking_store, stay_store=hotel_manager.stay_store,
+                                checkout_store=hotel_manager.checkout_store)
+        with self.assertRaises(HotelManagementException) as cm:
+            injected.archive_completed()
+        self.assertEqual(cm.exception.message, "There is no archive for the stores of this manager")
@@ -0,0 +1,66 @@
+""" Module that includes the tests of the integrity audit of the data files """
+import json
+import os.path
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import HotelManager
+from uc3mtravel.hotelaudit import audit
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+class TestHotelAudit(TestCase):
+    """ Class to test the integrity audit of the data files """
+
+    __path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+
+    def test_audit_ok(self):
+        """ The data files of the project have no problems """
+        self.assertEqual(list(audit(self.__path_data, workers=2, chunk_size=1)), [])
+
+    def test_audit_tampered(self):
+        """ A changed booking, a stay without booking and a checkout without stay are reported """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for file_name in ("all_bookings.json", "all_stays.json", "all_checkouts.json"):
+                shutil.copy(self.__path_data + file_name, tmp_dir)
+            with open(tmp_dir + "/all_bookings.json", encoding="UTF-8", mode="r") as f:
+                bookings = json.load(f)
+            bookings[1]["numDays"] = "3"
+            del bookings[2]
+            with open(tmp_dir + "/all_bookings.json", encoding="UTF-8", mode="w") as f:
+                json.dump(bookings, f, indent=4)
+            with open(tmp_dir + "/all_checkouts.json", encoding="UTF-8", mode="w") as f:
+                json.dump([{"roomKey": "0" * 64, "realDeparture": 1718496000.0}], f, indent=4)
+            problems = list(audit(tmp_dir, workers=2, chunk_size=1))
+        self.assertEqual([(problem["file"], problem["index"]) for problem in problems],
+                         [("all_bookings.json", 1), ("all_stays.json", 2), ("all_checkouts.json", 0)])
+        self.assertEqual(problems[0]["error"], "Localizer does not match data inside bookings file. Data may have been altered")
+
+    def test_audit_layouts(self):
+        """ Shards, other storage formats and the archive are audited like the json files """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            hotel_manager = HotelManager(path_data=tmp_dir, storage_format="binary", shards=2)
+            arrivals = []
+            with freeze_time("2024-06-14"):
+                for number in range(1, 5):
+                    id_card = str(number).zfill(8) + NIF_LETTERS[number % 23]
+                    localizer = hotel_manager.room_reservation("5555555555554444", id_card, "JOSE LOPEZ", "911234567",
+                                                               "SINGLE", "14/06/2024", "2")
+                    arrivals.append({"Localizer": localizer, "IdCard": id_card})
+                room_keys = [hotel_manager.guest_arrival_data(arrival) for arrival in arrivals[:2]]
+            with freeze_time("2024-06-16"):
+                hotel_manager.guest_checkout(room_keys[0])
+            self.assertEqual(hotel_manager.archive_completed(), 1)
+            self.assertEqual(list(audit(workers=1, chunk_size=1, hotel_manager=hotel_manager)), [])
+            shard = hotel_manager.booking_store.shards[1]
+            bookings = shard.records()
+            bookings[0]["numDays"] = "3"
+            shard.replace(bookings)
+            archived = hotel_manager.archive.partition_store("2024-06", "all_stays")
+            archived.replace([dict(archived.records()[0], departure="2024-06-17 00:00:00")])
+            problems = list(audit(workers=1, chunk_size=1, hotel_manager=hotel_manager))
+        self.assertEqual([(problem["file"], problem["index"]) for problem in problems],
+                         [("all_bookings.1.bin", 0), (os.path.join("archive", "2024-06", "all_stays.json"), 0)])
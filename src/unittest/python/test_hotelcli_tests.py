@@ -0,0 +1,94 @@
+""" Module that includes the tests of the command line driver """
+import io
+import json
+import os.path
+import tempfile
+from contextlib import redirect_stdout
+from unittest import TestCase, mock
+from freezegun import freeze_time
+from uc3mtravel import hotelcli
+from uc3mtravel.hotelcli import main
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+def reservation(number, credit_card="5555555555554444"):
+    """ Returns a reservation line of client number """
+    return json.dumps({"creditCardNumber": credit_card, "idCard": str(number).zfill(8) + NIF_LETTERS[number % 23],
+                       "nameSurname": "JOSE LOPEZ", "phoneNumber": "911234567", "roomType": "SINGLE",
+                       "arrival": "14/06/2024", "numDays": "2"})
+
+
+class TestHotelCli(TestCase):
+    """ Class to test the subcommands of the uc3mtravel command """
+
+    def setUp(self):
+        """ Creates a temporary data directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = self.__tmp_dir.name
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def run_command(self, argv, lines):
+        """ Runs the command with the lines as input file. Returns (exit code, output json lines) """
+        path_file = os.path.join(self.__path, "input.jsonl")
+        with open(path_file, encoding="UTF-8", mode="w") as f:
+            f.write("\n".join(lines) + "\n")
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            code = main(["--data", self.__path] + argv + [path_file])
+        return code, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    @freeze_time("2024-06-14")
+    def test_reserve_arrive_checkout(self):
+        """ Every input line gets one result line, in order """
+        code, results = self.run_command(["reserve"], [reservation(1), reservation(1), "not json", reservation(2)])
+        self.assertEqual(code, 1)
+        self.assertEqual([list(result) for result in results], [["localizer"], ["error"], ["error"], ["localizer"]])
+        self.assertEqual(results[1]["error"], "Client already has a reservation")
+        arrivals = [json.dumps({"Localizer": results[0]["localizer"], "IdCard": "00000001R"})]
+        code, results = self.run_command(["arrive"], arrivals)
+        self.assertEqual(code, 0)
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.assertEqual(main(["--data", self.__path, "due", "--day", "16/06/2024"]), 0)
+        self.assertEqual([json.loads(line) for line in stdout.getvalue().splitlines()], results)
+        with freeze_time("2024-06-16"):
+            code, results = self.run_command(["checkout"], [json.dumps(results[0]), json.dumps(results[0])])
+        self.assertEqual(code, 1)
+        self.assertEqual(results[1]["error"], "Client already found in checkouts file. Not allowed to checkout again")
+
+    @freeze_time("2024-06-14")
+    def test_import_with_workers(self):
+        """ A feed validated in worker processes gets the same results as in one process """
+        lines = [reservation(number) for number in range(20)] + [reservation(5), reservation(30, "5555555555554445")]
+        code, results = self.run_command(["import", "--workers", "2", "--chunk-size", "4"], lines)
+        self.assertEqual(code, 1)
+        self.assertEqual(sum("localizer" in result for result in results), 20)
+        self.assertEqual(results[-2:], [{"error": "Client already has a reservation"},
+                                        {"error": "Invalid credit card number provided. Not a valid number."}])
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.assertEqual(main(["--data", self.__path, "export", "bookings"]), 0)
+        self.assertEqual([json.loads(line)["localizer"] for line in stdout.getvalue().splitlines()],
+                         [result["localizer"] for result in results[:20]])
+
+    def test_wrong_options(self):
+        """ Wrong options of the data files exit with 2 """
+        self.assertEqual(main(["--data", self.__path, "--shards", "0", "export", "stays"]), 2)
+
+    @freeze_time("2024-06-14")
+    def test_import_workers_options(self):
+        """ The workers of import get the data options of the command, the bookings land in the shards """
+        lines = [reservation(number) for number in range(8)]
+        code, results = self.run_command(["--storage-format", "binary", "--shards", "2", "import", "--workers", "2",
+                                          "--chunk-size", "3"], lines)
+        self.assertEqual((code, len(results)), (0, 8))
+        self.assertTrue(os.path.exists(os.path.join(self.__path, "all_bookings.1.bin")))
+        options = {"journal": False, "storage_format": "binary", "path_data": self.__path, "hotel_id": None,
+                   "shards": 2, "inventory": None}
+        with mock.patch.object(hotelcli, "HotelManager") as hotel_manager:
+            hotelcli.prepare_chunk(options, [])
+        hotel_manager.assert_called_once_with(**options)
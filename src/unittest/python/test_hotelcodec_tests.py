@@ -0,0 +1,145 @@
+""" Module that includes the tests of the storage formats of the data files """
+import os
+import tempfile
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import HotelManager, HotelManagementException, CodecStore
+from uc3mtravel.hotelcodec import CODECS, convert, convert_data
+
+BOOKING = {"creditCardNumber": "5555555555554444", "idCard": "12345678Z", "nameSurname": "JOSE LOPEZ",
+           "phoneNumber": "911234567", "roomType": "SINGLE", "arrival": "14/06/2024", "numDays": "2",
+           "localizer": "3ff517743faae67b33ddefa77163099d"}
+STAY = {"alg": "SHA-256", "idCard": "12345678Z", "localizer": "3ff517743faae67b33ddefa77163099d", "roomType": "SINGLE",
+        "arrival": "2024-06-14 00:00:00", "departure": "2024-06-16 00:00:00",
+        "roomKey": "ee25b7b863b77e9106d851875103a3076748a0d487e7a42340ea18855d36b89f"}
+CHECKOUT = {"roomKey": "ee25b7b863b77e9106d851875103a3076748a0d487e7a42340ea18855d36b89f", "realDeparture": 1718496000.0}
+# Records that do not fit the binary schemas (uppercase digest, int, other keys) must round-trip too...
+ODD_RECORDS = [dict(BOOKING, localizer="3FF517743FAAE67B33DDEFA77163099D"), dict(CHECKOUT, realDeparture=1718496000),
+               {"roomKey": "abc"}, dict(BOOKING, nameSurname="JOSÉ ÑÚÑEZ")]
+
+
+class TestHotelCodec(TestCase):
+    """ Class to test the codecs, the codec stores and the conversion tools """
+
+    def setUp(self):
+        """ Temporary directory for the data files... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = self.__tmp_dir.name
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """ Every codec returns the records it was given """
+        records = [BOOKING, STAY, CHECKOUT] + ODD_RECORDS
+        for name, codec in CODECS.items():
+            with self.subTest(name):
+                content = codec.dumps(records)
+                self.assertEqual(codec.loads(content), (records, len(content)))
+                self.assertEqual(codec.loads(codec.dumps([])), ([], len(codec.dumps([]))))
+
+    def test_binary_is_smaller(self):
+        """ Keys are not repeated and digests are raw bytes in the binary format """
+        size = {name: len(codec.dumps([BOOKING, STAY, CHECKOUT])) for name, codec in CODECS.items()}
+        self.assertLess(size["binary"], size["compact"])
+        self.assertLess(size["compact"], size["json"])
+
+    def test_store_append_and_reload(self):
+        """ Records appended in place are read by another store, incrementally for the append-only codecs """
+        for name, codec in CODECS.items():
+            with self.subTest(name):
+                path_file = os.path.join(self.__path, "all_bookings" + codec.extension)
+                store = CodecStore(path_file, ("idCard", "localizer"), codec=name)
+                reader = CodecStore(path_file, ("idCard", "localizer"), codec=name)
+                store.append(BOOKING)
+                self.assertEqual(reader.find("idCard", "12345678Z"), BOOKING)
+                store.extend(ODD_RECORDS[:2])
+                self.assertEqual(len(reader), 3)
+                with open(path_file, mode="rb") as f:
+                    self.assertEqual(codec.loads(f.read())[0], [BOOKING] + ODD_RECORDS[:2])
+
+    def test_torn_record(self):
+        """ A torn last record is ignored and removed before the next append """
+        for name in ("jsonl", "binary"):
+            with self.subTest(name):
+                path_file = os.path.join(self.__path, "all_checkouts" + CODECS[name].extension)
+                CodecStore(path_file, ("roomKey",), codec=name).append(CHECKOUT)
+                with open(path_file, mode="ab") as f:
+                    f.write(CODECS[name].dumps([STAY])[-21:-1])
+                store = CodecStore(path_file, ("roomKey",), codec=name)
+                self.assertEqual(store.records(), [CHECKOUT])
+                store.append({"roomKey": "abc"})
+                self.assertEqual(CodecStore(path_file, ("roomKey",), codec=name).records(), [CHECKOUT, {"roomKey": "abc"}])
+
+    def test_last_line_without_new_line(self):
+        """ A complete last json line without its new line is a record and is kept by the next append """
+        path_file = os.path.join(self.__path, "all_checkouts.ndjson")
+        with open(path_file, mode="wb") as f:
+            f.write(CODECS["jsonl"].dumps([CHECKOUT, {"roomKey": "abc"}])[:-1])
+        store = CodecStore(path_file, ("roomKey",), codec="jsonl")
+        self.assertEqual(store.records(), [CHECKOUT, {"roomKey": "abc"}])
+        store.append({"roomKey": "def"})
+        expected = [CHECKOUT, {"roomKey": "abc"}, {"roomKey": "def"}]
+        self.assertEqual(CodecStore(path_file, ("roomKey",), codec="jsonl").records(), expected)
+        with open(path_file, mode="rb") as f:
+            self.assertEqual(f.read(), CODECS["jsonl"].dumps(expected))
+
+    def test_corrupted_binary(self):
+        """ A binary record shorter than its schema is a corrupted file, not a struct error """
+        codec = CODECS["binary"]
+        record = codec.encode_record(STAY)[codec.HEADER.size:]
+        for payload in (record[:20], record[:-1], record + b"\x00"):
+            with self.subTest(len(payload)):
+                source = os.path.join(self.__path, "all_stays.bin")
+                with open(source, mode="wb") as f:
+                    f.write(codec.MAGIC + codec.HEADER.pack(len(payload), 2) + payload)
+                with self.assertRaises(HotelManagementException) as cm:
+                    convert(source, self.__path + "/all_stays.json")
+                self.assertEqual(cm.exception.message, "Data file is not in binary format")
+                self.assertEqual(CodecStore(source, ("roomKey", "idCard"), codec="binary").records(), [])
+        with open(source, mode="wb") as f:
+            f.write(codec.dumps([STAY, CHECKOUT])[:-5])
+        with self.assertRaises(HotelManagementException) as cm:
+            convert(source, self.__path + "/all_stays.json")
+        self.assertEqual(cm.exception.message, "Data file ends with an incomplete record")
+
+    def test_convert(self):
+        """ json -> binary -> jsonl -> json gives the same file """
+        source = os.path.join(self.__path, "all_stays.json")
+        with open(source, mode="wb") as f:
+            f.write(CODECS["json"].dumps([STAY, STAY]))
+        self.assertEqual(convert(source, self.__path + "/stays.bin"), 2)
+        convert(self.__path + "/stays.bin", self.__path + "/stays.ndjson")
+        convert(self.__path + "/stays.ndjson", self.__path + "/copy.json")
+        with open(source, mode="rb") as f, open(self.__path + "/copy.json", mode="rb") as g:
+            self.assertEqual(f.read(), g.read())
+        self.assertEqual(convert_data(self.__path, "compact"), {os.path.join(self.__path, "all_stays.min.json"): 2})
+        with self.assertRaises(HotelManagementException) as cm:
+            convert(source, self.__path + "/stays.xml")
+        self.assertEqual(cm.exception.message, "Unknown storage format of " + self.__path + "/stays.xml")
+
+    def test_hotel_manager_formats(self):
+        """ The operations work over stores of every format """
+        for name, codec in CODECS.items():
+            with self.subTest(name):
+                stores = {key: CodecStore(os.path.join(self.__path, name + "_" + key + codec.extension), keys, codec=name)
+                          for key, keys in (("booking_store", ("idCard", "localizer")),
+                                            ("stay_store", ("roomKey", "idCard")), ("checkout_store", ("roomKey",)))}
+                hotel_manager = HotelManager(**stores)
+                with freeze_time("2024-06-14"):
+                    localizer = hotel_manager.room_reservation("5555555555554444", "12345678Z", "JOSE LOPEZ", "911234567",
+                                                               "SINGLE", "14/06/2024", "2")
+                    room_key = hotel_manager.guest_arrival_data({"Localizer": localizer, "IdCard": "12345678Z"})
+                with freeze_time("2024-06-16"):
+                    self.assertTrue(hotel_manager.guest_checkout(room_key))
+                self.assertEqual(stores["checkout_store"].records(), [CHECKOUT])
+
+    def test_unknown_format(self):
+        """ An unknown format and the journal mode with a format other than json are rejected """
+        with self.assertRaises(HotelManagementException) as cm:
+            HotelManager(storage_format="xml")
+        self.assertEqual(cm.exception.message, "Unknown storage format xml. Use one of json, compact, jsonl, binary")
+        with self.assertRaises(HotelManagementException) as cm:
+            HotelManager(journal=True, storage_format="binary")
+        self.assertEqual(cm.exception.message, "Journal mode is only available with the json storage format")
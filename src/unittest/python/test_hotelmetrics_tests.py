@@ -0,0 +1,72 @@
+""" Module that includes the tests of the instrumentation of the hotel operations """
+import json
+import os
+import tempfile
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import HotelManager, HotelManagementException, JsonStore, Instrumentation
+
+
+class TestHotelMetrics(TestCase):
+    """ Class to test the spans recorded by an instrumented HotelManager """
+
+    def setUp(self):
+        """ HotelManager over stores in a temporary directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = self.__tmp_dir.name
+        self.__stores = {"booking_store": JsonStore(self.__path + "/all_bookings.json", ("idCard", "localizer")),
+                         "stay_store": JsonStore(self.__path + "/all_stays.json", ("roomKey", "idCard")),
+                         "checkout_store": JsonStore(self.__path + "/all_checkouts.json", ("roomKey",))}
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def reserve_arrive_checkout(self, hotel_manager):
+        """ Runs the three operations for one client. Returns the room key """
+        with freeze_time("2024-06-14"):
+            localizer = hotel_manager.room_reservation("5555555555554444", "12345678Z", "JOSE LOPEZ", "911234567",
+                                                       "SINGLE", "14/06/2024", "2")
+            room_key = hotel_manager.guest_arrival_data({"Localizer": localizer, "IdCard": "12345678Z"})
+        with freeze_time("2024-06-16"):
+            hotel_manager.guest_checkout(room_key)
+        return room_key
+
+    def test_spans_of_the_operations(self):
+        """ Every operation and its phases are counted once, errors are counted apart """
+        instrumentation = Instrumentation()
+        hotel_manager = HotelManager(instrumentation=instrumentation, **self.__stores)
+        room_key = self.reserve_arrive_checkout(hotel_manager)
+        with self.assertRaises(HotelManagementException):
+            hotel_manager.guest_checkout(room_key)
+        snapshot = instrumentation.snapshot()
+        for name in ("room_reservation", "room_reservation.validate", "room_reservation.hash",
+                     "room_reservation.load", "room_reservation.lookup", "room_reservation.persist",
+                     "guest_arrival", "guest_arrival.load", "guest_arrival.booking_lookup", "guest_arrival.localizer_hash",
+                     "guest_arrival.room_key_hash", "guest_arrival.stay_lookup", "guest_arrival.persist",
+                     "guest_checkout.persist"):
+            self.assertEqual(snapshot["spans"][name]["count"], 1, name)
+        self.assertNotIn("guest_arrival.lookup", snapshot["spans"])
+        self.assertEqual(snapshot["spans"]["guest_checkout"]["count"], 2)
+        self.assertEqual(snapshot["counters"], {"guest_checkout.errors": 1})
+        self.assertEqual(snapshot["spans"]["guest_checkout"]["buckets"]["+Inf"], 2)
+
+    def test_export(self):
+        """ Snapshots are exported as json and in the Prometheus text format """
+        instrumentation = Instrumentation()
+        self.reserve_arrive_checkout(HotelManager(instrumentation=instrumentation, **self.__stores))
+        with open(instrumentation.export(self.__path + "/metrics.json"), encoding="UTF-8") as f:
+            self.assertEqual(json.load(f)["spans"]["room_reservation"]["count"], 1)
+        instrumentation.export(self.__path + "/metrics.prom", "prometheus")
+        with open(self.__path + "/metrics.prom", encoding="UTF-8") as f:
+            lines = f.read().splitlines()
+        self.assertIn('uc3mtravel_span_seconds_count{span="guest_checkout"} 1', lines)
+        self.assertIn('uc3mtravel_span_seconds_bucket{span="guest_checkout",le="+Inf"} 1', lines)
+        self.assertFalse(os.path.exists(self.__path + "/metrics.prom.tmp"))
+
+    def test_disabled_by_default(self):
+        """ Without instrumentation nothing is recorded """
+        hotel_manager = HotelManager(**self.__stores)
+        self.reserve_arrive_checkout(hotel_manager)
+        self.assertFalse(hotel_manager.instrumentation.enabled)
+        self.assertEqual(hotel_manager.instrumentation.snapshot(), {"counters": {}, "spans": {}})
@@ -0,0 +1,76 @@
+""" Module that includes the tests of the reports over bookings and stays """
+import tempfile
+from datetime import date
+from unittest import TestCase, mock
+from freezegun import freeze_time
+from uc3mtravel import HotelManager, HotelReport
+from uc3mtravel import hotelreport
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+def reserve(hotel_manager, number, room_type, arrival, num_days):
+    """ Books client number. Returns the arrival input data of the booking """
+    id_card = str(number).zfill(8) + NIF_LETTERS[number % 23]
+    localizer = hotel_manager.room_reservation("5555555555554444", id_card, "JOSE LOPEZ", "911234567",
+                                               room_type, arrival, num_days)
+    return {"Localizer": localizer, "IdCard": id_card}
+
+
+class TestHotelReport(TestCase):
+    """ Class to test the occupancy, arrivals, departures and no-show reports """
+
+    def setUp(self):
+        """ Books three rooms from 14/06/2024 and registers the arrival of two of them... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__hotel_manager = HotelManager(path_data=self.__tmp_dir.name)
+        with freeze_time("2024-06-14"):
+            self.__single = reserve(self.__hotel_manager, 1, "SINGLE", "14/06/2024", "2")
+            self.__double = reserve(self.__hotel_manager, 2, "DOUBLE", "14/06/2024", "3")
+            self.__suite = reserve(self.__hotel_manager, 3, "SUITE", "15/06/2024", "1")
+            self.__hotel_manager.guest_arrival_data(self.__single)
+            self.__hotel_manager.guest_arrival_data(self.__double)
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_reports(self):
+        """ Same results with NumPy and in pure python """
+        for numpy in (hotelreport.numpy, None):
+            with self.subTest("numpy" if numpy else "pure python"):
+                with mock.patch.object(hotelreport, "numpy", numpy):
+                    report = HotelReport.of(self.__hotel_manager)
+                    occupancy = report.occupancy(date(2024, 6, 13), date(2024, 6, 17))
+                    self.assertEqual([sum(rooms.values()) for rooms in occupancy.values()], [0, 2, 3, 1, 0])
+                    self.assertEqual(occupancy[date(2024, 6, 15)], {"SINGLE": 1, "DOUBLE": 1, "SUITE": 1})
+                    self.assertEqual(report.room_type_counts(), {"SINGLE": 1, "DOUBLE": 1, "SUITE": 1})
+                    self.assertEqual(report.room_type_counts("stays"), {"SINGLE": 1, "DOUBLE": 1, "SUITE": 0})
+                    self.assertEqual(list(report.arrivals_per_day(date(2024, 6, 14), date(2024, 6, 15)).values()), [2, 1])
+                    self.assertEqual(list(report.departures_per_day(date(2024, 6, 16), date(2024, 6, 17)).values()), [1, 1])
+                    self.assertEqual(report.no_shows(date(2024, 6, 15)), [])
+                    self.assertEqual(report.no_shows(date(2024, 6, 16)), [(self.__suite["IdCard"], self.__suite["Localizer"])])
+
+    def test_incremental_refresh(self):
+        """ New records are added to the columns and a stay marks its booking as stayed """
+        report = HotelReport.of(self.__hotel_manager)
+        self.assertEqual(len(report.no_shows(date(2024, 6, 30))), 1)
+        with freeze_time("2024-06-15"):
+            self.__hotel_manager.guest_arrival_data(self.__suite)
+            reserve(self.__hotel_manager, 4, "SUITE", "20/06/2024", "1")
+        self.assertEqual(report.no_shows(date(2024, 6, 30)), [(str(4).zfill(8) + NIF_LETTERS[4], mock.ANY)])
+        self.assertEqual(len(report.column("stays", "arrival")), 3)
+        self.assertEqual(report.room_type_counts()["SUITE"], 2)
+
+    def test_archive_and_short_dates(self):
+        """ Archived stays are still counted and dates without leading zeros are not dropped """
+        with freeze_time("2024-06-16"):
+            self.__hotel_manager.guest_checkout(self.__hotel_manager.stay_store.records()[0]["roomKey"])
+        self.__hotel_manager.archive_completed()
+        self.assertEqual(len(self.__hotel_manager.stay_store), 1)
+        reserve(self.__hotel_manager, 4, "SINGLE", "1/7/2024", "2")
+        report = HotelReport.of(self.__hotel_manager)
+        occupancy = report.occupancy(date(2024, 6, 13), date(2024, 6, 17))
+        self.assertEqual([sum(rooms.values()) for rooms in occupancy.values()], [0, 2, 3, 1, 0])
+        self.assertEqual(report.room_type_counts("stays"), {"SINGLE": 1, "DOUBLE": 1, "SUITE": 0})
+        self.assertEqual(list(report.arrivals_per_day(date(2024, 7, 1), date(2024, 7, 2)).values()), [1, 0])
@@ -0,0 +1,84 @@
+""" Module that includes the tests of the asyncio HTTP service """
+import asyncio
+import json
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from unittest import mock
+from uc3mtravel import HotelManager, HotelService, JsonStore
+
+
+class TestHotelService(IsolatedAsyncioTestCase):
+    """ Class to test the HTTP endpoints of the service """
+
+    async def asyncSetUp(self):
+        """ Starts a service over stores in a temporary directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        path = self.__tmp_dir.name
+        hotel_manager = HotelManager(booking_store=JsonStore(path + "/all_bookings.json", ("idCard", "localizer")),
+                                     stay_store=JsonStore(path + "/all_stays.json", ("roomKey", "idCard")),
+                                     checkout_store=JsonStore(path + "/all_checkouts.json", ("roomKey",)))
+        self.__service = HotelService(hotel_manager)
+        self.__server = await self.__service.start("127.0.0.1", 0)
+        self.__port = self.__server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        """ Stops the service and deletes the temporary directory... """
+        self.__server.close()
+        await self.__server.wait_closed()
+        await self.__service.stop()
+        self.__tmp_dir.cleanup()
+
+    async def request(self, method, path, data=None):
+        """ Sends one request and returns (status, answer) """
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.__port)
+        body = b"" if data is None else data if isinstance(data, bytes) else json.dumps(data).encode("UTF-8")
+        writer.write((method + " " + path + " HTTP/1.1\r\nConnection: close\r\nContent-Length: " + str(len(body)) +
+                      "\r\n\r\n").encode() + body)
+        response = await reader.read()
+        writer.close()
+        head, content = response.split(b"\r\n\r\n", 1)
+        return int(head.split(b" ")[1]), json.loads(content)
+
+    async def test_reservation_endpoint(self):
+        """ A reservation gets its localizer, a duplicate gets the error message of room_reservation """
+        data = {"creditCardNumber": "5555555555554444", "idCard": "12345678Z", "nameSurname": "JOSE LOPEZ",
+                "phoneNumber": "911234567", "roomType": "SINGLE", "arrival": "14/06/2024", "numDays": "2"}
+        self.assertEqual(await self.request("POST", "/reservation", data), (200, {"result": "3ff517743faae67b33ddefa77163099d"}))
+        self.assertEqual(await self.request("POST", "/reservation", data), (400, {"error": "Client already has a reservation"}))
+
+    async def test_errors_and_stats(self):
+        """ Wrong requests get errors and every request is counted in the stats """
+        status, answer = await self.request("POST", "/checkout", {"roomKey": "abc"})
+        self.assertEqual((status, answer["error"]), (400, "Given SHA256 room_key code is not a valid SHA256 string"))
+        status, answer = await self.request("POST", "/arrival", {"Localizer": "0" * 32, "IdCard": "12345678Z"})
+        self.assertEqual((status, answer["error"]), (400, "No reservation was found with the provided localizer and id card"))
+        self.assertEqual((await self.request("GET", "/unknown"))[0], 404)
+        status, answer = await self.request("GET", "/stats")
+        self.assertEqual(status, 200)
+        self.assertEqual(answer["result"]["requests"], 3)
+        self.assertEqual(answer["result"]["endpoints"]["/checkout"]["requests"], 1)
+
+    async def test_malformed_bodies_and_faults(self):
+        """ Json bodies that are not objects get 400 and unexpected errors 500, always with an answer """
+        for path in ("/reservation", "/arrival", "/checkout"):
+            for body in (b"5", b"null", b"[1]"):
+                self.assertEqual(await self.request("POST", path, body),
+                                 (400, {"error": "Input data is not a correct json format: incorrect key values"}))
+        with mock.patch.object(HotelManager, "guest_arrival_data", side_effect=RuntimeError("disk failure")):
+            self.assertEqual(await self.request("POST", "/arrival", {"Localizer": "0" * 32, "IdCard": "12345678Z"}),
+                             (500, {"error": "Internal server error"}))
+        self.assertEqual((await self.request("POST", "/reservation", {"idCard": "12345678Z"}))[0], 400)
+
+    async def test_serve_stops_writer(self):
+        """ A cancelled serve stops its writer task and the thread of the operations """
+        service = HotelService(self.__service.hotel_manager)
+        tasks = asyncio.all_tasks()
+        serving = asyncio.create_task(service.serve("127.0.0.1", 0))
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(asyncio.all_tasks() - tasks), 2)
+        serving.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await serving
+        self.assertEqual(asyncio.all_tasks() - tasks, set())
+        with self.assertRaises(RuntimeError):
+            await asyncio.get_running_loop().run_in_executor(service._HotelService__executor, len, "")  # pylint: disable=protected-access
@@ -0,0 +1,73 @@
+""" Module that includes the tests of the data directory of HotelManager and the sharded stores """
+import os.path
+import tempfile
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import HotelManager, HotelManagementException, ShardedStore
+from uc3mtravel.hotelshards import shard_of
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
+
+def reserve(hotel_manager, number):
+    """ Books client number (its NIF is made from the number). Returns the localizer """
+    return hotel_manager.room_reservation("5555555555554444", str(number).zfill(8) + NIF_LETTERS[number % 23],
+                                          "JOSE LOPEZ", "911234567", "SINGLE", "14/06/2024", "2")
+
+
+class TestHotelShards(TestCase):
+    """ Class to test injectable data directories, hotels and shards """
+
+    def setUp(self):
+        """ Creates a temporary data directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = self.__tmp_dir.name
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_path_data_and_hotels(self):
+        """ Every hotel has its own data files, so the same client can book in both """
+        first = HotelManager(path_data=self.__path, hotel_id="H1")
+        second = HotelManager(path_data=self.__path, hotel_id="H2")
+        self.assertEqual(first.path_data, os.path.join(self.__path, "H1", ""))
+        self.assertEqual(reserve(first, 12345678), reserve(second, 12345678))
+        self.assertTrue(os.path.isfile(os.path.join(self.__path, "H1", "all_bookings.json")))
+        self.assertTrue(os.path.isfile(os.path.join(self.__path, "H2", "all_bookings.json")))
+        with self.assertRaises(HotelManagementException) as cm:
+            reserve(HotelManager(path_data=self.__path, hotel_id="H1"), 12345678)
+        self.assertEqual(cm.exception.message, "Client already has a reservation")
+
+    def test_sharded_operations(self):
+        """ Bookings go to the shard of their idCard and the three operations work over shards """
+        with freeze_time("2024-06-14"):
+            hotel_manager = HotelManager(path_data=self.__path, shards=4)
+            localizers = {number: reserve(hotel_manager, number) for number in range(100, 140)}
+            room_key = hotel_manager.guest_arrival_data({"Localizer": localizers[123], "IdCard": "00000123" + NIF_LETTERS[123 % 23]})
+        with freeze_time("2024-06-16"):
+            self.assertTrue(HotelManager(path_data=self.__path, shards=4).guest_checkout(room_key))
+        shards = hotel_manager.booking_store.shards
+        self.assertEqual(len(hotel_manager.booking_store), 40)
+        for shard, store in enumerate(shards):
+            self.assertTrue(os.path.isfile(os.path.join(self.__path, "all_bookings." + str(shard) + ".json")))
+            self.assertTrue(all(shard_of(record["idCard"], 4) == shard for record in store.records()))
+        self.assertEqual(hotel_manager.checkout_store.find("roomKey", room_key)["roomKey"], room_key)
+
+    def test_one_shard_per_operation(self):
+        """ A reservation only loads the shard of its idCard """
+        hotel_manager = HotelManager(path_data=self.__path, shards=8)
+        reserve(hotel_manager, 12345678)
+        loaded = [shard for shard in hotel_manager.booking_store.shards if shard._current_records()]  # pylint: disable=protected-access
+        self.assertEqual(loaded, [hotel_manager.booking_store.shard_for("12345678Z")])
+
+    def test_wrong_parameters(self):
+        """ Hotel ids must be simple names and shards a positive number """
+        with self.assertRaises(HotelManagementException) as cm:
+            HotelManager(path_data=self.__path, hotel_id="../H1")
+        self.assertEqual(cm.exception.message, "Invalid hotel id. Use up to 64 letters, digits, - or _")
+        with self.assertRaises(HotelManagementException) as cm:
+            HotelManager(path_data=self.__path, shards=0)
+        self.assertEqual(cm.exception.message, "Number of shards must be a positive integer")
+        with self.assertRaises(HotelManagementException):
+            ShardedStore([], "idCard")
@@ -0,0 +1,158 @@
+""" Module that includes the tests of the indexed json stores """
+import json
+import multiprocessing
+import os.path
+import tempfile
+from unittest import TestCase
+from uc3mtravel import HotelManager, HotelManagementException
+from uc3mtravel import JsonStore, JournalStore
+
+
+def reserve_in_process(store_class, path_file, first, count):
+    """ Books count clients (numbers first...) and the shared client 12345678Z. Returns the number of bookings made """
+    hm = HotelManager(booking_store=store_class(path_file, ("idCard", "localizer")))
+    made = 0
+    for number in [12345678] + list(range(first, first + count)):
+        try:
+            hm.room_reservation("5555555555554444", str(number).zfill(8) + "TRWAGMYFPDXBNJZSQVHLCKE"[number % 23],
+                                "JOSE LOPEZ", "911234567", "SINGLE", "14/06/2024", "2")
+            made += 1
+        except HotelManagementException:
+            pass
+    return made
+
+
+class TestJsonStore(TestCase):
+    """ Class to test the indexed json store used by HotelManager """
+
+    def setUp(self):
+        """ Creates a temporary directory for the store files... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path_file = os.path.join(self.__tmp_dir.name, "all_bookings.json")
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_append_keeps_original_format(self):
+        """ Appending in place must produce the same file as dumping the whole list with indent=4 """
+        records = [{"idCard": "12345678Z", "localizer": "a"}, {"idCard": "13130023J", "localizer": "b"},
+                   {"idCard": "72584727Y", "localizer": "c"}]
+        store = JsonStore(self.__path_file, ("idCard", "localizer"))
+        for record in records:
+            store.append(record)
+        with open(self.__path_file, encoding="UTF-8", mode="r") as f:
+            self.assertEqual(f.read(), json.dumps(records, indent=4))
+
+    def test_find_by_index(self):
+        """ Records are found by any indexed key, also from a new store reading the same file """
+        store = JsonStore(self.__path_file, ("idCard", "localizer"))
+        store.extend([{"idCard": "12345678Z", "localizer": "a"}, {"idCard": "13130023J", "localizer": "b"}])
+        other = JsonStore(self.__path_file, ("idCard", "localizer"))
+        self.assertEqual(other.find("localizer", "b")["idCard"], "13130023J")
+        self.assertIsNone(other.find("idCard", "00000000T"))
+        store.append({"idCard": "72584727Y", "localizer": "c"})
+        self.assertEqual(other.find("idCard", "72584727Y")["localizer"], "c")
+        self.assertEqual(len(other), 3)
+
+    def test_incremental_refresh(self):
+        """ Records appended by another store are read without reloading the records already in memory """
+        store = JsonStore(self.__path_file, ("idCard",))
+        store.append({"idCard": "12345678Z"})
+        other = JsonStore(self.__path_file, ("idCard",))
+        first = other.find("idCard", "12345678Z")
+        store.extend([{"idCard": "13130023J"}, {"idCard": "72584727Y"}])
+        self.assertEqual(other.find("idCard", "72584727Y"), {"idCard": "72584727Y"})
+        self.assertIs(other.find("idCard", "12345678Z"), first)
+        with open(self.__path_file, encoding="UTF-8", mode="w") as f:
+            json.dump([{"idCard": "12345678Z"}], f, indent=4)
+        self.assertIsNone(other.find("idCard", "13130023J"))
+
+    def test_shared_store(self):
+        """ The shared store of a file is the same instance for the whole process """
+        self.assertIs(JsonStore.shared(self.__path_file, ("idCard",)), JsonStore.shared(self.__path_file, ("idCard",)))
+        self.assertIsNot(JsonStore.shared(self.__path_file, ("idCard",)), JournalStore.shared(self.__path_file, ("idCard",)))
+
+    def test_import_export(self):
+        """ Records exported to a json file can be imported into another store """
+        store = JsonStore(self.__path_file, ("idCard",))
+        store.extend([{"idCard": "12345678Z"}, {"idCard": "13130023J"}])
+        export_file = os.path.join(self.__tmp_dir.name, "export.json")
+        self.assertEqual(store.export_json(export_file), 2)
+        other = JsonStore(os.path.join(self.__tmp_dir.name, "other.json"), ("idCard",))
+        self.assertEqual(other.import_json(export_file), 2)
+        self.assertIsNotNone(other.find("idCard", "13130023J"))
+
+
+class TestJournalStore(TestCase):
+    """ Class to test the json store in journal mode """
+
+    def setUp(self):
+        """ Creates a temporary directory for the store files... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path_file = os.path.join(self.__tmp_dir.name, "all_stays.json")
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_replay_discards_torn_line(self):
+        """ Records in the journal are replayed on start, a torn last line is discarded """
+        store = JournalStore(self.__path_file, ("roomKey",))
+        store.extend([{"roomKey": "a"}, {"roomKey": "b"}])
+        self.assertFalse(os.path.isfile(self.__path_file))
+        with open(store.journal_path, encoding="UTF-8", mode="a") as f:
+            f.write('{"roomKey": "c"')
+        other = JournalStore(self.__path_file, ("roomKey",))
+        self.assertEqual([record["roomKey"] for record in other.records()], ["a", "b"])
+        other.append({"roomKey": "d"})
+        self.assertEqual(len(JournalStore(self.__path_file, ("roomKey",))), 3)
+
+    def test_incremental_refresh(self):
+        """ Records appended to the journal by another store are read from the last known offset """
+        store = JournalStore(self.__path_file, ("roomKey",))
+        store.append({"roomKey": "a"})
+        other = JournalStore(self.__path_file, ("roomKey",))
+        first = other.find("roomKey", "a")
+        store.append({"roomKey": "b"})
+        self.assertIsNotNone(other.find("roomKey", "b"))
+        self.assertIs(other.find("roomKey", "a"), first)
+
+    def test_compaction_to_snapshot(self):
+        """ When the journal is long enough it is compacted into a snapshot with the original format """
+        store = JournalStore(self.__path_file, ("roomKey",), compact_every=3)
+        records = [{"roomKey": "a"}, {"roomKey": "b"}, {"roomKey": "c"}]
+        for record in records:
+            store.append(record)
+        with open(self.__path_file, encoding="UTF-8", mode="r") as f:
+            self.assertEqual(json.load(f), records)
+        self.assertEqual(os.path.getsize(store.journal_path), 0)
+        self.assertIsNotNone(JournalStore(self.__path_file, ("roomKey",)).find("roomKey", "b"))
+
+    def test_replay_after_crash_during_compaction(self):
+        """ Records both in snapshot and journal (crash before emptying the journal) are not duplicated """
+        store = JournalStore(self.__path_file, ("roomKey",))
+        store.extend([{"roomKey": "a"}, {"roomKey": "b"}])
+        with open(store.journal_path, encoding="UTF-8", mode="r") as f:
+            journal = f.read()
+        store.compact()
+        with open(store.journal_path, encoding="UTF-8", mode="w") as f:
+            f.write(journal)
+        self.assertEqual(len(JournalStore(self.__path_file, ("roomKey",))), 2)
+
+
+class TestStoreConcurrency(TestCase):
+    """ Class to test several processes booking on the same store files """
+
+    def test_no_lost_records(self):
+        """ 4 processes book 25 clients each plus the same shared client: no booking is lost or duplicated """
+        for store_class in (JsonStore, JournalStore):
+            with self.subTest(store_class.__name__):
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    path_file = os.path.join(tmp_dir, "all_bookings.json")
+                    with multiprocessing.Pool(4) as pool:
+                        made = pool.starmap(reserve_in_process, [(store_class, path_file, 1000 * worker, 25) for worker in range(4)])
+                    records = store_class(path_file, ("idCard",)).records()
+                    self.assertEqual(sum(made), 101)
+                    self.assertEqual(len(records), 101)
+                    self.assertEqual(len({record["idCard"] for record in records}), 101)
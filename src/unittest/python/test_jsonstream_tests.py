@@ -0,0 +1,54 @@
+""" Module that includes the tests of the streaming reader of json data files """
+import json
+import os.path
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from uc3mtravel import HotelManagementException
+from uc3mtravel import iter_json_array, find_record
+
+
+class TestJsonStream(TestCase):
+    """ Class to test the streaming reader of json data files """
+
+    __path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+
+    def test_same_records_as_json_load(self):
+        """ The records read as a stream are the ones read with json.load, whatever the chunk size """
+        for file_name in ("all_bookings.json", "all_stays.json", "all_checkouts.json"):
+            with open(self.__path_data + file_name, encoding="UTF-8", mode="r") as f:
+                expected = json.load(f)
+            for chunk_size in (1, 7, 65536):
+                with self.subTest(file_name + " " + str(chunk_size)):
+                    self.assertEqual(list(iter_json_array(self.__path_data + file_name, chunk_size)), expected)
+
+    def test_find_record(self):
+        """ The first matching record is returned, None if there is no match """
+        self.assertEqual(find_record(self.__path_data + "all_bookings.json", "idCard", "13130023J")["roomType"], "DOUBLE")
+        self.assertIsNone(find_record(self.__path_data + "all_bookings.json", "idCard", "00000000T"))
+
+    def test_wrong_files(self):
+        """ Wrong json formats and missing files raise the same errors as the rest of the package """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for content in ("", "{}", '[{"a": 1}', '[{"a": 1}, {"a": ', '[1 2]', '[,,1,]', '[1,]', '[,1]', '[1] x',
+                            '[{"a": 1}] [{"a": 2}]'):
+                with self.subTest(content):
+                    with open(os.path.join(tmp_dir, "wrong.json"), encoding="UTF-8", mode="w") as f:
+                        f.write(content)
+                    with self.assertRaises(HotelManagementException) as result:
+                        list(iter_json_array(os.path.join(tmp_dir, "wrong.json"), 4))
+                    self.assertEqual(result.exception.message, "JSON Decode Error - Wrong JSON Format")
+            with self.assertRaises(HotelManagementException) as result:
+                list(iter_json_array(os.path.join(tmp_dir, "missing.json")))
+            self.assertEqual(result.exception.message, "Wrong file or file path")
+
+    def test_arrays_accepted_by_json_load(self):
+        """ Empty arrays, arrays of arrays and white space around the array are read as json.load reads them """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for content in ("[]", " [ ] \n", "[[1], [2, 3], []]", '\n[ {"a": [1, 2]} ,\n{"a": "]"} ]\n'):
+                for chunk_size in (1, 3, 65536):
+                    with self.subTest(content + " " + str(chunk_size)):
+                        with open(os.path.join(tmp_dir, "right.json"), encoding="UTF-8", mode="w") as f:
+                            f.write(content)
+                        self.assertEqual(list(iter_json_array(os.path.join(tmp_dir, "right.json"), chunk_size)),
+                                         json.loads(content))
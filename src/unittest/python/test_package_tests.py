@@ -0,0 +1,48 @@
+""" Module that includes the tests of the lazy imports of the package """
+import os
+import subprocess
+import sys
+from unittest import TestCase
+import uc3mtravel
+
+
+def loaded_modules(code):
+    """ Runs code in a new interpreter and returns the names of the modules it has loaded """
+    result = subprocess.run([sys.executable, "-W", "error", "-c", code + "; import sys; print(' '.join(sys.modules))"],
+                            capture_output=True, text=True, check=True,
+                            env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(uc3mtravel.__file__))))
+    return set(result.stdout.split())
+
+
+class TestPackage(TestCase):
+    """ Class to test that the package only loads the modules that are used """
+
+    def test_lazy_package(self):
+        """ Importing the package does not load its modules, a public name loads only what it needs """
+        self.assertNotIn("uc3mtravel.hotelmanager", loaded_modules("import uc3mtravel"))
+        modules = loaded_modules("from uc3mtravel import HotelManager")
+        self.assertIn("uc3mtravel.hotelmanager", modules)
+        for module in ("luhn", "stdnum", "numpy", "uc3mtravel.hotelservice", "uc3mtravel.bulkvalidator"):
+            self.assertNotIn(module, modules)
+        self.assertIn("stdnum", loaded_modules("from uc3mtravel import HotelManager; HotelManager.validate_id_card(None, '12345678Z')"))
+
+    def test_commands_import_argparse_on_run(self):
+        """ The modules with a command only import argparse when the command runs """
+        modules = loaded_modules("import uc3mtravel.hotelservice, uc3mtravel.hotelaudit, uc3mtravel.hotelarchive, "
+                                 "uc3mtravel.hotelcodec, uc3mtravel.hotelcli")
+        self.assertNotIn("argparse", modules)
+
+    def test_public_names(self):
+        """ Every public name can be imported and unknown names raise AttributeError """
+        for name in uc3mtravel.__all__:
+            self.assertIsNotNone(getattr(uc3mtravel, name))
+        self.assertIn("HotelManager", dir(uc3mtravel))
+        with self.assertRaises(AttributeError):
+            uc3mtravel.NotAName  # pylint: disable=pointless-statement
+
+    def test_run_module(self):
+        """ Running a module with python -m does not warn that it was imported by the package """
+        result = subprocess.run([sys.executable, "-W", "error", "-m", "uc3mtravel.hotelcodec", "--help"],
+                                capture_output=True, text=True, check=False,
+                                env=dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(uc3mtravel.__file__))))
+        self.assertEqual((result.returncode, result.stderr), (0, ""))
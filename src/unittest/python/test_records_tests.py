@@ -0,0 +1,45 @@
+""" Module that includes the tests of the compact record types """
+import json
+from pathlib import Path
+from unittest import TestCase
+from uc3mtravel import HotelReservation, HotelReservationRecord, HotelStayRecord
+
+
+class TestRecords(TestCase):
+    """ Class to test the slotted, immutable records built from the data files """
+
+    __path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+
+    def load(self, file_name):
+        """ Returns the records of a data file """
+        with open(self.__path_data + file_name, encoding="UTF-8", mode="r") as f:
+            return json.load(f)
+
+    def test_reservation_record(self):
+        """ The record has the same string and localizer as HotelReservation for every stored booking """
+        for booking in self.load("all_bookings.json"):
+            with self.subTest(booking["idCard"]):
+                record = HotelReservationRecord.from_json(booking)
+                reservation = HotelReservation(id_card=booking["idCard"], credit_card_number=booking["creditCardNumber"],
+                                               name_surname=booking["nameSurname"], phone_number=booking["phoneNumber"],
+                                               room_type=booking["roomType"], arrival=booking["arrival"], num_days=booking["numDays"])
+                self.assertEqual(str(record), str(reservation))
+                self.assertEqual(record.localizer, booking["localizer"])
+                self.assertEqual(record.json, reservation.json)
+
+    def test_stay_record(self):
+        """ The record rebuilds the stored json and room key of every stored stay """
+        for stay in self.load("all_stays.json"):
+            with self.subTest(stay["idCard"]):
+                record = HotelStayRecord.from_json(stay)
+                self.assertEqual(record.room_key, stay["roomKey"])
+                self.assertEqual(dict(record.json, roomKey=record.room_key), stay)
+
+    def test_immutable_and_slotted(self):
+        """ Records have no instance dict and cannot be changed """
+        record = HotelReservationRecord.from_json(self.load("all_bookings.json")[0])
+        self.assertFalse(hasattr(record, "__dict__"))
+        with self.assertRaises(AttributeError):
+            record.idcard = "12345678Z"
+        with self.assertRaises(AttributeError):
+            HotelStayRecord.from_json(self.load("all_stays.json")[0]).departure = None
@@ -0,0 +1,91 @@
+""" Module that includes the tests of the room inventory and the availability of bookings """
+import tempfile
+from unittest import TestCase
+from uc3mtravel import HotelManager, HotelManagementException, JsonStore
+from uc3mtravel.roominventory import RoomInventory, parse_rooms
+
+NIF_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+NO_ROOMS = "No rooms of the requested type are available for the requested dates"
+
+
+def reservation(number, room_type="SINGLE", arrival="14/06/2024", num_days="2"):
+    """ Returns the reservation of client number with the keys of the bookings file """
+    return {"creditCardNumber": "5555555555554444", "idCard": str(number).zfill(8) + NIF_LETTERS[number % 23],
+            "nameSurname": "JOSE LOPEZ", "phoneNumber": "911234567", "roomType": room_type,
+            "arrival": arrival, "numDays": num_days}
+
+
+def reserve(hotel_manager, number, room_type="SINGLE", arrival="14/06/2024", num_days="2"):
+    """ Books client number. Returns the localizer """
+    data = reservation(number, room_type, arrival, num_days)
+    return hotel_manager.room_reservation(data["creditCardNumber"], data["idCard"], data["nameSurname"],
+                                          data["phoneNumber"], data["roomType"], data["arrival"], data["numDays"])
+
+
+class TestRoomInventory(TestCase):
+    """ Class to test that bookings are refused when their room type is full some night """
+
+    def setUp(self):
+        """ Creates a temporary data directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path = self.__tmp_dir.name
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_full_nights(self):
+        """ Two single rooms: a third booking is refused if it shares a night with the other two """
+        hotel_manager = HotelManager(path_data=self.__path, inventory={"SINGLE": 2})
+        reserve(hotel_manager, 1, arrival="14/06/2024", num_days="3")
+        reserve(hotel_manager, 2, arrival="16/06/2024", num_days="2")
+        with self.assertRaises(HotelManagementException) as cm:
+            reserve(hotel_manager, 3, arrival="12/06/2024", num_days="5")
+        self.assertEqual(cm.exception.message, NO_ROOMS)
+        reserve(hotel_manager, 3, arrival="12/06/2024", num_days="2")
+        reserve(hotel_manager, 4, arrival="17/06/2024", num_days="1")
+        reserve(hotel_manager, 5, room_type="SUITE")
+        inventory = hotel_manager.inventory
+        self.assertEqual(inventory.free_rooms("SINGLE", "14/06/2024", "1"), 1)
+        self.assertEqual(inventory.free_rooms("SINGLE", "16/06/2024", "2"), 0)
+        self.assertIsNone(inventory.free_rooms("SUITE", "14/06/2024", "1"))
+        self.assertEqual(len(hotel_manager.booking_store), 5)
+
+    def test_single_digit_dates(self):
+        """ Dates without leading zeros are counted as the same nights as the padded ones """
+        hotel_manager = HotelManager(path_data=self.__path, inventory={"SINGLE": 1})
+        reserve(hotel_manager, 1, arrival="1/7/2024", num_days="2")
+        with self.assertRaises(HotelManagementException) as cm:
+            reserve(hotel_manager, 2, arrival="02/07/2024", num_days="1")
+        self.assertEqual(cm.exception.message, NO_ROOMS)
+        inventory = RoomInventory(hotel_manager.booking_store, {"SINGLE": 1})
+        self.assertEqual(inventory.free_rooms("SINGLE", "2/07/2024", "1"), 0)
+        self.assertEqual(inventory.free_rooms("SINGLE", "3/7/2024", "1"), 1)
+
+    def test_bulk_counts_batch(self):
+        """ The bookings of a batch use the rooms of the ones before them """
+        hotel_manager = HotelManager(path_data=self.__path, inventory={"DOUBLE": 1}, shards=2)
+        results = hotel_manager.room_reservations_bulk([reservation(1, "DOUBLE"), reservation(2, "DOUBLE"),
+                                                        reservation(3, "DOUBLE", arrival="16/06/2024")])
+        self.assertEqual(results[1], NO_ROOMS)
+        self.assertEqual(len(hotel_manager.booking_store), 2)
+
+    def test_follows_store(self):
+        """ Bookings of other managers are counted and a rewritten store is counted again """
+        booking_store = JsonStore(self.__path + "/all_bookings.json", ("idCard", "localizer"))
+        inventory = RoomInventory(booking_store, {"SINGLE": 1})
+        self.assertTrue(inventory.available("SINGLE", "14/06/2024", "2"))
+        reserve(HotelManager(path_data=self.__path), 1)
+        self.assertFalse(inventory.available("SINGLE", "15/06/2024", "1"))
+        booking_store.replace([])
+        self.assertTrue(inventory.available("SINGLE", "15/06/2024", "1"))
+
+    def test_wrong_inventory(self):
+        """ Only known room types with a number of rooms """
+        for rooms in ({"TWIN": 1}, {"SINGLE": -1}, {"SINGLE": "2"}, ["SINGLE"]):
+            with self.assertRaises(HotelManagementException) as cm:
+                HotelManager(path_data=self.__path, inventory=rooms)
+            self.assertEqual(cm.exception.message, "Invalid room inventory. Use the number of rooms of SINGLE, DOUBLE or SUITE")
+        self.assertEqual(parse_rooms("SINGLE=20, suite=2"), {"SINGLE": 20, "SUITE": 2})
+        with self.assertRaises(HotelManagementException):
+            parse_rooms("SINGLE")
@@ -0,0 +1,95 @@
+""" Module that includes the tests of the sorted room key index of the stays file """
+import hashlib
+import json
+import os.path
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import HotelManager, JsonStore, RoomKeyIndex
+
+
+def stay(number, departure="2024-06-16 00:00:00"):
+    """ Returns a stay record with a room key made from the number """
+    return {"idCard": str(number), "departure": departure, "roomKey": hashlib.sha256(str(number).encode()).hexdigest()}
+
+
+class TestRoomKeyIndex(TestCase):
+    """ Class to test the room key index used by guest_checkout """
+
+    def setUp(self):
+        """ Creates a temporary directory for the stays file and its index... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__path_file = os.path.join(self.__tmp_dir.name, "all_stays.json")
+
+    def tearDown(self):
+        """ Deletes the temporary directory... """
+        self.__tmp_dir.cleanup()
+
+    def test_find_after_merges(self):
+        """ Entries appended in place and merged into the sorted part are found, missing keys are not """
+        index = RoomKeyIndex(JsonStore(self.__path_file, ("roomKey", "idCard")), merge_every=4)
+        for number in range(10):
+            index.extend([stay(number)])
+        index.extend([stay(3, "2024-06-20 00:00:00")])
+        for number in range(10):
+            position, departure = index.find(stay(number)["roomKey"])
+            self.assertEqual(departure, datetime(2024, 6, 20) if number == 3 else datetime(2024, 6, 16))
+            self.assertEqual(position, 10 if number == 3 else number)
+        self.assertIsNone(index.find(stay(10)["roomKey"]))
+        self.assertEqual(os.path.getsize(index.path), RoomKeyIndex.HEADER.size + 11 * RoomKeyIndex.ENTRY.size)
+
+    def test_rebuilt_when_stays_change(self):
+        """ The index is rebuilt when the stays file is written without it """
+        index = RoomKeyIndex(JsonStore(self.__path_file, ("roomKey", "idCard")))
+        index.extend([stay(1)])
+        with open(self.__path_file, encoding="UTF-8", mode="w") as f:
+            json.dump([stay(2)], f, indent=4)
+        self.assertIsNone(index.find(stay(1)["roomKey"]))
+        self.assertEqual(index.find(stay(2)["roomKey"]), (0, datetime(2024, 6, 16)))
+
+    def test_checkout_does_not_load_stays(self):
+        """ A new process can check out with the index without loading the stays file """
+        path = self.__tmp_dir.name
+        hotel_manager = HotelManager(booking_store=JsonStore(path + "/all_bookings.json", ("idCard", "localizer")),
+                                     stay_store=JsonStore(self.__path_file, ("roomKey", "idCard")),
+                                     checkout_store=JsonStore(path + "/all_checkouts.json", ("roomKey",)))
+        with freeze_time("2024-06-14"):
+            localizer = hotel_manager.room_reservation("5555555555554444", "12345678Z", "JOSE LOPEZ", "911234567",
+                                                       "SINGLE", "14/06/2024", "2")
+            room_key = hotel_manager.guest_arrival_data({"Localizer": localizer, "IdCard": "12345678Z"})
+        stay_store = JsonStore(self.__path_file, ("roomKey", "idCard"))
+        hotel_manager = HotelManager(stay_store=stay_store, checkout_store=JsonStore(path + "/all_checkouts.json", ("roomKey",)))
+        with freeze_time("2024-06-16"):
+            self.assertTrue(hotel_manager.guest_checkout(room_key))
+        self.assertEqual(stay_store._current_records(), [])  # pylint: disable=protected-access
+
+    def test_departure_of_stays_with_microseconds(self):
+        """ Every stay is indexed (departures with microseconds too), so misses do not read the stays file """
+        path = self.__tmp_dir.name
+        hotel_manager = HotelManager(stay_store=JsonStore(self.__path_file, ("roomKey", "idCard")),
+                                     checkout_store=JsonStore(path + "/all_checkouts.json", ("roomKey",)))
+        hotel_manager.extend_stays([stay(1), stay(2, "2024-06-16 10:30:00.500000")])
+        stay_store = JsonStore(self.__path_file, ("roomKey", "idCard"))
+        hotel_manager = HotelManager(stay_store=stay_store, checkout_store=JsonStore(path + "/all_checkouts.json", ("roomKey",)))
+        index = hotel_manager.room_key_index(stay_store)
+        self.assertEqual(os.path.getsize(index.path), RoomKeyIndex.HEADER.size + 2 * RoomKeyIndex.ENTRY.size)
+        self.assertEqual(index.skipped, 0)
+        self.assertEqual(hotel_manager.get_departure(stay(1)["roomKey"]), datetime(2024, 6, 16))
+        self.assertEqual(hotel_manager.get_departure(stay(2)["roomKey"]), datetime(2024, 6, 16, 10, 30, 0, 500000))
+        self.assertIsNone(hotel_manager.get_departure(stay(3)["roomKey"]))
+        self.assertIsNone(hotel_manager.get_departure(stay(3)["roomKey"].upper()))
+        self.assertEqual(stay_store._current_records(), [])  # pylint: disable=protected-access
+
+    def test_departure_of_stays_not_indexed(self):
+        """ Stays the index leaves out are counted in its header and looked up in the stays store """
+        path = self.__tmp_dir.name
+        stay_store = JsonStore(self.__path_file, ("roomKey", "idCard"))
+        hotel_manager = HotelManager(stay_store=stay_store, checkout_store=JsonStore(path + "/all_checkouts.json", ("roomKey",)))
+        upper = dict(stay(2), roomKey=stay(2)["roomKey"].upper())
+        hotel_manager.extend_stays([stay(1), upper])
+        index = hotel_manager.room_key_index(stay_store)
+        self.assertEqual(os.path.getsize(index.path), RoomKeyIndex.HEADER.size + RoomKeyIndex.ENTRY.size)
+        self.assertEqual(index.skipped, 1)
+        self.assertEqual(hotel_manager.get_departure(upper["roomKey"]), datetime(2024, 6, 16))
+        self.assertIsNone(hotel_manager.get_departure(stay(3)["roomKey"]))
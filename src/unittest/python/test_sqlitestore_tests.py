@@ -0,0 +1,73 @@
+""" Module that includes the tests of the SQLite storage engine """
+import os.path
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3mtravel import HotelManager
+from uc3mtravel import HotelManagementException
+from uc3mtravel import SqliteDatabase
+
+
+class TestSqliteDatabase(TestCase):
+    """ Class to test HotelManager over the SQLite storage engine """
+
+    __path_data = str(Path.home()) + "/PycharmProjects/G89.2024.T00.GE2/src/data/"
+
+    def setUp(self):
+        """ Creates an empty database in a temporary directory... """
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__database = SqliteDatabase(os.path.join(self.__tmp_dir.name, "hotel.db"))
+
+    def tearDown(self):
+        """ Closes the database and deletes the temporary directory... """
+        self.__database.close()
+        self.__tmp_dir.cleanup()
+
+    def test_migrate_json(self):
+        """ The json data files are imported into the database tables """
+        imported = self.__database.migrate_json(self.__path_data)
+        for table in ("bookings", "stays", "checkouts"):
+            with self.subTest(table):
+                store = getattr(self.__database, table)
+                self.assertEqual(imported[table], len(store))
+                self.assertEqual(store.records(), HotelManager().read_data_from_json(self.__path_data + "all_" + table + ".json", "r"))
+
+    @freeze_time("2024-06-14")
+    def test_operations_over_database(self):
+        """ Reservation, arrival and checkout work over the database and reject duplicates """
+        hm = HotelManager(**self.__database.stores())
+        localizer = hm.room_reservation("5555555555554444", "12345678Z", "JOSE LOPEZ", "911234567", "SINGLE", "14/06/2024", "2")
+        self.assertEqual(localizer, "3ff517743faae67b33ddefa77163099d")
+        with self.assertRaises(HotelManagementException) as result:
+            hm.room_reservation("5555555555554444", "12345678Z", "JOSE LOPEZ", "911234567", "SINGLE", "14/06/2024", "2")
+        self.assertEqual(result.exception.message, "Client already has a reservation")
+        input_file = os.path.join(self.__tmp_dir.name, "arrival.json")
+        with open(input_file, encoding="UTF-8", mode="w") as f:
+            f.write('{"Localizer":"3ff517743faae67b33ddefa77163099d","IdCard":"12345678Z"}')
+        room_key = hm.guest_arrival(input_file)
+        self.assertEqual(room_key, "ee25b7b863b77e9106d851875103a3076748a0d487e7a42340ea18855d36b89f")
+        with freeze_time("2024-06-16"):
+            self.assertTrue(hm.guest_checkout(room_key))
+        self.assertEqual(len(self.__database.checkouts), 1)
+
+    def test_transaction_rollback(self):
+        """ Records written inside a failed transaction are discarded """
+        with self.assertRaises(HotelManagementException):
+            with self.__database.transaction():
+                self.__database.bookings.append({"idCard": "12345678Z", "localizer": "a"})
+                raise HotelManagementException("Client already has a reservation")
+        self.assertEqual(len(self.__database.bookings), 0)
+
+    def test_import_wrong_json(self):
+        """ Files json.load rejects are not imported and the table keeps its records """
+        self.__database.bookings.append({"idCard": "12345678Z", "localizer": "a"})
+        input_file = os.path.join(self.__tmp_dir.name, "bookings.json")
+        for content in ('[{"idCard": "1"} {"idCard": "2"}]', '[,,{"idCard": "1"},]', '[{"idCard": "1"}] x'):
+            with self.subTest(content):
+                with open(input_file, encoding="UTF-8", mode="w") as f:
+                    f.write(content)
+                with self.assertRaises(HotelManagementException) as result:
+                    self.__database.bookings.import_json(input_file)
+                self.assertEqual(result.exception.message, "JSON Decode Error - Wrong JSON Format")
+                self.assertEqual(self.__database.bookings.records(), [{"idCard": "12345678Z", "localizer": "a"}])